@@ -0,0 +1,110 @@
+"""
+Kompakt sayı biçimi benchmark'ı: normal ve compact=True DXF / SVG
+çıktılarının boyutunu (ham ve gzip) ve serileştirme süresini karşılaştırır,
+her etiket için geometrinin precision içinde aynı kaldığını doğrular.
+
+Kullanım (eticad-web klasöründen):
+    python bench/bench_compact.py
+    python bench/bench_compact.py --corpus golden/corpus.json --save kompakt.json
+
+Geometri farkı bulunursa 1 ile çıkar.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "golden"))
+
+from bench_core import measure  # noqa: E402
+from eticad_core import SVG_PRECISION  # noqa: E402
+from golden_check import (  # noqa: E402
+    DEFAULT_CORPUS, DXF_EPS, SVG_EPS, compare_dxf, compare_svg, load_corpus,
+)
+
+
+def _sizes(text):
+    raw = text.encode("utf-8")
+    return len(raw), len(gzip.compress(raw, compresslevel=6, mtime=0))
+
+
+def run_spec(spec, min_time):
+    layout = spec.layout()
+    row = {"key": spec.key}
+    for fmt, build in (("dxf", spec.to_dxf), ("svg", spec.to_svg)):
+        normal = build(layout)
+        compact = build(layout, compact=True)
+        row[fmt] = {
+            "normal_bytes": _sizes(normal),
+            "compact_bytes": _sizes(compact),
+            "normal_ms": measure(lambda: build(layout), min_time)["median"] * 1e3,
+            "compact_ms": measure(lambda: build(layout, compact=True),
+                                  min_time)["median"] * 1e3,
+        }
+        if fmt == "dxf":
+            diffs = compare_dxf(normal, compact, eps=DXF_EPS)
+        else:
+            diffs = compare_svg(normal, compact, eps=SVG_EPS * 1.0001,
+                                scale=10.0 ** SVG_PRECISION)
+        row[fmt]["diffs"] = diffs
+    return row
+
+
+def _pct(new, old):
+    return (new / old - 1.0) * 100.0 if old else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EtiCAD kompakt çıktı benchmark'ı")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="ölçüm başına en az süre (sn)")
+    parser.add_argument("--save", help="sonuçları JSON olarak kaydet")
+    args = parser.parse_args(argv)
+
+    rows = [run_spec(spec, args.min_time) for spec in load_corpus(args.corpus)]
+
+    failures = 0
+    totals = {}
+    for fmt in ("dxf", "svg"):
+        t = totals[fmt] = {"normal_raw": 0, "compact_raw": 0,
+                           "normal_gz": 0, "compact_gz": 0,
+                           "normal_ms": 0.0, "compact_ms": 0.0}
+        for row in rows:
+            r = row[fmt]
+            t["normal_raw"] += r["normal_bytes"][0]
+            t["compact_raw"] += r["compact_bytes"][0]
+            t["normal_gz"] += r["normal_bytes"][1]
+            t["compact_gz"] += r["compact_bytes"][1]
+            t["normal_ms"] += r["normal_ms"]
+            t["compact_ms"] += r["compact_ms"]
+            if r["diffs"]:
+                failures += 1
+                print(f"GEOMETRİ FARKLI {fmt} {row['key']}")
+                for d in r["diffs"][:5]:
+                    print(f"    {d}")
+
+        print(f"{fmt.upper()} ({len(rows)} etiket)")
+        print(f"  ham    {t['normal_raw']:>10} -> {t['compact_raw']:>10} B  "
+              f"%{_pct(t['compact_raw'], t['normal_raw']):+.1f}")
+        print(f"  gzip   {t['normal_gz']:>10} -> {t['compact_gz']:>10} B  "
+              f"%{_pct(t['compact_gz'], t['normal_gz']):+.1f}")
+        print(f"  süre   {t['normal_ms']:>10.3f} -> {t['compact_ms']:>10.3f} ms  "
+              f"%{_pct(t['compact_ms'], t['normal_ms']):+.1f}")
+
+    print(f"{failures} geometri farkı")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"totals": totals, "labels": rows}, f, indent=2,
+                      ensure_ascii=False)
+        print(f"Kaydedildi: {args.save}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Geometri ve yazıcı sıcak yolları için mikro benchmark.
+
+Kullanım (eticad-web klasöründen):
+    python bench/bench_core.py run --save sonuc.json
+    python bench/bench_core.py run --filter dxf --quick
+    python bench/bench_core.py compare once.json sonra.json --threshold 0.10
+
+compare, medyan süresi eşikten fazla kötüleşen senaryoları listeler ve
+en az bir gerileme varsa 1 ile çıkar (CI'da kullanılabilir).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eticad_core import (  # noqa: E402
+    build_text_segments, center_horizontal, layout_label_lazy,
+    build_single_dxf, build_svg_preview, TextGeometry,
+)
+from eticad_analysis import analyze_label  # noqa: E402
+from eticad_gcode import build_label_gcode, plan_label  # noqa: E402
+from eticad_validate import validate_label  # noqa: E402
+
+TEXTS = {
+    "short": "AB",
+    "long": "NECATI PEHLIVAN ETICAD 2024-11",
+    "heavy": "QQQ888SSS",
+    "light": "IIIIIIIII",
+}
+
+# ad -> (line1, line2)
+LINE_COMBOS = {
+    "line1": ("ETICAD", ""),
+    "line2": ("", "NECATI PEHLIVAN"),
+    "both": ("ETICAD", "NECATI PEHLIVAN"),
+    "heavy-both": ("QQQ888SSS", "QQQ888SSS QQQ888SSS"),
+}
+
+HOLE_MODES = (0, 2, 4)
+BATCH_SIZES = (1, 10, 100, 1000, 10000)
+QUICK_MAX_BATCH = 100
+
+WIDTH, HEIGHT, H1, H2 = 300.0, 80.0, 40.0, 20.0
+
+
+# =========================
+# SENARYOLAR
+# =========================
+
+def _workloads(quick=False):
+    """
+    (ad, fonksiyon) çiftleri üretir; fonksiyon tek bir ölçüm turudur.
+    """
+    for name, text in TEXTS.items():
+        yield f"shape/{name}", lambda t=text: build_text_segments(t, H1)
+
+    for name, text in TEXTS.items():
+        yield f"geometry/{name}", lambda t=text: TextGeometry.shape(t, H1)
+
+    for name, text in TEXTS.items():
+        segs = build_text_segments(text, H1)
+        yield f"center/{name}", lambda s=segs: center_horizontal(s, WIDTH / 2.0)
+
+    for combo, (l1, l2) in LINE_COMBOS.items():
+        yield (f"layout/{combo}",
+               lambda a=l1, b=l2: layout_label_lazy(WIDTH, HEIGHT, a, H1, b, H2))
+
+    for combo, (l1, l2) in LINE_COMBOS.items():
+        seg1, seg2 = layout_label_lazy(WIDTH, HEIGHT, l1, H1, l2, H2)
+        for holes in HOLE_MODES:
+            yield (f"dxf/{combo}/holes{holes}",
+                   lambda a=seg1, b=seg2, h=holes:
+                   build_single_dxf(WIDTH, HEIGHT, a, b, h))
+            yield (f"svg/{combo}/holes{holes}",
+                   lambda a=seg1, b=seg2, h=holes:
+                   build_svg_preview(WIDTH, HEIGHT, a, b, h))
+        yield (f"gcode-plan/{combo}",
+               lambda a=seg1, b=seg2: plan_label(WIDTH, HEIGHT, a, b, 4))
+        yield (f"gcode/{combo}",
+               lambda a=seg1, b=seg2: build_label_gcode(WIDTH, HEIGHT, a, b, 4))
+        yield (f"analysis/{combo}",
+               lambda a=seg1, b=seg2: analyze_label(WIDTH, HEIGHT, a, b, 4))
+        yield (f"validate/{combo}",
+               lambda a=seg1, b=seg2: validate_label(WIDTH, HEIGHT, a, b, 4))
+
+    for size in BATCH_SIZES:
+        if quick and size > QUICK_MAX_BATCH:
+            continue
+        labels = [(f"TAG-{i:05d}", "NECATI PEHLIVAN") for i in range(size)]
+        yield f"batch/{size}", lambda ls=labels: _batch(ls)
+
+
+def _batch(labels):
+    for l1, l2 in labels:
+        seg1, seg2 = layout_label_lazy(WIDTH, HEIGHT, l1, H1, l2, H2)
+        build_single_dxf(WIDTH, HEIGHT, seg1, seg2, 4)
+
+
+# =========================
+# ÖLÇÜM
+# =========================
+
+def measure(fn, min_time=0.2, min_rounds=5, max_rounds=1000):
+    """
+    fn'i en az min_rounds kez ve toplam en az min_time saniye çalıştırır.
+    Tek tur çok uzunsa (büyük batch) tur sayısı kendiliğinden azalır.
+    """
+    fn()  # ısınma
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_rounds:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        if len(times) >= min_rounds and time.perf_counter() - start >= min_time:
+            break
+        if times[0] > min_time:
+            break
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "rounds": len(times),
+    }
+
+
+def run(args):
+    results = {}
+    for name, fn in _workloads(quick=args.quick):
+        if args.filter and args.filter not in name:
+            continue
+        r = results[name] = measure(fn, min_time=args.min_time)
+        print(f"{name:<32} {r['median'] * 1e3:10.4f} ms  "
+              f"(min {r['min'] * 1e3:.4f}, {r['rounds']} tur)")
+
+    if args.save:
+        doc = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "platform": platform.platform(),
+            },
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        print(f"Kaydedildi: {args.save}")
+    return 0
+
+
+def compare(args):
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)["results"]
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    for name in sorted(set(base) & set(new)):
+        b = base[name]["median"]
+        n = new[name]["median"]
+        ratio = n / b if b else float("inf")
+        if ratio > 1.0 + args.threshold:
+            flag = "GERİLEME"
+            regressions += 1
+        elif ratio < 1.0 - args.threshold:
+            flag = "iyileşme"
+        else:
+            flag = ""
+        print(f"{name:<32} {b * 1e3:10.4f} -> {n * 1e3:10.4f} ms  "
+              f"x{ratio:5.2f}  {flag}")
+
+    missing = sorted(set(base) ^ set(new))
+    if missing:
+        print("Sadece bir tarafta olanlar: " + ", ".join(missing))
+    print(f"{regressions} gerileme (eşik %{args.threshold * 100:.0f})")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EtiCAD mikro benchmark")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="benchmark'ları çalıştır")
+    p_run.add_argument("--save", help="sonuçları JSON olarak kaydet")
+    p_run.add_argument("--filter", help="sadece adında bu geçen senaryolar")
+    p_run.add_argument("--quick", action="store_true",
+                       help=f"{QUICK_MAX_BATCH}'den büyük batch'leri atla")
+    p_run.add_argument("--min-time", type=float, default=0.2,
+                       help="senaryo başına en az ölçüm süresi (sn)")
+
+    p_cmp = sub.add_parser("compare", help="iki sonuç dosyasını karşılaştır")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10,
+                       help="gerileme eşiği (0.10 = %%10)")
+
+    args = parser.parse_args(argv)
+    return run(args) if args.cmd == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
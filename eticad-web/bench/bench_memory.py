@@ -0,0 +1,158 @@
+"""
+Bellek ayak izi benchmark'ı (tracemalloc).
+
+Eski yerleşim (segment başına ((x1, y1), (x2, y2)) tuple'ları, her
+ötelemede yeni liste) ile tembel TextGeometry yerleşimini (glyph
+referansları + öteleme, koordinatlar yazıcıda hesaplanır) karşılaştırır:
+tek etiket ve çok etiketli batch için tepe ve kalıcı bellek.
+
+Kullanım (eticad-web klasöründen):
+    python bench/bench_memory.py
+    python bench/bench_memory.py --batch 10000 --save bellek.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eticad_core import (  # noqa: E402
+    GLYPHS, LETTER_SPACING_FACTOR,
+    build_single_dxf, build_special_glyph, layout_label_lazy,
+)
+
+WIDTH, HEIGHT, H1, H2 = 300.0, 80.0, 40.0, 20.0
+LINE1, LINE2 = "QQQ888SSS", "NECATI PEHLIVAN"
+
+
+# =========================
+# ESKİ (TUPLE LİSTESİ) YERLEŞİM — KARŞILAŞTIRMA İÇİN
+# =========================
+
+def _legacy_segments(text, height_mm):
+    segments = []
+    cursor_x = 0.0
+    for ch in text:
+        if ch == " ":
+            cursor_x += height_mm * 0.5
+            continue
+        if ch in [".", ":", "-"]:
+            sp_segs, adv = build_special_glyph(ch, height_mm, cursor_x)
+            segments.extend(sp_segs)
+            cursor_x += adv
+            continue
+        if ch not in GLYPHS:
+            continue
+        g = GLYPHS[ch]
+        scale = height_mm / (g["height"] or 1.0)
+        for (x1, y1), (x2, y2) in g["segments"]:
+            segments.append(((x1 * scale + cursor_x, y1 * scale),
+                             (x2 * scale + cursor_x, y2 * scale)))
+        cursor_x += g["width"] * scale + height_mm * LETTER_SPACING_FACTOR
+    return segments
+
+
+def _legacy_center(segments, cx):
+    xs = []
+    for (x1, y1), (x2, y2) in segments:
+        xs.extend([x1, x2])
+    tx = cx - (min(xs) + max(xs)) / 2.0
+    return [((x1 + tx, y1), (x2 + tx, y2)) for (x1, y1), (x2, y2) in segments]
+
+
+def legacy_layout(width, height, line1, h1, line2, h2):
+    seg1 = _legacy_segments(line1, h1)
+    seg2 = _legacy_segments(line2, h2)
+    gap = 0.2 * min(h1, h2)
+    margin = max(0.0, (height - (h1 + h2 + gap)) / 2.0)
+    b2, b1 = margin, margin + h2 + gap
+    s1 = [((x1, y1 + b1), (x2, y2 + b1)) for (x1, y1), (x2, y2) in seg1]
+    s2 = [((x1, y1 + b2), (x2, y2 + b2)) for (x1, y1), (x2, y2) in seg2]
+    return _legacy_center(s1, width / 2.0), _legacy_center(s2, width / 2.0)
+
+
+# =========================
+# ÖLÇÜM
+# =========================
+
+def traced(fn):
+    """
+    fn()'i tracemalloc altında çalıştırır; (tepe, kalıcı) bayt döner.
+    Kalıcı: fn'in döndürdüğü nesne hâlâ canlıyken ayrılmış bellek.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = fn()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, retained
+
+
+def _batch_texts(n):
+    return [(f"TAG-{i:05d}", LINE2) for i in range(n)]
+
+
+def scenarios(batch):
+    texts = _batch_texts(batch)
+    yield ("tek etiket / layout",
+           lambda: legacy_layout(WIDTH, HEIGHT, LINE1, H1, LINE2, H2),
+           lambda: layout_label_lazy(WIDTH, HEIGHT, LINE1, H1, LINE2, H2))
+    yield ("tek etiket / layout+dxf",
+           lambda: build_single_dxf(WIDTH, HEIGHT,
+                                    *legacy_layout(WIDTH, HEIGHT, LINE1, H1, LINE2, H2), 4),
+           lambda: build_single_dxf(WIDTH, HEIGHT,
+                                    *layout_label_lazy(WIDTH, HEIGHT, LINE1, H1, LINE2, H2), 4))
+    yield (f"batch {batch} / layout (hepsi bellekte)",
+           lambda: [legacy_layout(WIDTH, HEIGHT, a, H1, b, H2) for a, b in texts],
+           lambda: [layout_label_lazy(WIDTH, HEIGHT, a, H1, b, H2) for a, b in texts])
+
+
+def _fmt(n):
+    if n >= 1 << 20:
+        return f"{n / (1 << 20):8.2f} MiB"
+    return f"{n / 1024:8.1f} KiB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EtiCAD bellek benchmark'ı")
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--save", help="sonuçları JSON olarak kaydet")
+    args = parser.parse_args(argv)
+
+    seg1, seg2 = layout_label_lazy(WIDTH, HEIGHT, LINE1, H1, LINE2, H2)
+    n_segments = len(seg1) + len(seg2)
+    print(f"Etiket: {LINE1!r} / {LINE2!r}, {n_segments} segment")
+    print(f"{'senaryo':<36} {'eski tepe':>12} {'yeni tepe':>12} "
+          f"{'eski kalıcı':>12} {'yeni kalıcı':>12}")
+
+    results = {"segments_per_label": n_segments, "scenarios": {}}
+    for name, old_fn, new_fn in scenarios(args.batch):
+        old_peak, old_kept = traced(old_fn)
+        new_peak, new_kept = traced(new_fn)
+        results["scenarios"][name] = {
+            "legacy_peak": old_peak, "legacy_retained": old_kept,
+            "buffer_peak": new_peak, "buffer_retained": new_kept,
+        }
+        print(f"{name:<36} {_fmt(old_peak)} {_fmt(new_peak)} "
+              f"{_fmt(old_kept)} {_fmt(new_kept)}")
+
+    single = results["scenarios"]["tek etiket / layout"]
+    print(f"Segment başına kalıcı: eski {single['legacy_retained'] / n_segments:.0f} B, "
+          f"yeni {single['buffer_retained'] / n_segments:.0f} B")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Kaydedildi: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
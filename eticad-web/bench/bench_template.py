@@ -0,0 +1,88 @@
+"""
+Şablonlu seri benchmark'ı: "PUMP-{seq:04d}" gibi bir seriyi her etiket
+için baştan (LabelSpec.parse + layout + DXF) ve LabelTemplate ile üretir,
+süreleri karşılaştırır ve çıktıların bayt bayt aynı olduğunu doğrular.
+
+Kullanım (eticad-web klasöründen):
+    python bench/bench_template.py
+    python bench/bench_template.py --count 5000 --line1 "PUMP-{seq:04d}" --compact
+
+Çıktı farkı bulunursa 1 ile çıkar.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eticad_spec import LabelSpec, TemplateSpec  # noqa: E402
+
+
+def naive(series, compact):
+    label = series.label
+    out = []
+    t0 = time.perf_counter()
+    for seq in series.sequence:
+        spec = LabelSpec.parse({
+            "width": label.width, "height": label.height,
+            "line1": label.line1.format(seq=seq), "h1": label.h1,
+            "line2": label.line2.format(seq=seq), "h2": label.h2,
+            "holes": label.holes,
+        })
+        out.append(spec.to_dxf(compact=compact))
+    return time.perf_counter() - t0, out
+
+
+def templated(series, compact):
+    out = []
+    t0 = time.perf_counter()
+    template = series.compile()
+    layout_s = 0.0
+    for _, spec in series.iter_labels(template):
+        t1 = time.perf_counter()
+        layout = template.layout((spec.line1, spec.line2))
+        layout_s += time.perf_counter() - t1
+        out.append(template.to_dxf(layout, compact))
+    return time.perf_counter() - t0, layout_s, out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EtiCAD şablonlu seri benchmark'ı")
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--line1", default="PUMP-{seq:04d}")
+    parser.add_argument("--line2", default="NECATI PEHLIVAN")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--save", help="sonuçları JSON olarak kaydet")
+    args = parser.parse_args(argv)
+
+    series = TemplateSpec.parse({
+        "template": {"width": 300, "height": 80, "line1": args.line1, "h1": 40,
+                     "line2": args.line2, "h2": 20, "holes": 4},
+        "start": 1, "count": args.count,
+    })
+
+    naive_s, expected = naive(series, args.compact)
+    template_s, layout_s, got = templated(series, args.compact)
+    diffs = sum(1 for a, b in zip(expected, got) if a != b)
+
+    print(f"{len(series)} etiket  {args.line1!r} / {args.line2!r}"
+          f"{'  (compact)' if args.compact else ''}")
+    print(f"  baştan   {naive_s:8.3f} sn")
+    print(f"  şablon   {template_s:8.3f} sn  (yerleşim {layout_s:.3f} sn)  "
+          f"x{naive_s / template_s:.2f}")
+    print(f"{diffs} çıktı farkı")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"count": len(series), "naive_s": naive_s,
+                       "template_s": template_s, "layout_s": layout_s,
+                       "diffs": diffs}, f, indent=2)
+        print(f"Kaydedildi: {args.save}")
+    return 1 if diffs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Akışlı ZIP yazıcı benchmark'ı: worker sayısına göre verim ve
+etiket sayısına göre tepe bellek (tracemalloc).
+
+Kullanım (eticad-web klasöründen):
+    python bench/bench_zip.py
+    python bench/bench_zip.py --labels 2000 --workers 1,2,4,8 --save zip.json
+
+İki senaryo ölçülür:
+    prebuilt  DXF'ler önceden üretilmiş; sadece deflate (GIL'siz, ölçeklenir)
+    full      üyeler havuzda üretilir (layout + DXF Python'da, GIL'li) ve
+              sıkıştırılır; /api/v1/labels/batch'in yaptığı iş
+    dedupe    full ile aynı, ama satırların sadece --unique kadarı farklı;
+              aynı anahtarlı üyeler bir kez üretilir (iter_zip üçlüleri)
+"""
+
+import argparse
+import gc
+from collections import Counter
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eticad_spec import LabelSpec  # noqa: E402
+from eticad_zip import iter_zip  # noqa: E402
+
+LINE2 = "NECATI PEHLIVAN"
+
+
+def _specs(n, unique=None):
+    unique = unique or n
+    return [LabelSpec.parse({"width": 300, "height": 80,
+                             "line1": f"TAG-{i % unique:05d}", "h1": 40,
+                             "line2": LINE2, "h2": 20, "holes": 4})
+            for i in range(n)]
+
+
+def _drain(members, workers, uses=None):
+    total = 0
+    for chunk in iter_zip(members, workers=workers, uses=uses):
+        total += len(chunk)
+    return total
+
+
+def throughput(specs, workers, prebuilt, dedupe=False):
+    uses = None
+    if dedupe:
+        uses = Counter(s.key for s in specs)
+        members = ((f"{i:05d}.dxf", s.to_dxf, s.key) for i, s in enumerate(specs))
+        raw = None
+    elif prebuilt:
+        bodies = [s.to_dxf().encode("utf-8") for s in specs]
+        members = ((f"{i:05d}.dxf", b) for i, b in enumerate(bodies))
+        raw = sum(len(b) for b in bodies)
+    else:
+        members = ((f"{i:05d}.dxf", s.to_dxf) for i, s in enumerate(specs))
+        raw = None
+    t0 = time.perf_counter()
+    size = _drain(members, workers, uses)
+    dt = time.perf_counter() - t0
+    return {"seconds": dt, "labels_per_s": len(specs) / dt,
+            "zip_bytes": size, "raw_bytes": raw}
+
+
+def peak_memory(n, workers):
+    specs = _specs(n)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        members = ((f"{i:05d}.dxf", s.to_dxf) for i, s in enumerate(specs))
+        _drain(members, workers)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EtiCAD ZIP benchmark'ı")
+    parser.add_argument("--labels", type=int, default=1000)
+    parser.add_argument("--unique", type=int, default=None,
+                        help="dedupe senaryosunda farklı etiket sayısı "
+                             "(varsayılan labels / 4)")
+    parser.add_argument("--workers", default="1,2,4,8",
+                        help="virgülle ayrılmış worker sayıları")
+    parser.add_argument("--save", help="sonuçları JSON olarak kaydet")
+    args = parser.parse_args(argv)
+
+    specs = _specs(args.labels)
+    worker_counts = [int(w) for w in args.workers.split(",") if w]
+    results = {"labels": args.labels, "cpus": os.cpu_count(),
+               "throughput": {}, "peak_memory": {}}
+
+    dup_specs = _specs(args.labels, args.unique or max(1, args.labels // 4))
+    for mode in ("prebuilt", "full", "dedupe"):
+        base = None
+        for workers in worker_counts:
+            if mode == "dedupe":
+                r = throughput(dup_specs, workers, False, dedupe=True)
+            else:
+                r = throughput(specs, workers, mode == "prebuilt")
+            base = base or r["labels_per_s"]
+            results["throughput"][f"{mode}/{workers}"] = r
+            print(f"{mode:<9} workers={workers:<3} {r['labels_per_s']:9.1f} etiket/sn  "
+                  f"x{r['labels_per_s'] / base:4.2f}  ({r['zip_bytes']} B)")
+
+    workers = max(worker_counts)
+    for n in (args.labels // 4, args.labels):
+        peak = peak_memory(n, workers)
+        results["peak_memory"][n] = peak
+        print(f"tepe bellek {n:>6} etiket: {peak / 1024:9.1f} KiB")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Kaydedildi: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+"""
+Flask rotaları için yerel HTTP yük testi (tamamen çevrimdışı, tek makine).
+
+GET /, POST /preview ve POST / (DXF) isteklerini gerçekçi bir etiket
+karışımıyla, keep-alive bağlantılar üzerinden gönderir; her aşama için
+istek/sn, p50/p95/p99 gecikme ve hata oranını raporlar.
+
+Kullanım (eticad-web klasöründen):
+    # Tek gunicorn yapılandırması, kademeli yük: 4 bağlantı 10 sn, 16 bağlantı 10 sn
+    python bench/loadtest.py --workers 2 --threads 4 --ramp 4:10,16:10
+
+    # Worker x thread taraması; en iyi verime yakın en küçük yapılandırma (dirsek)
+    python bench/loadtest.py --sweep-workers 1,2,4 --sweep-threads 1,4,8 --ramp 32:10
+
+    # Zaten çalışan bir sunucuya karşı
+    python bench/loadtest.py --url http://127.0.0.1:8000 --ramp 8:15
+
+Sunucu gunicorn (gthread worker, keep-alive açık) ile başlatılır.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# En iyi verimin bu oran kadar yakınındaki en küçük yapılandırma "dirsek"tir
+KNEE_GAIN = 0.10
+
+# Gerçekçi etiket havuzu: kısa etiketler, uzun satırlar, ağır glyph'ler
+TEXT_POOL = [
+    ("ETICAD", "NECATI PEHLIVAN"),
+    ("PUMP-0001", ""),
+    ("V-101", "12.5 BAR"),
+    ("K1", "24V DC"),
+    ("ACIL CIKIS", "EMERGENCY EXIT"),
+    ("QQQ888SSS", "QQQ888SSS"),
+    ("CABLE-TAG 1A", "PANEL 3 / SLOT 12"),
+    ("", "HAT: 3"),
+]
+SIZES = [(300, 80, 40, 20), (120, 30, 12, 8), (150, 40, 20, 10), (90, 20, 10, 6)]
+
+# (ağırlık, yöntem, yol)
+ROUTE_MIX = [
+    (0.25, "GET", "/"),
+    (0.55, "POST", "/preview"),
+    (0.20, "POST", "/"),
+]
+
+
+# =========================
+# İSTEK ÜRETİMİ
+# =========================
+
+def random_form(rng, unique_ratio=0.3):
+    """
+    Etiket formu üretir. unique_ratio kadarı benzersiz (önbellek ıskası),
+    kalanı havuzdan tekrar eden etiketlerdir.
+    """
+    line1, line2 = rng.choice(TEXT_POOL)
+    width, height, h1, h2 = rng.choice(SIZES)
+    if rng.random() < unique_ratio:
+        line1 = f"{line1 or 'TAG'}-{rng.randint(0, 99999):05d}"
+    return {
+        "width": width, "height": height,
+        "line1": line1, "h1": h1,
+        "line2": line2, "h2": h2,
+        "holes": rng.choice((0, 2, 4)),
+    }
+
+
+def pick_route(rng):
+    r = rng.random()
+    acc = 0.0
+    for weight, method, path in ROUTE_MIX:
+        acc += weight
+        if r <= acc:
+            return method, path
+    return ROUTE_MIX[-1][1:]
+
+
+# =========================
+# İSTEMCİ
+# =========================
+
+class _Client(threading.Thread):
+    def __init__(self, host, port, stop_at, seed, unique_ratio, results):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.stop_at = stop_at
+        self.rng = random.Random(seed)
+        self.unique_ratio = unique_ratio
+        self.results = results
+        self.conn = None
+
+    def _connect(self):
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def run(self):
+        self._connect()
+        local = []
+        while time.monotonic() < self.stop_at:
+            method, path = pick_route(self.rng)
+            body = None
+            headers = {"Connection": "keep-alive"}
+            if method == "POST":
+                body = urlencode(random_form(self.rng, self.unique_ratio))
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+            t0 = time.perf_counter()
+            ok = False
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                resp = self.conn.getresponse()
+                resp.read()
+                ok = resp.status < 400
+                if resp.getheader("Connection", "").lower() == "close":
+                    self.conn.close()
+                    self._connect()
+            except (OSError, http.client.HTTPException):
+                self.conn.close()
+                self._connect()
+            local.append((f"{method} {path}", time.perf_counter() - t0, ok))
+
+        self.conn.close()
+        self.results.extend(local)
+
+
+def _percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def _summarize(samples, duration):
+    lat = sorted(s[1] for s in samples)
+    errors = sum(1 for s in samples if not s[2])
+    return {
+        "requests": len(samples),
+        "rps": len(samples) / duration if duration else 0.0,
+        "p50_ms": _percentile(lat, 50) * 1e3,
+        "p95_ms": _percentile(lat, 95) * 1e3,
+        "p99_ms": _percentile(lat, 99) * 1e3,
+        "error_rate": errors / len(samples) if samples else 0.0,
+    }
+
+
+def run_stage(host, port, concurrency, duration, unique_ratio, seed=0):
+    results = []
+    stop_at = time.monotonic() + duration
+    clients = [_Client(host, port, stop_at, seed + i, unique_ratio, results)
+               for i in range(concurrency)]
+    t0 = time.monotonic()
+    for c in clients:
+        c.start()
+    for c in clients:
+        c.join()
+    elapsed = time.monotonic() - t0
+
+    summary = _summarize(results, elapsed)
+    summary["concurrency"] = concurrency
+    summary["routes"] = {}
+    for route in sorted({s[0] for s in results}):
+        summary["routes"][route] = _summarize(
+            [s for s in results if s[0] == route], elapsed)
+    return summary
+
+
+def run_profile(host, port, ramp, unique_ratio):
+    stages = []
+    for concurrency, duration in ramp:
+        s = run_stage(host, port, concurrency, duration, unique_ratio)
+        stages.append(s)
+        print(f"  c={concurrency:<4} {s['rps']:8.1f} istek/sn  "
+              f"p50 {s['p50_ms']:7.2f}  p95 {s['p95_ms']:7.2f}  "
+              f"p99 {s['p99_ms']:7.2f} ms  hata %{s['error_rate'] * 100:.2f}")
+        for route, r in s["routes"].items():
+            print(f"      {route:<14} {r['rps']:8.1f} istek/sn  "
+                  f"p50 {r['p50_ms']:7.2f}  p99 {r['p99_ms']:7.2f} ms")
+    return stages
+
+
+# =========================
+# SUNUCU
+# =========================
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(host, port, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_server(workers, threads, port):
+    cmd = [
+        sys.executable, "-m", "gunicorn",
+        "-w", str(workers), "--threads", str(threads),
+        "-k", "gthread", "--keep-alive", "5",
+        "-b", f"127.0.0.1:{port}",
+        "--log-level", "warning",
+        "eticad_web:app",
+    ]
+    proc = subprocess.Popen(cmd, cwd=APP_DIR)
+    if not _wait_ready("127.0.0.1", port):
+        proc.terminate()
+        raise RuntimeError("Sunucu başlamadı: " + " ".join(cmd))
+    return proc
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def find_knee(rows):
+    """
+    rows: [(workers, threads, rps), ...]. Toplam kapasiteye (worker x thread)
+    göre sıralayıp en iyi verimin KNEE_GAIN kadar yakınına ulaşan en küçük
+    yapılandırmayı döner; ötesine kapasite eklemek verimi belirgin artırmaz.
+    """
+    rows = sorted(rows, key=lambda r: (r[0] * r[1], r[0]))
+    best = max(r[2] for r in rows)
+    for row in rows:
+        if row[2] >= best * (1.0 - KNEE_GAIN):
+            return row
+    return rows[-1]
+
+
+# =========================
+# GİRİŞ
+# =========================
+
+def _parse_ramp(text):
+    ramp = []
+    for part in text.split(","):
+        c, d = part.split(":")
+        ramp.append((int(c), float(d)))
+    return ramp
+
+
+def _parse_list(text):
+    return [int(x) for x in text.split(",") if x]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EtiCAD yük testi")
+    parser.add_argument("--url", help="çalışan sunucu (verilirse başlatılmaz)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--sweep-workers", type=_parse_list)
+    parser.add_argument("--sweep-threads", type=_parse_list)
+    parser.add_argument("--ramp", type=_parse_ramp, default=[(8, 10.0)],
+                        help="eşzamanlılık:süre listesi, örn. 4:10,16:10,64:10")
+    parser.add_argument("--unique-ratio", type=float, default=0.3,
+                        help="benzersiz (önbelleğe düşmeyen) etiket oranı")
+    parser.add_argument("--save", help="sonuçları JSON olarak kaydet")
+    args = parser.parse_args(argv)
+
+    report = {"ramp": args.ramp, "unique_ratio": args.unique_ratio, "runs": []}
+
+    if args.url:
+        parts = urlsplit(args.url)
+        print(f"{args.url}")
+        stages = run_profile(parts.hostname, parts.port or 80,
+                             args.ramp, args.unique_ratio)
+        report["runs"].append({"url": args.url, "stages": stages})
+    else:
+        workers_list = args.sweep_workers or [args.workers]
+        threads_list = args.sweep_threads or [args.threads]
+        rows = []
+        for workers in workers_list:
+            for threads in threads_list:
+                port = _free_port()
+                print(f"gunicorn -w {workers} --threads {threads}")
+                proc = start_server(workers, threads, port)
+                try:
+                    stages = run_profile("127.0.0.1", port,
+                                         args.ramp, args.unique_ratio)
+                finally:
+                    stop_server(proc)
+                peak = max(s["rps"] for s in stages)
+                rows.append((workers, threads, peak))
+                report["runs"].append({"workers": workers, "threads": threads,
+                                       "peak_rps": peak, "stages": stages})
+
+        if len(rows) > 1:
+            print("\nworkers threads  tepe istek/sn")
+            for w, t, rps in rows:
+                print(f"{w:7d} {t:7d}  {rps:12.1f}")
+            w, t, rps = find_knee(rows)
+            print(f"Dirsek: -w {w} --threads {t} ({rps:.1f} istek/sn, "
+                  f"en iyinin %{100 - KNEE_GAIN * 100:.0f}'i içinde)")
+            report["knee"] = {"workers": w, "threads": t, "rps": rps}
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Kaydedildi: {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Kesim analizi: etiket başına toplam kesim uzunluğu, kontur (delme)
+sayısı, G-code kesim sırasıyla boşta gidiş mesafesi ve tahmini süre.
+
+Segmentler tek tek gezilmez. Her glyph'in konturları (kaynaştırılmış
+yollar, uzunlukları, sınır kutuları) glyph birimlerinde süreç başına bir
+kez hesaplanır; yerleşimdeki her run için bunlar ölçek ve ötelemeyle
+dönüştürülür (uzunluk = birim uzunluk * ölçek). Sıralama eticad_gcode ile
+aynı fonksiyondan (order_contours) geçer, yani boşta gidiş G-code'un
+gerçekten izleyeceği yoldur. Etiket başına iş segment değil kontur
+sayısıyla orantılıdır; 10k etiketlik toplu işlerde bile ucuzdur.
+
+Delikler kesim uzunluğuna gerçek çevreleriyle (2 * pi * r) girer.
+Kaynaştırma glyph birimlerinde yapıldığı için, uç noktası tam yuvarlama
+sınırına düşen nadir bir glyph'te kontur sayısı G-code'dakinden bir
+farklı çıkabilir; tahmin için önemsizdir.
+
+Kullanım:
+    analysis = spec.analyze()                 # LabelAnalysis
+    analysis = spec.analyze(params=CutParams(feed=600, pierce_seconds=0.2))
+"""
+
+import math
+from dataclasses import dataclass
+
+from eticad_core import SegmentBuffer, TextGeometry, hole_positions, iter_flat
+from eticad_gcode import (
+    DEFAULT_SETTINGS, Contour, circle_points, order_contours, weld_paths,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CutParams:
+    """
+    feed: kesim hızı (mm/dk), travel_feed: boşta gidiş hızı (mm/dk),
+    pierce_seconds: kontur başına delme / lazer açılma süresi (sn; diyot
+    lazerde ~0, CO2 / fiber kesicide genelde 0.1-0.5), passes: tekrar.
+    Varsayılan hızlar G-code ayarlarıyla aynıdır.
+    """
+    feed: float = DEFAULT_SETTINGS.feed
+    travel_feed: float = DEFAULT_SETTINGS.travel_feed
+    pierce_seconds: float = 0.0
+    passes: int = DEFAULT_SETTINGS.passes
+
+    @classmethod
+    def parse(cls, data):
+        """
+        Sorgu parametrelerinden (feed, travel, pierce, passes) parametre
+        üretir; eksikler varsayılan, hatalı değerde ValueError.
+        """
+        default = cls()
+        try:
+            feed = float(data.get("feed", default.feed))
+            travel = float(data.get("travel", default.travel_feed))
+            pierce = float(data.get("pierce", default.pierce_seconds))
+            passes = int(data.get("passes", default.passes))
+        except (TypeError, ValueError):
+            raise ValueError("feed, travel, pierce ve passes sayı olmalı.")
+        if not (math.isfinite(feed) and feed > 0
+                and math.isfinite(travel) and travel > 0):
+            raise ValueError("Hızlar (feed, travel) pozitif olmalı.")
+        if not (math.isfinite(pierce) and 0 <= pierce <= 60):
+            raise ValueError("Delme süresi (pierce) 0..60 sn aralığında olmalı.")
+        if not 1 <= passes <= 20:
+            raise ValueError("Tekrar sayısı (passes) 1..20 aralığında olmalı.")
+        return cls(feed, travel, pierce, passes)
+
+
+DEFAULT_PARAMS = CutParams()
+
+
+@dataclass(frozen=True, slots=True)
+class LabelAnalysis:
+    """
+    Uzunluklar mm, süre saniye; tekrarlar (passes) dahil.
+    """
+    cut_mm: float
+    travel_mm: float
+    pierces: int
+    seconds: float
+
+    def to_dict(self):
+        return {
+            "cut_mm": round(self.cut_mm, 1),
+            "travel_mm": round(self.travel_mm, 1),
+            "pierces": self.pierces,
+            "seconds": round(self.seconds, 1),
+        }
+
+    def summary(self):
+        """
+        Önizleme sayfası için tek satırlık özet.
+        """
+        minutes, sec = divmod(int(round(self.seconds)), 60)
+        duration = f"{minutes} dk {sec} sn" if minutes else f"{sec} sn"
+        return (f"Kesim {self.cut_mm:.0f} mm · {self.pierces} kontur · "
+                f"boşta {self.travel_mm:.0f} mm · ~{duration}")
+
+
+def combine(analyses):
+    """
+    Etiket analizlerinin toplamı (toplu iş özeti için).
+    """
+    cut = travel = seconds = 0.0
+    pierces = 0
+    for a in analyses:
+        cut += a.cut_mm
+        travel += a.travel_mm
+        pierces += a.pierces
+        seconds += a.seconds
+    return LabelAnalysis(cut, travel, pierces, seconds)
+
+
+# =========================
+# KONTURLAR
+# =========================
+
+# id(coords) -> (coords, [(yol, kapalı mı, sınır kutusu, uzunluk), ...])
+_GLYPH_CONTOURS = {}
+
+
+def _path_length(path):
+    return sum(math.hypot(x2 - x1, y2 - y1)
+               for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+def _glyph_contours(coords):
+    """
+    Glyph'in paylaşılan düz koordinatlarından (glyph birimlerinde)
+    kaynaştırılmış konturlar. Süreç başına bir kez hesaplanır.
+    """
+    entry = _GLYPH_CONTOURS.get(id(coords))
+    if entry is not None and entry[0] is coords:
+        return entry[1]
+    it = iter(coords)
+    contours = []
+    for path in weld_paths(list(zip(it, it, it, it))):
+        c = Contour.from_path(path)
+        contours.append((path, c.closed, c.bounds, _path_length(path)))
+    _GLYPH_CONTOURS[id(coords)] = (coords, contours)
+    return contours
+
+
+def _line_contours(segs, out):
+    """
+    Bir yazı satırının konturlarını out'a ekler; toplam uzunluğu döner.
+    """
+    if not segs:
+        return 0.0
+    if not isinstance(segs, TextGeometry):
+        if isinstance(segs, SegmentBuffer):
+            flat = list(segs.iter_flat())
+        else:
+            flat = list(iter_flat(segs))
+        length = 0.0
+        for path in weld_paths(flat):
+            out.append(Contour.from_path(path))
+            length += _path_length(path)
+        return length
+
+    dx, dy = segs.dx, segs.dy
+    length = 0.0
+    for coords, scale, ox in segs.runs:
+        if scale is None:
+            # Özel karakter (. : -): koordinatlar zaten mm, birkaç segment
+            it = iter(coords)
+            for path in weld_paths(list(zip(it, it, it, it))):
+                c = Contour.from_path(path)
+                minx, miny, maxx, maxy = c.bounds
+                out.append(Contour(path, c.closed,
+                                   (minx + dx, miny + dy, maxx + dx, maxy + dy),
+                                   dx=dx, dy=dy))
+                length += _path_length(path)
+            continue
+        for path, closed, (minx, miny, maxx, maxy), unit_length in _glyph_contours(coords):
+            out.append(Contour(path, closed,
+                               ((minx * scale + ox) + dx, miny * scale + dy,
+                                (maxx * scale + ox) + dx, maxy * scale + dy),
+                               scale, ox, dx, dy))
+            length += unit_length * scale
+    return length
+
+
+def label_contours(width_mm, height_mm, seg1, seg2, hole_mode):
+    """
+    Etiketin konturları (eticad_gcode.label_segments + weld_paths ile aynı
+    sırada) ve toplam kesim uzunluğu: (konturlar, uzunluk).
+    """
+    border = [(0.0, 0.0), (width_mm, 0.0), (width_mm, height_mm),
+              (0.0, height_mm), (0.0, 0.0)]
+    contours = [Contour.from_path(border)]
+    length = 2.0 * (width_mm + height_mm)
+    length += _line_contours(seg1, contours)
+    length += _line_contours(seg2, contours)
+    for cx, cy, r in hole_positions(width_mm, height_mm, hole_mode):
+        contours.append(Contour.from_path(circle_points(cx, cy, r)))
+        length += 2.0 * math.pi * r
+    return contours, length
+
+
+def analyze_label(width_mm, height_mm, seg1, seg2, hole_mode,
+                  params=DEFAULT_PARAMS, start=(0.0, 0.0)):
+    """
+    Yerleşim çıktısından (layout_label) kesim analizi. Boşta gidiş,
+    G-code'daki sırayla başlangıç noktasından çıkıp oraya dönüşü kapsar.
+    """
+    contours, cut = label_contours(width_mm, height_mm, seg1, seg2, hole_mode)
+
+    travel = 0.0
+    x, y = start
+    for i, entry in order_contours(contours, start):
+        c = contours[i]
+        if entry == -1:
+            (ex, ey), (x2, y2) = c.end, c.start
+        elif c.closed:
+            ex, ey = x2, y2 = c.point(entry)
+        else:
+            (ex, ey), (x2, y2) = c.start, c.end
+        travel += math.hypot(ex - x, ey - y)
+        x, y = x2, y2
+    travel += math.hypot(start[0] - x, start[1] - y)
+
+    passes = params.passes
+    seconds = passes * (60.0 * cut / params.feed
+                        + 60.0 * travel / params.travel_feed
+                        + len(contours) * params.pierce_seconds)
+    return LabelAnalysis(cut * passes, travel * passes, len(contours), seconds)
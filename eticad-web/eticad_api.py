@@ -0,0 +1,503 @@
+"""
+Makine istemcileri (ERP vb.) için JSON REST API.
+
+POST /api/v1/labels
+    Gövde: {"width": 300, "height": 80, "line1": "ETICAD", "h1": 40,
+            "line2": "...", "h2": 20, "holes": 4}
+    Yanıt türü Accept başlığına (veya ?format=json|dxf|svg) göre seçilir:
+        application/json  -> düz koordinat dizileriyle geometri
+        application/dxf   -> DXF dosyası
+        image/svg+xml     -> SVG önizleme
+        text/x-gcode      -> lazer G-code'u (bkz. eticad_gcode)
+    ?compact=1: DXF / SVG kompakt sayı biçimiyle (aynı geometri, daha
+    küçük dosya; bkz. eticad_core.iter_single_dxf / build_svg_preview).
+    G-code ayarları: ?feed=1000&travel=3000&power=1000&passes=1&mode=M4
+
+POST /api/v1/labels/batch
+    Gövde: {"labels": [{...}, {...}, ...]}   (en fazla MAX_BATCH etiket)
+    ?format=dxf|svg|gcode (varsayılan dxf), ?compact=1, G-code ayarları
+    Yanıt: her etiket için bir dosya içeren ZIP; akışlı üretilir, üyeler
+    paralel sıkıştırılır (bkz. eticad_zip).
+    Seri numaralı etiketler için "labels" yerine şablon verilebilir:
+        {"template": {"line1": "PUMP-{seq:04d}", ...}, "start": 1, "end": 5000}
+    Sabit kısımlar bir kez işlenir (bkz. eticad_core.LabelTemplate).
+    Aynı etiket birden çok satırda geçiyorsa bir kez üretilir; her satır
+    kendi adıyla aynı veriyi alır. ZIP'in son üyesi manifest.json: satır
+    -> üye adı, özet, tekrar ise ilk kopyası ("same_as") ve tekilleştirme
+    oranı. Satır / farklı etiket sayısı X-Eticad-Labels / X-Eticad-Unique
+    başlıklarında da döner. Manifest her satır için kesim analizini
+    ("analysis") ve işin toplamını da içerir; kesim parametreleri
+    /labels/analysis ile aynı sorgu parametreleridir. Yazısı deliğe veya
+    kenara çarpan satırlar "warnings" listesi taşır; "warnings" üst
+    alanı uyarılı satır sayısıdır.
+
+POST /api/v1/labels/analysis
+    Gövde: /labels ile aynı.
+    ?feed=1000&travel=3000&pierce=0&passes=1 (bkz. eticad_analysis.CutParams)
+    Yanıt: {"cut_mm", "travel_mm", "pierces", "seconds", "summary",
+            "warnings"} —
+    toplam kesim uzunluğu (delikler dahil), kontur (delme) sayısı, G-code
+    kesim sırasıyla boşta gidiş, tahmini süre ve yazı / delik / kenar
+    çakışma uyarıları ({"code", "message", ...}; bkz. eticad_validate).
+
+POST /api/v1/labels/sheet
+    Gövde: etiket alanları + {"quantity": 40, "rows": 5, "cols": 8,
+            "gap": 2, "sheet_width": ..., "sheet_height": ...,
+            "mode": "insert|minsert|explode"}   (bkz. SheetSpec.parse)
+    ?compact=1
+    Yanıt: aynı etiketin ızgara halinde kopyalarını içeren tek DXF; etiket
+    bir kez yerleştirilir, kopyalar blok INSERT'leridir.
+"""
+
+import json
+import re
+from collections import Counter, namedtuple
+from functools import partial
+
+from flask import Blueprint, Response, g, request
+
+from eticad_analysis import CutParams, combine
+from eticad_cache import cached_render
+from eticad_compress import ETAG_SUFFIX, compress, negotiate
+from eticad_core import hole_positions, iter_flat
+from eticad_gcode import DEFAULT_SETTINGS, GcodeSettings
+from eticad_metrics import record_batch, record_label, timed
+from eticad_spec import LabelSpec, LabelSpecError, SheetSpec, TemplateSpec
+from eticad_zip import iter_zip
+
+api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+# Sıra önemli: Accept: */* gelirse ilk tür (JSON) seçilir
+FORMATS = {
+    "json": "application/json",
+    "dxf": "application/dxf",
+    "svg": "image/svg+xml",
+    "gcode": "text/x-gcode",
+}
+_MIMETYPE_TO_FORMAT = {v: k for k, v in FORMATS.items()}
+
+MAX_BATCH = 10000
+BATCH_FORMATS = ("dxf", "svg", "gcode")
+BATCH_MANIFEST = "manifest.json"
+
+_NAME_UNSAFE = re.compile(r"[^\w-]+")
+
+# cached_render için birleşik anahtar: etiket + sayfa / G-code ayarları
+_RenderKey = namedtuple("_RenderKey", "key digest")
+
+
+# =========================
+# GEOMETRİ JSON
+# =========================
+
+def _flat(segs, ndigits=4):
+    out = []
+    for x1, y1, x2, y2 in iter_flat(segs):
+        out.extend((round(x1, ndigits), round(y1, ndigits),
+                    round(x2, ndigits), round(y2, ndigits)))
+    return out
+
+
+def label_geometry(spec, layout):
+    """
+    Etiket geometrisini JSON'a uygun sözlük olarak döner.
+    lines: her satır için [x1, y1, x2, y2, x1, y1, ...] düz dizisi.
+    """
+    seg1, seg2 = layout
+    return {
+        "width": spec.width,
+        "height": spec.height,
+        "lines": [_flat(seg1), _flat(seg2)],
+        "holes": [[cx, cy, r]
+                  for cx, cy, r in hole_positions(spec.width, spec.height,
+                                                  spec.holes)],
+    }
+
+
+def _render(spec, fmt, compact=False, settings=DEFAULT_SETTINGS):
+    with timed("layout"):
+        layout = spec.layout()
+
+    entities = None
+    with timed(fmt):
+        if fmt == "dxf":
+            body = spec.to_dxf(layout, compact).encode("utf-8")
+            seg1, seg2 = layout
+            entities = (4 + len(seg1) + len(seg2)
+                        + len(hole_positions(spec.width, spec.height,
+                                             spec.holes)))
+        elif fmt == "svg":
+            body = spec.to_svg(layout, compact).encode("utf-8")
+        elif fmt == "gcode":
+            body = spec.to_gcode(layout, settings).encode("utf-8")
+        else:
+            body = json.dumps(label_geometry(spec, layout),
+                              separators=(",", ":")).encode("utf-8")
+
+    record_label(fmt, layout, len(body), entities)
+    return body
+
+
+def label_body(spec, fmt, encoding="identity", compact=False,
+               settings=DEFAULT_SETTINGS):
+    """
+    Etiketin fmt (json, dxf, svg, gcode) türündeki gövdesini önbellekten
+    döner; encoding "gzip" veya "br" ise sıkıştırılmış hali de önbellekte
+    tutulur (tekrar eden isteklerde yeniden sıkıştırılmaz). compact sadece
+    DXF / SVG'yi, settings sadece G-code'u etkiler.
+    """
+    compact = compact and fmt in ("dxf", "svg")
+    kind = fmt + ("-compact" if compact else "")
+    key = spec
+    if fmt == "gcode" and settings != DEFAULT_SETTINGS:
+        key = _RenderKey((spec.key, settings.key),
+                         f"{spec.digest}-{settings.digest}")
+    raw = cached_render(kind, key,
+                        lambda: _render(spec, fmt, compact, settings))
+    if encoding in (None, "identity"):
+        return raw
+    return cached_render(f"{kind}.{encoding}", key,
+                         lambda: compress(raw, encoding))
+
+
+# =========================
+# YARDIMCILAR
+# =========================
+
+def _error(message, status=400):
+    body = json.dumps({"error": message}, ensure_ascii=False)
+    return Response(body, status=status, mimetype="application/json")
+
+
+def _flag(name):
+    return request.args.get(name, "0").lower() not in ("", "0", "false", "no")
+
+
+def _gcode_settings():
+    # Sorgu parametrelerinden G-code ayarları; hatalıysa LabelSpecError
+    try:
+        return GcodeSettings.parse(request.args)
+    except ValueError as e:
+        raise LabelSpecError(str(e))
+
+
+def _cut_params():
+    # Sorgu parametrelerinden kesim analizi parametreleri
+    try:
+        return CutParams.parse(request.args)
+    except ValueError as e:
+        raise LabelSpecError(str(e))
+
+
+def _conditional(resp):
+    """
+    If-None-Match ETag'le eşleşirse 304 döner. make_conditional sadece
+    GET / HEAD'e baktığı için POST uçlarında (aynı gövde -> aynı çıktı)
+    eşleşme elle kontrol edilir.
+    """
+    etag, _ = resp.get_etag()
+    if etag and request.if_none_match.contains(etag):
+        resp.status_code = 304
+        return resp
+    return resp.make_conditional(request)
+
+
+def _negotiate():
+    fmt = request.args.get("format")
+    if fmt:
+        return fmt if fmt in FORMATS else None
+    if not request.accept_mimetypes:
+        return "json"
+    best = request.accept_mimetypes.best_match(list(FORMATS.values()))
+    return _MIMETYPE_TO_FORMAT.get(best)
+
+
+# =========================
+# ROTALAR
+# =========================
+
+@api.route("/labels", methods=["POST"])
+def labels():
+    fmt = _negotiate()
+    if fmt is None:
+        return _error("Desteklenen türler: " + ", ".join(FORMATS.values()), 406)
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return _error("Gövde bir JSON nesnesi olmalı.")
+
+    try:
+        with timed("parse"):
+            spec = g.spec = LabelSpec.parse(data)
+            settings = _gcode_settings() if fmt == "gcode" else DEFAULT_SETTINGS
+    except LabelSpecError as e:
+        return _error(e.message)
+
+    compact = _flag("compact") and fmt in ("dxf", "svg")
+    body = label_body(spec, fmt, compact=compact, settings=settings)
+    encoding = negotiate(request.accept_encodings, len(body))
+    if encoding is not None:
+        body = label_body(spec, fmt, encoding, compact, settings)
+
+    resp = Response(body, mimetype=FORMATS[fmt])
+    resp.vary.update(("Accept", "Accept-Encoding"))
+    if encoding is not None:
+        resp.headers["Content-Encoding"] = encoding
+    if fmt in ("dxf", "gcode"):
+        resp.headers["Content-Disposition"] = (
+            f'attachment; filename="eticad_{spec.digest}.{fmt}"'
+        )
+
+    etag = f"{spec.digest}-{fmt}" + ("-c" if compact else "")
+    if settings != DEFAULT_SETTINGS:
+        etag += f"-{settings.digest}"
+    etag += ETAG_SUFFIX.get(encoding, "")
+    resp.set_etag(etag)
+    return _conditional(resp)
+
+
+@api.route("/labels/analysis", methods=["POST"])
+def labels_analysis():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return _error("Gövde bir JSON nesnesi olmalı.")
+
+    try:
+        with timed("parse"):
+            spec = g.spec = LabelSpec.parse(data)
+            params = _cut_params()
+    except LabelSpecError as e:
+        return _error(e.message)
+
+    with timed("layout"):
+        layout = spec.layout()
+    with timed("analysis"):
+        analysis = spec.analyze(layout, params)
+    with timed("validate"):
+        warnings = spec.validate(layout)
+
+    body = analysis.to_dict()
+    body["summary"] = analysis.summary()
+    body["warnings"] = [w.to_dict() for w in warnings]
+    return Response(json.dumps(body, ensure_ascii=False),
+                    mimetype="application/json")
+
+
+# =========================
+# TOPLU DIŞA AKTARIM
+# =========================
+
+def batch_member_name(index, spec, fmt):
+    """
+    ZIP üyesi adı: 00001_ETICAD.dxf (sıra numarası + ilk dolu satır).
+    """
+    slug = _NAME_UNSAFE.sub("_", spec.line1.strip() or spec.line2.strip())
+    slug = slug.strip("_")[:40] or "etiket"
+    return f"{index + 1:05d}_{slug}.{fmt}"
+
+
+def _batch_member(spec, fmt, compact, settings=DEFAULT_SETTINGS):
+    # İş parçacığı havuzunda çalışır; istek bağlamı ve önbellek yok
+    layout = spec.layout()
+    if fmt == "dxf":
+        return spec.to_dxf(layout, compact)
+    if fmt == "gcode":
+        return spec.to_gcode(layout, settings)
+    return spec.to_svg(layout, compact)
+
+
+def _template_member(template, spec, fmt, compact, settings=DEFAULT_SETTINGS):
+    # _batch_member gibi, ama yerleşim ve DXF şablonun önbelleğinden
+    layout = template.layout((spec.line1, spec.line2))
+    if fmt == "dxf":
+        return template.to_dxf(layout, compact)
+    if fmt == "gcode":
+        return spec.to_gcode(layout, settings)
+    return spec.to_svg(layout, compact)
+
+
+def dedupe_batch(specs, fmt, build):
+    """
+    Satırları kanonik anahtara (spec.key) göre gruplar; (üyeler, kullanım
+    sayıları, manifest) döner. Üyeler iter_zip'e (ad, payload, anahtar)
+    olarak verilir: her farklı etiket için sadece ilk satırın payload'u
+    (build(spec)) üretilir, tekrarlar onun sıkıştırılmış verisini paylaşır.
+    """
+    uses = Counter(spec.key for spec in specs)
+    first = {}
+    members = []
+    rows = []
+    for i, spec in enumerate(specs):
+        name = batch_member_name(i, spec, fmt)
+        source = first.setdefault(spec.key, name)
+        row = {"name": name, "digest": spec.digest}
+        if source == name:
+            members.append((name, partial(build, spec), spec.key))
+        else:
+            row["same_as"] = source
+            members.append((name, None, spec.key))
+        rows.append(row)
+
+    manifest = {
+        "labels": len(specs),
+        "unique": len(uses),
+        # tekrar olduğu için üretilmeyen satırların oranı
+        "dedupe_ratio": round(1.0 - len(uses) / len(specs), 4),
+        "members": rows,
+    }
+    return members, uses, manifest
+
+
+def batch_manifest(manifest, specs, layout, params):
+    """
+    Manifeste satır başına kesim analizini, çakışma uyarılarını ve
+    toplamı ekleyip JSON olarak döner. Her farklı etiket bir kez
+    analiz / denetlenir; layout(spec) yerleşimi verir. ZIP'in son üyesi
+    olarak havuzda, üyelerle birlikte çalışır.
+    """
+    results = {}
+    rows = []
+    flagged = 0
+    for row, spec in zip(manifest["members"], specs):
+        result = results.get(spec.key)
+        if result is None:
+            seg = layout(spec)
+            result = results[spec.key] = (
+                spec.analyze(seg, params),
+                [w.to_dict() for w in spec.validate(seg)],
+            )
+        analysis, warnings = result
+        row["analysis"] = analysis.to_dict()
+        if warnings:
+            row["warnings"] = warnings
+            flagged += 1
+        rows.append(analysis)
+    manifest["analysis"] = combine(rows).to_dict()
+    manifest["warnings"] = flagged
+    return json.dumps(manifest, ensure_ascii=False, indent=1)
+
+
+def _template_layout(template, spec):
+    return template.layout((spec.line1, spec.line2))
+
+
+def parse_batch(data):
+    """
+    {"labels": [...]} gövdesini LabelSpec listesine çevirir; hatalı
+    etiket LabelSpecError olarak, sırası mesajda belirtilerek bildirilir.
+    """
+    items = data.get("labels") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise LabelSpecError('Gövde {"labels": [...]} biçiminde olmalı.')
+    if len(items) > MAX_BATCH:
+        raise LabelSpecError(f"En fazla {MAX_BATCH} etiket gönderilebilir.")
+
+    specs = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise LabelSpecError(f"labels[{i}]: bir JSON nesnesi olmalı.")
+        try:
+            specs.append(LabelSpec.parse(item))
+        except LabelSpecError as e:
+            raise LabelSpecError(f"labels[{i}]: {e.message}", e.values)
+    return specs
+
+
+@api.route("/labels/batch", methods=["POST"])
+def labels_batch():
+    fmt = request.args.get("format", "dxf")
+    if fmt not in BATCH_FORMATS:
+        return _error("Toplu dışa aktarım türleri: " + ", ".join(BATCH_FORMATS))
+
+    data = request.get_json(silent=True)
+    compact = _flag("compact")
+    try:
+        with timed("parse"):
+            settings = _gcode_settings() if fmt == "gcode" else DEFAULT_SETTINGS
+            params = _cut_params()
+            if isinstance(data, dict) and "template" in data:
+                series = TemplateSpec.parse(data)
+                template = series.compile()
+                specs = [spec for _, spec in series.iter_labels(template)]
+                build = partial(_template_member, template, fmt=fmt,
+                                compact=compact, settings=settings)
+                layout = partial(_template_layout, template)
+            else:
+                specs = parse_batch(data)
+                build = partial(_batch_member, fmt=fmt, compact=compact,
+                                settings=settings)
+                layout = LabelSpec.layout
+    except LabelSpecError as e:
+        return _error(e.message)
+
+    members, uses, manifest = dedupe_batch(specs, fmt, build)
+    record_batch(manifest["labels"], manifest["unique"])
+    members.append((BATCH_MANIFEST,
+                    partial(batch_manifest, manifest, specs, layout, params)))
+
+    resp = Response(iter_zip(members, uses=uses), mimetype="application/zip")
+    resp.headers["Content-Disposition"] = (
+        f'attachment; filename="eticad_{len(specs)}_etiket.zip"'
+    )
+    resp.headers["X-Eticad-Labels"] = str(manifest["labels"])
+    resp.headers["X-Eticad-Unique"] = str(manifest["unique"])
+    return resp
+
+
+# =========================
+# IZGARA (ÇOKLU KOPYA)
+# =========================
+
+def _render_sheet(spec, sheet, compact):
+    with timed("layout"):
+        layout = spec.layout()
+    with timed("dxf"):
+        body = sheet.to_dxf(spec, layout, compact).encode("utf-8")
+    record_label("dxf", layout, len(body))
+    return body
+
+
+def sheet_body(spec, sheet, encoding="identity", compact=False):
+    """
+    Izgara DXF'ini önbellekten döner; label_body gibi sıkıştırılmış hali
+    de önbellekte tutulur.
+    """
+    kind = "sheet" + ("-compact" if compact else "")
+    key = _RenderKey((spec.key, sheet.key), f"{spec.digest}-{sheet.digest}")
+    raw = cached_render(kind, key, lambda: _render_sheet(spec, sheet, compact))
+    if encoding in (None, "identity"):
+        return raw
+    return cached_render(f"{kind}.{encoding}", key,
+                         lambda: compress(raw, encoding))
+
+
+@api.route("/labels/sheet", methods=["POST"])
+def labels_sheet():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return _error("Gövde bir JSON nesnesi olmalı.")
+
+    try:
+        with timed("parse"):
+            spec = g.spec = LabelSpec.parse(data)
+            sheet = SheetSpec.parse(data, spec)
+    except LabelSpecError as e:
+        return _error(e.message)
+
+    compact = _flag("compact")
+    body = sheet_body(spec, sheet, compact=compact)
+    encoding = negotiate(request.accept_encodings, len(body))
+    if encoding is not None:
+        body = sheet_body(spec, sheet, encoding, compact)
+
+    resp = Response(body, mimetype=FORMATS["dxf"])
+    resp.vary.add("Accept-Encoding")
+    if encoding is not None:
+        resp.headers["Content-Encoding"] = encoding
+    resp.headers["Content-Disposition"] = (
+        f'attachment; filename="eticad_{spec.digest}_{sheet.quantity}x.dxf"'
+    )
+    resp.set_etag(f"{spec.digest}-{sheet.digest}-dxf"
+                  + ("-c" if compact else "") + ETAG_SUFFIX.get(encoding, ""))
+    return _conditional(resp)
+
@@ -0,0 +1,77 @@
+"""
+Süreç içi, iş parçacığı güvenli LRU önbellek.
+
+Önizleme SVG'leri, DXF çıktıları ve API yanıtları LabelSpec.key
+(ve çıktı türü) ile anahtarlanıp burada tutulur.
+"""
+
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from eticad_metrics import record_cache
+from eticad_singleflight import flight
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+# (tür, spec.key) -> üretilmiş çıktı (bytes)
+renders = LRUCache(maxsize=1024)
+
+# True iken önbellek ve single-flight atlanır (profil alırken gerçek işi ölçmek için)
+bypass_cache = ContextVar("bypass_cache", default=False)
+
+
+def cached_render(kind, spec, factory):
+    """
+    Önbellekte yoksa factory()'yi single-flight üzerinden çalıştırır:
+    aynı etiket için eş zamanlı istekler işi bir kez yapar.
+    """
+    if bypass_cache.get():
+        return factory()
+
+    key = (kind, spec.key)
+    value = renders.get(key, _MISSING)
+    record_cache(kind, value is not _MISSING)
+    if value is _MISSING:
+        value = flight.do(f"{kind}-{spec.digest}", factory)
+        renders.put(key, value)
+    return value
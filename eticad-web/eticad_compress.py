@@ -0,0 +1,142 @@
+"""
+Yanıt sıkıştırma: gzip ve (brotli paketi kuruluysa) br.
+
+HTML, SVG, DXF, G-code ve JSON yanıtları Accept-Encoding'e göre
+sıkıştırılır; MIN_BYTES'tan küçük gövdelere dokunulmaz. Zaten
+Content-Encoding taşıyan yanıtlar (önbellekten önceden sıkıştırılmış
+gelenler) olduğu gibi geçer; böylece tekrar eden isteklerde sıkıştırma
+maliyeti sıfırdır.
+
+Akışlı (chunked) yanıtlar parça parça sıkıştırılır; Content-Length
+bilinmediği için gövde bellekte toplanmaz.
+
+Kullanım:
+    install(app)   # diğer after_request kancalarından SONRA çağırın
+"""
+
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli isteğe bağlı; yoksa sadece gzip
+    brotli = None
+
+from eticad_metrics import timed
+
+# Bundan küçük gövdeleri sıkıştırmaya değmez
+MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Süreç başına bir kez sıkıştırılan gövdeler (açılış sayfası) için en iyisi
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 11
+
+COMPRESSIBLE = {
+    "text/html",
+    "image/svg+xml",
+    "application/dxf",
+    "application/json",
+    "text/x-gcode",
+}
+
+# Tercih sırası; aynı q değerinde önce gelen seçilir
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Kodlamaya özgü ETag soneki (aynı ETag iki farklı gövdeye verilmesin)
+ETAG_SUFFIX = {"gzip": "-gz", "br": "-br"}
+
+
+def negotiate(accept_encodings, size=None):
+    """
+    Accept-Encoding'e (werkzeug MIMEAccept/Accept nesnesi) göre "br",
+    "gzip" veya None döner. size verilirse MIN_BYTES altında None.
+    """
+    if size is not None and size < MIN_BYTES:
+        return None
+    best, best_q = None, 0
+    for encoding in ENCODINGS:
+        q = accept_encodings[encoding]
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data, encoding, best=False):
+    """
+    best=True: bir kez sıkıştırılıp çok kez sunulan gövdeler için en
+    yüksek seviye (gzip 9, brotli 11).
+    """
+    with timed("compress"):
+        if encoding == "gzip":
+            level = PRECOMPRESS_GZIP_LEVEL if best else GZIP_LEVEL
+            return gzip.compress(data, compresslevel=level, mtime=0)
+        if encoding == "br":
+            quality = PRECOMPRESS_BROTLI_QUALITY if best else BROTLI_QUALITY
+            return brotli.compress(data, quality=quality)
+    raise ValueError(f"Bilinmeyen kodlama: {encoding}")
+
+
+def compress_stream(chunks, encoding):
+    """
+    Bayt parçalarını sıkıştırarak akıtır (chunked yanıtlar için).
+    """
+    if encoding == "gzip":
+        c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        process, finish = c.compress, c.flush
+    elif encoding == "br":
+        c = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, finish = c.process, c.finish
+    else:
+        raise ValueError(f"Bilinmeyen kodlama: {encoding}")
+
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        out = process(chunk)
+        if out:
+            yield out
+    yield finish()
+
+
+# =========================
+# FLASK KANCASI
+# =========================
+
+def _compress_response(resp):
+    from flask import request
+
+    if (resp.mimetype not in COMPRESSIBLE
+            or resp.status_code < 200 or resp.status_code in (204, 304)):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    if "Content-Encoding" in resp.headers or resp.direct_passthrough:
+        return resp
+
+    if resp.is_streamed:
+        encoding = negotiate(request.accept_encodings)
+        if encoding is None:
+            return resp
+        resp.response = compress_stream(resp.response, encoding)
+        resp.headers.pop("Content-Length", None)
+    else:
+        data = resp.get_data()
+        encoding = negotiate(request.accept_encodings, len(data))
+        if encoding is None:
+            return resp
+        resp.set_data(compress(data, encoding))
+
+    resp.headers["Content-Encoding"] = encoding
+    etag, weak = resp.get_etag()
+    if etag:
+        resp.set_etag(etag + ETAG_SUFFIX[encoding], weak)
+    return resp
+
+
+def install(app):
+    """
+    Sıkıştırmayı after_request kancası olarak ekler. Flask kancaları ters
+    sırada çalıştırdığı için bunu en son kaydetmek, sıkıştırmanın süre /
+    boyut ölçen kancalardan önce çalışmasını sağlar.
+    """
+    app.after_request(_compress_response)
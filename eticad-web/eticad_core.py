@@ -1,9 +1,20 @@
 import os
+import re
+import string
 import sys
 import importlib.util
+from array import array
 
 LETTER_SPACING_FACTOR = 0.1
 
+# Montaj delikleri: Ø6.5 mm, kenarlardan 8 mm içeride
+HOLE_RADIUS = 3.25
+HOLE_OFFSET = 8.0
+
+# Kompakt çıktıda korunan ondalık basamak (normal çıktıdaki .4f / .2f ile aynı)
+DXF_PRECISION = 4
+SVG_PRECISION = 2
+
 
 def app_dir():
     """Programın çalıştığı klasör (exe veya .py)."""
@@ -13,7 +24,7 @@ def app_dir():
         return os.path.dirname(os.path.abspath(__file__))
 
 
-def load_glyphs():
+def load_glyph_library():
     """
     glyph_kutuphane.py içinden GLYPHS sözlüğünü yükler.
     """
@@ -30,9 +41,111 @@ def load_glyphs():
     raise RuntimeError("glyph_kutuphane.py bulunamadı.")
 
 
+def load_glyphs():
+    """
+    ETICAD_GLYPH_STORE tanımlıysa glyph'leri paylaşılan bellekten /
+    mmap dosyasından (kopyasız) bağlar, yoksa glyph_kutuphane.py'yi yükler.
+    """
+    location = os.environ.get("ETICAD_GLYPH_STORE", "").strip()
+    if location:
+        from eticad_glyph_store import open_store
+        try:
+            return open_store(location)
+        except Exception as e:
+            raise RuntimeError(f"Glyph deposu açılamadı ({location}): {e}")
+
+    return load_glyph_library()
+
+
 GLYPHS = load_glyphs()
 
 
+# =========================
+# KOMPAKT SEGMENT DİZİSİ
+# =========================
+
+class SegmentBuffer:
+    """
+    Segmentleri düz bir array('d') içinde tutar: x1, y1, x2, y2, x1, ...
+    Segment başına 32 bayt; ((x1, y1), (x2, y2)) tuple'larından oluşan
+    listenin ~200+ baytı yerine. Gezildiğinde yine ((x1, y1), (x2, y2))
+    verdiği için liste bekleyen kod değişmeden çalışır; indeksleme ve
+    birleştirme (+) de listedeki gibidir, birleştirme liste döner.
+
+    dx, dy: ertelenmiş öteleme. Koordinatlara dokunulmaz; öteleme ancak
+    gezilirken (yazıcı serileştirirken) uygulanır.
+    """
+
+    __slots__ = ("coords", "dx", "dy")
+
+    def __init__(self, coords=None, dx=0.0, dy=0.0):
+        self.coords = coords if coords is not None else array("d")
+        self.dx = dx
+        self.dy = dy
+
+    def __len__(self):
+        return len(self.coords) // 4
+
+    def __bool__(self):
+        return len(self.coords) > 0
+
+    def __iter__(self):
+        for x1, y1, x2, y2 in self.iter_flat():
+            yield (x1, y1), (x2, y2)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("segment indeksi aralık dışında")
+        c = self.coords
+        i = index * 4
+        dx, dy = self.dx, self.dy
+        return (c[i] + dx, c[i + 1] + dy), (c[i + 2] + dx, c[i + 3] + dy)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return f"SegmentBuffer({len(self)} segment)"
+
+    def copy(self):
+        return SegmentBuffer(array("d", self.coords), self.dx, self.dy)
+
+    def iter_flat(self):
+        c = self.coords
+        dx, dy = self.dx, self.dy
+        for i in range(0, len(c), 4):
+            yield c[i] + dx, c[i + 1] + dy, c[i + 2] + dx, c[i + 3] + dy
+
+    def x_range(self):
+        xs = self.coords[0::2]
+        return min(xs) + self.dx, max(xs) + self.dx
+
+    def translate(self, dx, dy):
+        """
+        Ötelemeyi erteler (O(1)); koordinatlar değişmez.
+        """
+        self.dx += dx
+        self.dy += dy
+
+
+def iter_flat(segments):
+    """
+    SegmentBuffer veya ((x1, y1), (x2, y2)) listesini (x1, y1, x2, y2)
+    olarak gezdirir; yazıcılar iki biçimi de bununla okur.
+    """
+    if isinstance(segments, (SegmentBuffer, TextGeometry)):
+        return segments.iter_flat()
+    return ((x1, y1, x2, y2) for (x1, y1), (x2, y2) in segments)
+
+
 # =========================
 # ÖZEL KARAKTERLER: . : -
 # =========================
@@ -103,45 +216,224 @@ def build_special_glyph(ch, height_mm, cursor_x):
 # METNİ SEGMENTLERE ÇEVİRME
 # =========================
 
-def build_text_segments(text, height_mm):
-    segments = []
-    cursor_x = 0.0
+_GLYPH_METRICS = {}
 
-    for ch in text:
-        if ch == " ":
-            cursor_x += height_mm * 0.5
-            continue
 
-        if ch in [".", ":", "-"]:
-            sp_segs, adv = build_special_glyph(ch, height_mm, cursor_x)
-            segments.extend(sp_segs)
-            cursor_x += adv
-            continue
+def glyph_metrics(ch):
+    """
+    GLYPHS'teki bir glyph için (düz koordinatlar, sınır kutusu) döner.
+    Koordinatlar [x1, y1, x2, y2, ...] (glyph birimlerinde); glyph deposu
+    kullanılıyorsa kopyalanmadan g.coords'tan alınır. Sınır kutusu
+    (minx, miny, maxx, maxy), segment yoksa None. Süreç başına bir kez
+    hesaplanıp saklanır.
+    """
+    try:
+        return _GLYPH_METRICS[ch]
+    except KeyError:
+        pass
+    g = GLYPHS[ch]
+    coords = getattr(g, "coords", None)
+    if coords is None:
+        coords = array("d")
+        for (x1, y1), (x2, y2) in g["segments"]:
+            coords.extend((x1, y1, x2, y2))
+    if len(coords):
+        xs = coords[0::2]
+        ys = coords[1::2]
+        bounds = (min(xs), min(ys), max(xs), max(ys))
+    else:
+        bounds = None
+    _GLYPH_METRICS[ch] = (coords, bounds)
+    return coords, bounds
 
-        if ch not in GLYPHS:
-            # bilinmeyen karakteri atla
-            continue
 
-        g = GLYPHS[ch]
-        gh = g["height"] or 1.0
-        scale = height_mm / gh
-        spacing = height_mm * LETTER_SPACING_FACTOR
+class TextGeometry:
+    """
+    Bir yazı satırının tembel geometrisi.
 
-        for (x1, y1), (x2, y2) in g["segments"]:
-            sx1 = x1 * scale + cursor_x
-            sy1 = y1 * scale
-            sx2 = x2 * scale + cursor_x
-            sy2 = y2 * scale
-            segments.append(((sx1, sy1), (sx2, sy2)))
+    Koordinatları üretmek yerine glyph yerleşimlerini tutar:
+    runs = [(coords, scale, ox), ...]; coords glyph'in paylaşılan düz
+    koordinatlarıdır, nokta (x * scale + ox, y * scale) olarak yerleşir.
+    Özel karakterlerde (. : -) coords zaten mm cinsindendir ve scale None'dır.
+    Satırın ötelemesi (dx, dy) bunların üzerine uygulanır.
+
+    Koordinatlar ancak gezilirken (yazıcı serileştirirken) hesaplanır;
+    sınır kutusu ise şekillendirme sırasında glyph metriklerinden gelir.
+    """
+
+    __slots__ = ("runs", "dx", "dy", "count", "_bounds")
+
+    def __init__(self):
+        self.runs = []
+        self.dx = 0.0
+        self.dy = 0.0
+        self.count = 0
+        self._bounds = None
+
+    @classmethod
+    def shape(cls, text, height_mm):
+        """
+        Metni şekillendirir (baseline 0, sol kenar 0).
+        """
+        geom = cls()
+        geom.extend(text, height_mm)
+        return geom
+
+    def extend(self, text, height_mm, cursor_x=0.0):
+        """
+        Metni cursor_x'ten başlayarak satırın sonuna şekillendirir ve yeni
+        imleç konumunu döner. Önceden şekillendirilmiş bir önekin kopyasını
+        uzatmak, tüm metni baştan şekillendirmekle aynı sonucu verir.
+        """
+        runs = self.runs
+        count = self.count
+        if self._bounds is None:
+            minx = miny = maxx = maxy = None
+        else:
+            minx, miny, maxx, maxy = self._bounds
+
+        for ch in text:
+            if ch == " ":
+                cursor_x += height_mm * 0.5
+                continue
+
+            if ch in [".", ":", "-"]:
+                sp_segs, adv = build_special_glyph(ch, height_mm, cursor_x)
+                if sp_segs:
+                    coords = array("d")
+                    for (x1, y1), (x2, y2) in sp_segs:
+                        coords.extend((x1, y1, x2, y2))
+                    runs.append((coords, None, 0.0))
+                    count += len(sp_segs)
+                    xs = coords[0::2]
+                    ys = coords[1::2]
+                    lo_x, lo_y, hi_x, hi_y = min(xs), min(ys), max(xs), max(ys)
+                    if minx is None:
+                        minx, miny, maxx, maxy = lo_x, lo_y, hi_x, hi_y
+                    else:
+                        minx, miny = min(minx, lo_x), min(miny, lo_y)
+                        maxx, maxy = max(maxx, hi_x), max(maxy, hi_y)
+                cursor_x += adv
+                continue
+
+            if ch not in GLYPHS:
+                # bilinmeyen karakteri atla
+                continue
+
+            g = GLYPHS[ch]
+            gh = g["height"] or 1.0
+            scale = height_mm / gh
+            spacing = height_mm * LETTER_SPACING_FACTOR
+
+            coords, bounds = glyph_metrics(ch)
+            if bounds is not None:
+                runs.append((coords, scale, cursor_x))
+                count += len(coords) // 4
+                # ölçek > 0 ve yuvarlama monoton olduğundan uç noktalar,
+                # gezilirken üretilecek koordinatların min/max'ıyla aynıdır
+                lo_x = bounds[0] * scale + cursor_x
+                hi_x = bounds[2] * scale + cursor_x
+                lo_y = bounds[1] * scale
+                hi_y = bounds[3] * scale
+                if minx is None:
+                    minx, miny, maxx, maxy = lo_x, lo_y, hi_x, hi_y
+                else:
+                    minx, miny = min(minx, lo_x), min(miny, lo_y)
+                    maxx, maxy = max(maxx, hi_x), max(maxy, hi_y)
+
+            cursor_x += g["width"] * scale + spacing
+
+        self.count = count
+        if minx is not None:
+            self._bounds = (minx, miny, maxx, maxy)
+        return cursor_x
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        for x1, y1, x2, y2 in self.iter_flat():
+            yield (x1, y1), (x2, y2)
+
+    def __repr__(self):
+        return f"TextGeometry({self.count} segment)"
+
+    def iter_flat(self):
+        dx, dy = self.dx, self.dy
+        for c, scale, ox in self.runs:
+            it = iter(c)
+            if scale is None:
+                for x1, y1, x2, y2 in zip(it, it, it, it):
+                    yield x1 + dx, y1 + dy, x2 + dx, y2 + dy
+            else:
+                for x1, y1, x2, y2 in zip(it, it, it, it):
+                    yield ((x1 * scale + ox) + dx, y1 * scale + dy,
+                           (x2 * scale + ox) + dx, y2 * scale + dy)
+
+    def bounds(self):
+        """
+        Ötelenmiş sınır kutusu (minx, miny, maxx, maxy); boşsa None.
+        """
+        if self._bounds is None:
+            return None
+        minx, miny, maxx, maxy = self._bounds
+        dx, dy = self.dx, self.dy
+        return minx + dx, miny + dy, maxx + dx, maxy + dy
+
+    def x_range(self):
+        minx, _, maxx, _ = self._bounds
+        return minx + self.dx, maxx + self.dx
+
+    def translate(self, dx, dy):
+        self.dx += dx
+        self.dy += dy
+
+    def copy(self):
+        out = TextGeometry()
+        out.runs = list(self.runs)
+        out.dx = self.dx
+        out.dy = self.dy
+        out.count = self.count
+        out._bounds = self._bounds
+        return out
+
+    def materialize(self):
+        """
+        Koordinatları hesaplanmış bir SegmentBuffer döner (öteleme dx/dy
+        olarak taşınır).
+        """
+        coords = array("d")
+        add = coords.extend
+        for c, scale, ox in self.runs:
+            if scale is None:
+                add(c)
+            else:
+                it = iter(c)
+                for x1, y1, x2, y2 in zip(it, it, it, it):
+                    add((x1 * scale + ox, y1 * scale, x2 * scale + ox, y2 * scale))
+        return SegmentBuffer(coords, self.dx, self.dy)
 
-        cursor_x += g["width"] * scale + spacing
 
-    return segments
+def build_text_segments(text, height_mm):
+    """
+    Metni SegmentBuffer olarak döner (baseline 0, sol kenar 0).
+    """
+    return TextGeometry.shape(text, height_mm).materialize()
 
 
 def center_horizontal(segments, cx):
+    """
+    Segmentleri x'te cx etrafında ortalanmış yeni bir kopya olarak döner.
+    """
     if not segments:
         return []
+    if isinstance(segments, (SegmentBuffer, TextGeometry)):
+        shifted = segments.copy()
+        _center_in_place(shifted, cx)
+        return shifted
     xs = []
     for (x1, y1), (x2, y2) in segments:
         xs.extend([x1, x2])
@@ -153,30 +445,62 @@ def center_horizontal(segments, cx):
     return shifted
 
 
+def _center_in_place(segments, cx):
+    minx, maxx = segments.x_range()
+    segments.dx += cx - (minx + maxx) / 2.0
+
+
 # =========================
 # ETİKET YERLEŞİMİ
 # =========================
 
+def _shape_centered(text, h, cx):
+    """
+    Satırı tembel geometri olarak şekillendirir; ortalama ötelemesi
+    koordinatlara yazılmaz, dx'e eklenir.
+    """
+    geom = TextGeometry.shape(text, h)
+    if geom:
+        minx, maxx = geom.x_range()
+        geom.dx = cx - (minx + maxx) / 2.0
+    return geom
+
+
 def layout_label(width, height, line1, h1, line2, h2):
+    """
+    İki satırı yerleştirip (seg1, seg2) segment listelerini döner; her
+    segment ((x1, y1), (x2, y2)). Yazıcılara verilecekse
+    layout_label_lazy daha ucuzdur, çıktı aynıdır.
+    """
+    seg1, seg2 = layout_label_lazy(width, height, line1, h1, line2, h2)
+    return list(seg1), list(seg2)
+
+
+def layout_label_lazy(width, height, line1, h1, line2, h2):
+    """
+    layout_label ile aynı yerleşim, (seg1, seg2) TextGeometry çifti olarak.
+    Her satır tek geçişte şekillendirilir (kapsam glyph metriklerinden
+    gelir); baseline + ortalama tek bir ertelenmiş öteleme (dx, dy) olarak
+    yazıcıda uygulanır. Koordinat dizisi gerekiyorsa materialize().
+    """
     cx = width / 2.0
 
-    seg1 = build_text_segments(line1, h1) if (line1.strip() and h1 > 0) else []
-    seg2 = build_text_segments(line2, h2) if (line2.strip() and h2 > 0) else []
+    seg1 = _shape_centered(line1, h1, cx) if (line1.strip() and h1 > 0) else TextGeometry()
+    seg2 = _shape_centered(line2, h2, cx) if (line2.strip() and h2 > 0) else TextGeometry()
+    _stack_lines(seg1, h1, seg2, h2, height)
+    return seg1, seg2
 
-    seg1_final = []
-    seg2_final = []
 
+def _stack_lines(seg1, h1, seg2, h2, height):
+    """
+    Satırların baseline'larını (dy) etiket yüksekliğine göre ayarlar:
+    tek satır dikeyde ortalanır, iki satır aralarında boşlukla istiflenir.
+    """
     if seg1 and not seg2:
-        baseline = height / 2.0 - h1 / 2.0
-        seg1_shift = [((x1, y1 + baseline), (x2, y2 + baseline))
-                      for (x1, y1), (x2, y2) in seg1]
-        seg1_final = center_horizontal(seg1_shift, cx)
+        seg1.dy = height / 2.0 - h1 / 2.0
 
     elif seg2 and not seg1:
-        baseline = height / 2.0 - h2 / 2.0
-        seg2_shift = [((x1, y1 + baseline), (x2, y2 + baseline))
-                      for (x1, y1), (x2, y2) in seg2]
-        seg2_final = center_horizontal(seg2_shift, cx)
+        seg2.dy = height / 2.0 - h2 / 2.0
 
     elif seg1 and seg2:
         gap = 0.2 * min(h1, h2)
@@ -189,149 +513,508 @@ def layout_label(width, height, line1, h1, line2, h2):
         baseline2 = margin
         baseline1 = margin + h2 + gap
 
-        seg1_shift = [((x1, y1 + baseline1), (x2, y2 + baseline1))
-                      for (x1, y1), (x2, y2) in seg1]
-        seg2_shift = [((x1, y1 + baseline2), (x2, y2 + baseline2))
-                      for (x1, y1), (x2, y2) in seg2]
+        seg1.dy = baseline1
+        seg2.dy = baseline2
 
-        seg1_final = center_horizontal(seg1_shift, cx)
-        seg2_final = center_horizontal(seg2_shift, cx)
 
-    return seg1_final, seg2_final
+# =========================
+# DELİKLER
+# =========================
+
+def hole_positions(width_mm, height_mm, hole_mode):
+    """
+    Delik merkezlerini (cx, cy, r) listesi olarak döner.
+    2: yanlarda ortada, 4: köşelerde, diğer değerler: delik yok.
+    """
+    r = HOLE_RADIUS
+    d = HOLE_OFFSET
+    if hole_mode == 2:
+        return [
+            (d, height_mm / 2.0, r),
+            (width_mm - d, height_mm / 2.0, r),
+        ]
+    if hole_mode == 4:
+        return [
+            (d, d, r),
+            (width_mm - d, d, r),
+            (d, height_mm - d, r),
+            (width_mm - d, height_mm - d, r),
+        ]
+    return []
 
 
 # =========================
 # DXF YAZICI
 # =========================
 
-def _dxf_add(lines, code, value):
-    lines.append(str(code))
-    lines.append(str(value))
-
-
-def build_single_dxf(width_mm, height_mm, seg1, seg2, hole_mode):
-    """
-    DXF içeriğini string olarak döner.
-    """
-    lines = []
-
-    def add_line(x1, y1, x2, y2):
-        _dxf_add(lines, 0, "LINE")
-        _dxf_add(lines, 8, "0")
-        _dxf_add(lines, 10, f"{x1:.4f}")
-        _dxf_add(lines, 20, f"{y1:.4f}")
-        _dxf_add(lines, 30, "0.0")
-        _dxf_add(lines, 11, f"{x2:.4f}")
-        _dxf_add(lines, 21, f"{y2:.4f}")
-        _dxf_add(lines, 31, "0.0")
-
-    def add_circle(cx, cy, r=3.25):
-        _dxf_add(lines, 0, "CIRCLE")
-        _dxf_add(lines, 8, "0")
-        _dxf_add(lines, 10, f"{cx:.4f}")
-        _dxf_add(lines, 20, f"{cy:.4f}")
-        _dxf_add(lines, 30, "0.0")
-        _dxf_add(lines, 40, f"{r:.4f}")
-
-    def add_segments(segs):
-        for (x1, y1), (x2, y2) in segs:
-            add_line(x1, y1, x2, y2)
-
-    def add_holes(mode):
-        if mode == 2:
-            cx1, cy1 = 8.0, height_mm / 2.0
-            cx2, cy2 = width_mm - 8.0, height_mm / 2.0
-            add_circle(cx1, cy1)
-            add_circle(cx2, cy2)
-        elif mode == 4:
-            cx1, cy1 = 8.0, 8.0
-            cx2, cy2 = width_mm - 8.0, 8.0
-            cx3, cy3 = 8.0, height_mm - 8.0
-            cx4, cy4 = width_mm - 8.0, height_mm - 8.0
-            add_circle(cx1, cy1)
-            add_circle(cx2, cy2)
-            add_circle(cx3, cy3)
-            add_circle(cx4, cy4)
-
-    # HEADER
-    _dxf_add(lines, 0, "SECTION")
-    _dxf_add(lines, 2, "HEADER")
-    _dxf_add(lines, 9, "$ACADVER")
-    _dxf_add(lines, 1, "AC1009")
-    _dxf_add(lines, 0, "ENDSEC")
-
-    # TABLES
-    _dxf_add(lines, 0, "SECTION")
-    _dxf_add(lines, 2, "TABLES")
-    _dxf_add(lines, 0, "ENDSEC")
+def _dxf_line(x1, y1, x2, y2):
+    return (f"0\nLINE\n8\n0\n10\n{x1:.4f}\n20\n{y1:.4f}\n30\n0.0\n"
+            f"11\n{x2:.4f}\n21\n{y2:.4f}\n31\n0.0")
+
+
+def _dxf_circle(cx, cy, r=HOLE_RADIUS):
+    return (f"0\nCIRCLE\n8\n0\n10\n{cx:.4f}\n20\n{cy:.4f}\n30\n0.0\n"
+            f"40\n{r:.4f}")
 
-    # ENTITIES
-    _dxf_add(lines, 0, "SECTION")
-    _dxf_add(lines, 2, "ENTITIES")
+
+_DXF_HEADER = "0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n0\nENDSEC"
+_DXF_TABLES = "0\nSECTION\n2\nTABLES\n0\nENDSEC"
+
+
+def _iter_label_entities(width_mm, height_mm, seg1, seg2, hole_mode,
+                         line, circle, ox=0.0, oy=0.0):
+    """
+    Tek etiketin entity'leri (kutu, yazılar, delikler), (ox, oy) kadar
+    ötelenmiş. Yazılar yeniden yerleştirilmez: tembel geometri / buffer
+    kopyasının ötelemesi değiştirilir.
+    """
+    x0, y0 = ox, oy
+    x1, y1 = ox + width_mm, oy + height_mm
 
     # Kutu
-    add_line(0, 0, width_mm, 0)
-    add_line(width_mm, 0, width_mm, height_mm)
-    add_line(width_mm, height_mm, 0, height_mm)
-    add_line(0, height_mm, 0, 0)
+    yield line(x0, y0, x1, y0)
+    yield line(x1, y0, x1, y1)
+    yield line(x1, y1, x0, y1)
+    yield line(x0, y1, x0, y0)
 
     # Yazılar
-    add_segments(seg1)
-    add_segments(seg2)
+    for segs in (seg1, seg2):
+        if ox or oy:
+            if isinstance(segs, (SegmentBuffer, TextGeometry)):
+                segs = segs.copy()
+                segs.translate(ox, oy)
+            else:
+                segs = [((a + ox, b + oy), (c + ox, d + oy))
+                        for a, b, c, d in iter_flat(segs)]
+        for sx1, sy1, sx2, sy2 in iter_flat(segs):
+            yield line(sx1, sy1, sx2, sy2)
 
     # Delikler
-    add_holes(hole_mode)
+    for cx, cy, r in hole_positions(width_mm, height_mm, hole_mode):
+        yield circle(cx + ox, cy + oy, r)
+
+
+def _compact_num(value, precision):
+    """
+    precision basamağa yuvarlanmış en kısa gösterim: 12.5000 -> 12.5,
+    3.0000 -> 3, -0.0000 -> 0.
+    """
+    text = f"{value:.{precision}f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def _compact_dxf_writers(precision):
+    """
+    Kompakt DXF için (line, circle) biçimlendiricileri: sondaki sıfırlar
+    atılır, isteğe bağlı Z kodları (30, 31; R12'de varsayılan 0) yazılmaz.
+    Sıcak yol olduğu için kırpma satır içi yapılır; (-0.00005, 0) aralığı
+    "-0" yazılır (sayısal olarak 0).
+    """
+    if precision < 1:
+        raise ValueError("Kompakt DXF için precision en az 1 olmalı.")
+    p = f".{precision}f"
+
+    def line(x1, y1, x2, y2):
+        return (f"0\nLINE\n8\n0\n10\n{f'{x1:{p}}'.rstrip('0').rstrip('.')}\n"
+                f"20\n{f'{y1:{p}}'.rstrip('0').rstrip('.')}\n"
+                f"11\n{f'{x2:{p}}'.rstrip('0').rstrip('.')}\n"
+                f"21\n{f'{y2:{p}}'.rstrip('0').rstrip('.')}")
+
+    def circle(cx, cy, r=HOLE_RADIUS):
+        return (f"0\nCIRCLE\n8\n0\n10\n{_compact_num(cx, precision)}\n"
+                f"20\n{_compact_num(cy, precision)}\n"
+                f"40\n{_compact_num(r, precision)}")
+
+    return line, circle
+
+
+def iter_single_dxf(width_mm, height_mm, seg1, seg2, hole_mode,
+                    compact=False, precision=DXF_PRECISION):
+    """
+    DXF içeriğini entity entity üretir; parçalar "\n" ile birleştirilince
+    build_single_dxf çıktısı elde edilir. Yazı koordinatları ara liste
+    kurulmadan doğrudan biçimlendiriciye akar.
+
+    compact=True: sayılar precision basamağa yuvarlanıp sondaki sıfırlar
+    atılır, Z kodları yazılmaz. Geometri normal çıktıyla (aynı precision)
+    birebir aynı sayılara ayrışır; dosya ~%20-25 küçülür.
+    """
+    if compact:
+        _line, _circle = _compact_dxf_writers(precision)
+    else:
+        _line, _circle = _dxf_line, _dxf_circle
+
+    yield _DXF_HEADER
+    yield _DXF_TABLES
+
+    # ENTITIES
+    yield "0\nSECTION\n2\nENTITIES"
+    yield from _iter_label_entities(width_mm, height_mm, seg1, seg2, hole_mode,
+                                    _line, _circle)
 
     # ENDSEC / EOF
-    _dxf_add(lines, 0, "ENDSEC")
-    _dxf_add(lines, 0, "EOF")
+    yield "0\nENDSEC\n0\nEOF"
+
+
+def build_single_dxf(width_mm, height_mm, seg1, seg2, hole_mode, compact=False):
+    """
+    DXF içeriğini string olarak döner (compact: bkz. iter_single_dxf).
+    """
+    return "\n".join(iter_single_dxf(width_mm, height_mm, seg1, seg2,
+                                     hole_mode, compact))
+
+
+# =========================
+# ÇOKLU KOPYA (IZGARA)
+# =========================
+
+SHEET_MODES = ("insert", "minsert", "explode")
+SHEET_BLOCK = "ETIKET"
+
+
+def grid_positions(width_mm, height_mm, rows, cols, gap_mm, quantity=None):
+    """
+    rows x cols ızgarada kopyaların sol alt köşeleri; sol alttan başlayıp
+    satır satır (x önce). quantity verilirse ilk quantity kopya.
+    """
+    count = rows * cols if quantity is None else min(quantity, rows * cols)
+    pitch_x = width_mm + gap_mm
+    pitch_y = height_mm + gap_mm
+    return [((i % cols) * pitch_x, (i // cols) * pitch_y) for i in range(count)]
+
+
+def iter_sheet_dxf(width_mm, height_mm, seg1, seg2, hole_mode,
+                   rows, cols, gap_mm, quantity=None, mode="insert",
+                   compact=False, precision=DXF_PRECISION):
+    """
+    Aynı etiketin rows x cols ızgarada (quantity kadar) kopyalarını içeren
+    DXF'i parça parça üretir. Etiket bir kez yerleştirilir (layout_label);
+    kopyalar yeniden hesaplanmaz:
+
+        insert   etiket bir BLOCK; her kopya tek satırlık bir INSERT
+                 (dosya ve süre kopya sayısıyla neredeyse sabit)
+        minsert  tam satırlar tek bir dizi INSERT'ü (70/71 adet, 44/45 aralık),
+                 eksik son satır ikinci bir dizi INSERT'ü
+        explode  blok yok; her kopya ötelenmiş entity'ler olarak yazılır
+                 (blok desteklemeyen kesim yazılımları için)
+    """
+    if mode not in SHEET_MODES:
+        raise ValueError(f"Bilinmeyen yerleşim türü: {mode}")
+    if compact:
+        _line, _circle = _compact_dxf_writers(precision)
+
+        def num(v):
+            return _compact_num(v, precision)
+        z = ""
+    else:
+        _line, _circle = _dxf_line, _dxf_circle
+
+        def num(v):
+            return f"{v:.4f}"
+        z = "\n30\n0.0"
+
+    count = rows * cols if quantity is None else min(quantity, rows * cols)
+    pitch_x = width_mm + gap_mm
+    pitch_y = height_mm + gap_mm
+
+    yield _DXF_HEADER
+    yield _DXF_TABLES
+
+    if mode != "explode":
+        yield "0\nSECTION\n2\nBLOCKS"
+        yield (f"0\nBLOCK\n8\n0\n2\n{SHEET_BLOCK}\n70\n0\n"
+               f"10\n{num(0.0)}\n20\n{num(0.0)}{z}\n3\n{SHEET_BLOCK}")
+        yield from _iter_label_entities(width_mm, height_mm, seg1, seg2,
+                                        hole_mode, _line, _circle)
+        yield "0\nENDBLK\n8\n0"
+        yield "0\nENDSEC"
+
+    yield "0\nSECTION\n2\nENTITIES"
+
+    if mode == "insert":
+        for ox, oy in grid_positions(width_mm, height_mm, rows, cols,
+                                     gap_mm, count):
+            yield (f"0\nINSERT\n8\n0\n2\n{SHEET_BLOCK}\n"
+                   f"10\n{num(ox)}\n20\n{num(oy)}{z}")
+
+    elif mode == "minsert":
+        full_rows, rest = divmod(count, cols)
+        arrays = []
+        if full_rows:
+            arrays.append((0.0, cols, full_rows))
+        if rest:
+            arrays.append((full_rows * pitch_y, rest, 1))
+        for oy, n_cols, n_rows in arrays:
+            yield (f"0\nINSERT\n8\n0\n2\n{SHEET_BLOCK}\n"
+                   f"10\n{num(0.0)}\n20\n{num(oy)}{z}\n"
+                   f"70\n{n_cols}\n71\n{n_rows}\n"
+                   f"44\n{num(pitch_x)}\n45\n{num(pitch_y)}")
 
-    return "\n".join(lines)
+    else:
+        for ox, oy in grid_positions(width_mm, height_mm, rows, cols,
+                                     gap_mm, count):
+            yield from _iter_label_entities(width_mm, height_mm, seg1, seg2,
+                                            hole_mode, _line, _circle, ox, oy)
+
+    yield "0\nENDSEC\n0\nEOF"
+
+
+def build_sheet_dxf(width_mm, height_mm, seg1, seg2, hole_mode,
+                    rows, cols, gap_mm, quantity=None, mode="insert",
+                    compact=False):
+    """
+    Izgara DXF'ini string olarak döner (bkz. iter_sheet_dxf).
+    """
+    return "\n".join(iter_sheet_dxf(width_mm, height_mm, seg1, seg2, hole_mode,
+                                    rows, cols, gap_mm, quantity, mode, compact))
+
+
+# =========================
+# ŞABLON ETİKETLER ({seq:04d})
+# =========================
+
+TEMPLATE_FIELDS = ("seq",)
+# Biçimdeki genişlik / hassasiyet sınırı ({seq:0999999d} her kopyada
+# dev bir metin üretmesin)
+MAX_FORMAT_WIDTH = 12
+
+_FORMAT_NUMBER = re.compile(r"\d+")
+
+_FORMATTER = string.Formatter()
+
+
+class TextTemplate:
+    """
+    Yer tutuculu bir yazı satırı: "PUMP-{seq:04d}".
+
+    İlk yer tutucudan önceki sabit önek bir kez şekillendirilir; her
+    kopyada önekin geometrisi kopyalanıp sadece değişen kısım (ve ondan
+    sonrası) eklenir. Sonuç, metni baştan şekillendirmekle birebir aynıdır.
+    """
+
+    __slots__ = ("text", "height", "static", "prefix", "_prefix", "_cursor")
+
+    def __init__(self, text, height_mm):
+        try:
+            parts = list(_FORMATTER.parse(text))
+        except ValueError as e:
+            raise ValueError(f"Geçersiz şablon: {text!r} ({e})")
+        fields = [name for _, name, _, _ in parts if name is not None]
+        for name in fields:
+            if name not in TEMPLATE_FIELDS:
+                raise ValueError(
+                    f"Bilinmeyen yer tutucu {{{name}}}; kullanılabilenler: "
+                    + ", ".join(f"{{{f}}}" for f in TEMPLATE_FIELDS))
+        for _, name, spec, _ in parts:
+            if name is None or not spec:
+                continue
+            if "{" in spec:
+                raise ValueError(f"Geçersiz şablon: {text!r} (iç içe yer tutucu)")
+            if any(int(n) > MAX_FORMAT_WIDTH for n in _FORMAT_NUMBER.findall(spec)):
+                raise ValueError(
+                    f"Geçersiz şablon: {text!r} (genişlik / hassasiyet en fazla "
+                    f"{MAX_FORMAT_WIDTH})")
+        self.height = height_mm
+        self.static = not fields
+        if self.static:
+            # {{ }} kaçışları çözülmüş sabit metin
+            self.text = self.prefix = "".join(lit for lit, _, _, _ in parts)
+        else:
+            self.text = text
+            self.prefix = parts[0][0]
+            # biçim hatalarını ({seq:q}) ilk kopyada değil burada yakala
+            self.render(**{name: 0 for name in TEMPLATE_FIELDS})
+        self._prefix = TextGeometry()
+        self._cursor = self._prefix.extend(self.prefix, height_mm)
+
+    def render(self, **values):
+        if self.static:
+            return self.text
+        try:
+            return self.text.format(**values)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Geçersiz şablon: {self.text!r} ({e})")
+
+    def shared_runs(self, geom):
+        """
+        geom'un sabit önekle paylaştığı baştaki run sayısı (shape() önek
+        kopyasını uzattıysa önekin tüm run'ları, aksi halde 0).
+        """
+        n = len(self._prefix.runs)
+        if n and len(geom.runs) >= n and geom.runs[n - 1] is self._prefix.runs[n - 1]:
+            return n
+        return 0
+
+    def shape(self, text):
+        """
+        render() ile üretilmiş metni şekillendirir (baseline 0, sol kenar 0).
+        """
+        if not text.startswith(self.prefix):
+            return TextGeometry.shape(text, self.height)
+        geom = self._prefix.copy()
+        if len(text) > len(self.prefix):
+            geom.extend(text[len(self.prefix):], self.height, self._cursor)
+        return geom
+
+
+class LabelTemplate:
+    """
+    Aynı ölçülerde, satırları TextTemplate olan etiket dizisi (seri
+    numaralı demirbaş etiketleri vb.).
+
+    layout(), layout_label ile aynı yerleşimi verir; to_dxf() ise kopyalar
+    arasında değişmeyen kısımların (başlık, kutu, delikler) DXF metnini bir
+    kez üretir. Satırların sabit önekleri ortalamaya göre kayar; metinleri
+    öteleme (dx, dy) başına saklanır (orantılı rakamlarda birkaç yüz farklı
+    genişlik çıkar, binlerce kopya bunları paylaşır). Her kopyada sadece
+    değişen kısım serileştirilir. Çıktı build_single_dxf ile bayt bayt aynıdır.
+    """
+
+    # Öneklerin saklanan DXF metinleri için üst sınır (kayıt sayısı)
+    MAX_CACHED_TEXTS = 4096
+
+    def __init__(self, width, height, line1, h1, line2, h2, hole_mode):
+        self.width = width
+        self.height = height
+        self.hole_mode = hole_mode
+        self.lines = (TextTemplate(line1, h1), TextTemplate(line2, h2))
+        # (compact, satır, dx, dy) -> satırın sabit önekinin DXF metni
+        self._prefix_text = {}
+        self._frame = {}
+
+    def render(self, **values):
+        """
+        Satır metinlerini (line1, line2) döner; LabelSpec gibi kırpılmış.
+        """
+        return tuple(t.render(**values).strip() for t in self.lines)
+
+    def layout(self, texts):
+        cx = self.width / 2.0
+        segs = []
+        for t, text in zip(self.lines, texts):
+            geom = TextGeometry()
+            if text.strip() and t.height > 0:
+                geom = t.shape(text)
+                if geom:
+                    minx, maxx = geom.x_range()
+                    geom.dx = cx - (minx + maxx) / 2.0
+            segs.append(geom)
+        seg1, seg2 = segs
+        _stack_lines(seg1, self.lines[0].height, seg2, self.lines[1].height,
+                     self.height)
+        return seg1, seg2
+
+    def _frame_text(self, compact):
+        # Başlık + kutu ve delikler + dosya sonu; her kopyada aynı
+        try:
+            return self._frame[compact]
+        except KeyError:
+            pass
+        parts = list(iter_single_dxf(self.width, self.height, TextGeometry(),
+                                     TextGeometry(), self.hole_mode, compact))
+        head = "\n".join(parts[:7])
+        tail = "\n".join(parts[7:])
+        self._frame[compact] = head, tail
+        return head, tail
+
+    def _prefix_lines(self, index, segs, shared, line, compact):
+        key = (compact, index, segs.dx, segs.dy)
+        text = self._prefix_text.get(key)
+        if text is None:
+            head = TextGeometry()
+            head.runs = segs.runs[:shared]
+            head.dx, head.dy = segs.dx, segs.dy
+            text = "\n".join([line(x1, y1, x2, y2)
+                              for x1, y1, x2, y2 in head.iter_flat()])
+            if len(self._prefix_text) < self.MAX_CACHED_TEXTS:
+                self._prefix_text[key] = text
+        return text
+
+    def _line_text(self, index, segs, line, compact):
+        if not segs:
+            return None
+        shared = self.lines[index].shared_runs(segs)
+        if not shared:
+            return "\n".join([line(x1, y1, x2, y2)
+                              for x1, y1, x2, y2 in segs.iter_flat()])
+        text = self._prefix_lines(index, segs, shared, line, compact)
+        if shared == len(segs.runs):
+            return text
+        rest = TextGeometry()
+        rest.runs = segs.runs[shared:]
+        rest.dx, rest.dy = segs.dx, segs.dy
+        return "\n".join([text] + [line(x1, y1, x2, y2)
+                                   for x1, y1, x2, y2 in rest.iter_flat()])
+
+    def to_dxf(self, layout, compact=False):
+        line = _compact_dxf_writers(DXF_PRECISION)[0] if compact else _dxf_line
+        head, tail = self._frame_text(compact)
+        parts = [head]
+        for index, segs in enumerate(layout):
+            text = self._line_text(index, segs, line, compact)
+            if text is not None:
+                parts.append(text)
+        parts.append(tail)
+        return "\n".join(parts)
 
 
 def save_single_dxf(width_mm, height_mm, seg1, seg2, hole_mode, filename):
-    content = build_single_dxf(width_mm, height_mm, seg1, seg2, hole_mode)
     with open(filename, "w", encoding="utf-8") as f:
-        f.write(content)
+        sep = ""
+        for chunk in iter_single_dxf(width_mm, height_mm, seg1, seg2, hole_mode):
+            f.write(sep)
+            f.write(chunk)
+            sep = "\n"
 
 
 # =========================
 # SVG ÖNİZLEME
 # =========================
 
-def build_svg_preview(width_mm, height_mm, seg1, seg2, hole_mode):
+def _segments_bounds(segs):
+    """
+    Segmentlerin (minx, miny, maxx, maxy) kutusu; boşsa None.
+    TextGeometry kutusunu koordinatları gezmeden verir.
+    """
+    if isinstance(segs, TextGeometry):
+        return segs.bounds()
+    box = None
+    for x1, y1, x2, y2 in iter_flat(segs):
+        if box is None:
+            box = [x1, y1, x1, y1]
+        box[0] = min(box[0], x1, x2)
+        box[1] = min(box[1], y1, y2)
+        box[2] = max(box[2], x1, x2)
+        box[3] = max(box[3], y1, y2)
+    return box
+
+
+def build_svg_preview(width_mm, height_mm, seg1, seg2, hole_mode, compact=False):
     """
     Etiketin geometri sınırlarını (kutu + yazılar + delikler) hesaplar,
     bunları sabit boyutlu bir SVG alanına ölçekleyip ortalar.
-    """
-
-    # Tüm geometri için x/y listeleri (bounding box hesaplamak için)
-    xs = [0.0, width_mm]
-    ys = [0.0, height_mm]
 
-    all_lines = seg1 + seg2
+    compact=True: sanal alan 10**SVG_PRECISION ile büyütülür ve koordinatlar
+    tamsayı yazılır (100.00 x 50.00 yerine 10000 x 5000); görüntü ve
+    duyarlılık aynı, dosya daha küçük.
+    """
 
-    for (x1, y1), (x2, y2) in all_lines:
-        xs.extend([x1, x2])
-        ys.extend([y1, y2])
+    # Sınır kutusu: dış kutu + yazılar + delikler
+    minx, maxx = min(0.0, width_mm), max(0.0, width_mm)
+    miny, maxy = min(0.0, height_mm), max(0.0, height_mm)
 
-    holes = []
-    def add_hole(cx, cy, r=3.25):
-        holes.append((cx, cy, r))
-        xs.extend([cx - r, cx + r])
-        ys.extend([cy - r, cy + r])
+    all_lines = (seg1, seg2)
 
-    if hole_mode == 2:
-        add_hole(8.0, height_mm / 2.0)
-        add_hole(width_mm - 8.0, height_mm / 2.0)
-    elif hole_mode == 4:
-        add_hole(8.0, 8.0)
-        add_hole(width_mm - 8.0, 8.0)
-        add_hole(8.0, height_mm - 8.0)
-        add_hole(width_mm - 8.0, height_mm - 8.0)
+    for segs in all_lines:
+        box = _segments_bounds(segs)
+        if box is not None:
+            minx, miny = min(minx, box[0]), min(miny, box[1])
+            maxx, maxy = max(maxx, box[2]), max(maxy, box[3])
 
-    minx, maxx = min(xs), max(xs)
-    miny, maxy = min(ys), max(ys)
+    holes = hole_positions(width_mm, height_mm, hole_mode)
+    for cx, cy, r in holes:
+        minx, maxx = min(minx, cx - r), max(maxx, cx + r)
+        miny, maxy = min(miny, cy - r), max(maxy, cy + r)
 
     bb_w = maxx - minx if maxx > minx else 1.0
     bb_h = maxy - miny if maxy > miny else 1.0
@@ -339,6 +1022,14 @@ def build_svg_preview(width_mm, height_mm, seg1, seg2, hole_mode):
     # SVG içindeki sanal koordinat alanı (sabit)
     view_w = 100.0
     view_h = 50.0
+    num = ".2f"
+    stroke = "0.4"
+    if compact:
+        k = 10 ** SVG_PRECISION
+        view_w *= k
+        view_h *= k
+        num = ".0f"
+        stroke = _compact_num(0.4 * k, SVG_PRECISION)
 
     # İçeride biraz boşluk kalsın diye 0.9 çarpanı
     scale = 0.9 * min(view_w / bb_w, view_h / bb_h)
@@ -359,11 +1050,11 @@ def build_svg_preview(width_mm, height_mm, seg1, seg2, hole_mode):
 
     parts = [
         f'<svg xmlns="http://www.w3.org/2000/svg" '
-        f'viewBox="0 0 {view_w:.2f} {view_h:.2f}" '
+        f'viewBox="0 0 {view_w:{num}} {view_h:{num}}" '
         f'width="{pixel_width}" height="{pixel_height}" '
         f'preserveAspectRatio="xMidYMid meet" '
         f'style="background:#f9fafb;border:1px solid #cbd5e1;">'
-        '<g stroke="black" stroke-width="0.4" fill="none">'
+        f'<g stroke="black" stroke-width="{stroke}" fill="none">'
     ]
 
     # Dış kutu (0,0)-(width_mm,height_mm)
@@ -385,26 +1076,27 @@ def build_svg_preview(width_mm, height_mm, seg1, seg2, hole_mode):
         sx1, sy1 = map_point(x1, y1)
         sx2, sy2 = map_point(x2, y2)
         parts.append(
-            f'<line x1="{sx1:.2f}" y1="{sy1:.2f}" '
-            f'x2="{sx2:.2f}" y2="{sy2:.2f}" />'
+            f'<line x1="{sx1:{num}}" y1="{sy1:{num}}" '
+            f'x2="{sx2:{num}}" y2="{sy2:{num}}" />'
         )
 
-    # Yazı çizgileri
-    for (x1, y1), (x2, y2) in all_lines:
-        sx1, sy1 = map_point(x1, y1)
-        sx2, sy2 = map_point(x2, y2)
-        parts.append(
-            f'<line x1="{sx1:.2f}" y1="{sy1:.2f}" '
-            f'x2="{sx2:.2f}" y2="{sy2:.2f}" />'
-        )
+    # Yazı çizgileri (map_point satır içi: nokta başına tuple kurulmaz)
+    for segs in all_lines:
+        for x1, y1, x2, y2 in iter_flat(segs):
+            parts.append(
+                f'<line x1="{(x1 - minx) * scale + margin_x:{num}}" '
+                f'y1="{(maxy - y1) * scale + margin_y:{num}}" '
+                f'x2="{(x2 - minx) * scale + margin_x:{num}}" '
+                f'y2="{(maxy - y2) * scale + margin_y:{num}}" />'
+            )
 
     # Delikler
     for cx, cy, r in holes:
         scx, scy = map_point(cx, cy)
         sr = r * scale
         parts.append(
-            f'<circle cx="{scx:.2f}" cy="{scy:.2f}" r="{sr:.2f}" '
-            'stroke="black" stroke-width="0.4" fill="none" />'
+            f'<circle cx="{scx:{num}}" cy="{scy:{num}}" r="{sr:{num}}" '
+            f'stroke="black" stroke-width="{stroke}" fill="none" />'
         )
 
     parts.append("</g></svg>")
@@ -0,0 +1,430 @@
+"""
+Lazer (GRBL uyumlu diyot lazerler) için doğrudan G-code çıktısı.
+
+build_single_dxf ile aynı etiket geometrisini kullanır:
+    1. Segmentler uç noktalarından kaynaştırılıp sürekli yollara çevrilir
+       (glyph konturları tek G1 zinciri olur, her segmentte lazer
+       kapanıp açılmaz).
+    2. Yollar içten dışa sıralanır: bir kapalı yolun içinde kalan yollar
+       (harf iç boşlukları, delikler, yazılar) ondan önce kesilir; etiketi
+       plakadan ayıran dış kutu en son. Bu kısıt içinde her adımda en
+       yakın yol seçilir (nearest neighbour), boşta gidiş kısalır.
+    3. G0 (boşta) / G1 (kesim) hareketleri satır satır üretilir
+       (iter_label_gcode); tahmini iş süresi başlıkta yazılır.
+
+Delikler çokgen olarak (kiriş hatası en fazla ARC_TOLERANCE) yazılır;
+bazı kontrolcüler G2/G3 desteklemediği için yay komutu kullanılmaz.
+
+Kullanım:
+    seg1, seg2 = spec.layout()
+    text = build_label_gcode(spec.width, spec.height, seg1, seg2, spec.holes,
+                             GcodeSettings(feed=800, power=700))
+"""
+
+import hashlib
+import math
+from dataclasses import dataclass
+
+from eticad_core import hole_positions, iter_flat
+
+# Uç noktaları bu basamağa yuvarlanınca çakışan segmentler kaynaştırılır (mm)
+WELD_DIGITS = 4
+
+# Delik çokgeninin çembere en fazla uzaklığı (mm)
+ARC_TOLERANCE = 0.01
+
+GCODE_PRECISION = 3
+
+LASER_MODES = ("M3", "M4")
+
+
+@dataclass(frozen=True, slots=True)
+class GcodeSettings:
+    """
+    feed: kesim hızı (mm/dk), travel_feed: boşta gidiş hızı (mm/dk),
+    power: lazer gücü (S değeri, 0..max_power), passes: tekrar sayısı,
+    laser_mode: M4 (hıza göre dinamik güç, GRBL $32=1) veya M3 (sabit).
+    """
+    feed: float = 1000.0
+    travel_feed: float = 3000.0
+    power: int = 1000
+    max_power: int = 1000
+    passes: int = 1
+    laser_mode: str = "M4"
+
+    @classmethod
+    def parse(cls, data):
+        """
+        Sorgu parametrelerinden (feed, travel, power, passes, mode) ayar
+        üretir; eksikler varsayılan, hatalı değerde ValueError.
+        """
+        default = cls()
+        try:
+            feed = float(data.get("feed", default.feed))
+            travel = float(data.get("travel", default.travel_feed))
+            power = int(data.get("power", default.power))
+            passes = int(data.get("passes", default.passes))
+        except (TypeError, ValueError):
+            raise ValueError("feed, travel, power ve passes sayı olmalı.")
+        mode = str(data.get("mode", default.laser_mode)).upper()
+        if not (math.isfinite(feed) and feed > 0
+                and math.isfinite(travel) and travel > 0):
+            raise ValueError("Hızlar (feed, travel) pozitif olmalı.")
+        if not 0 <= power <= default.max_power:
+            raise ValueError(f"Güç (power) 0..{default.max_power} aralığında olmalı.")
+        if not 1 <= passes <= 20:
+            raise ValueError("Tekrar sayısı (passes) 1..20 aralığında olmalı.")
+        if mode not in LASER_MODES:
+            raise ValueError("Lazer modu: " + ", ".join(LASER_MODES))
+        return cls(feed, travel, power, default.max_power, passes, mode)
+
+    @property
+    def key(self):
+        return (self.feed, self.travel_feed, self.power, self.max_power,
+                self.passes, self.laser_mode)
+
+    @property
+    def digest(self):
+        return hashlib.sha1(repr(self.key).encode("utf-8")).hexdigest()[:12]
+
+
+DEFAULT_SETTINGS = GcodeSettings()
+
+
+@dataclass(frozen=True, slots=True)
+class JobEstimate:
+    """
+    Sabit hız varsayımıyla (ivmelenme yok) iş tahmini; uzunluklar mm,
+    süre saniye, tüm tekrarlar dahil.
+    """
+    cut_mm: float
+    travel_mm: float
+    seconds: float
+    paths: int
+
+
+# =========================
+# YOLLAR
+# =========================
+
+def label_segments(width_mm, height_mm, seg1, seg2, hole_mode):
+    """
+    Etiketin tüm segmentleri (x1, y1, x2, y2): kutu, yazılar, delik
+    çokgenleri. DXF ile aynı geometri.
+    """
+    segs = [(0.0, 0.0, width_mm, 0.0), (width_mm, 0.0, width_mm, height_mm),
+            (width_mm, height_mm, 0.0, height_mm), (0.0, height_mm, 0.0, 0.0)]
+    segs.extend(iter_flat(seg1))
+    segs.extend(iter_flat(seg2))
+    for cx, cy, r in hole_positions(width_mm, height_mm, hole_mode):
+        pts = circle_points(cx, cy, r)
+        segs.extend((x1, y1, x2, y2)
+                    for (x1, y1), (x2, y2) in zip(pts, pts[1:]))
+    return segs
+
+
+def circle_points(cx, cy, r, tolerance=ARC_TOLERANCE):
+    """
+    Çemberi kapalı çokgen noktalarına çevirir (ilk nokta sonda tekrar).
+    Kenar sayısı, kiriş ile yay arası en fazla tolerance olacak şekilde.
+    """
+    n = 8
+    if r > tolerance:
+        n = max(n, math.ceil(math.pi / math.acos(1.0 - tolerance / r)))
+    pts = [(cx + r * math.cos(2.0 * math.pi * i / n),
+            cy + r * math.sin(2.0 * math.pi * i / n)) for i in range(n)]
+    pts.append(pts[0])
+    return pts
+
+
+def weld_paths(segments, digits=WELD_DIGITS):
+    """
+    Uç noktaları (digits basamağa yuvarlanmış hali) çakışan segmentleri
+    zincirleyip yollar döner: her yol bir nokta listesi; kapalı yollarda
+    ilk nokta sonda tekrarlanır. Segmentler gerektiğinde ters çevrilir.
+    """
+    # Yuvarlanmış uç noktalar segment başına bir kez hesaplanır
+    heads = [(round(x1, digits), round(y1, digits)) for x1, y1, _, _ in segments]
+    tails = [(round(x2, digits), round(y2, digits)) for _, _, x2, y2 in segments]
+    ends = {}
+    for i in range(len(segments)):
+        ends.setdefault(heads[i], []).append(i)
+        ends.setdefault(tails[i], []).append(i)
+
+    used = bytearray(len(segments))
+
+    def take(at):
+        # at düğümüne bağlı kullanılmamış bir segment: (karşı nokta, düğüm)
+        for i in ends[at]:
+            if not used[i]:
+                used[i] = 1
+                x1, y1, x2, y2 = segments[i]
+                if heads[i] == at:
+                    return (x2, y2), tails[i]
+                return (x1, y1), heads[i]
+        return None, None
+
+    paths = []
+    for i, (x1, y1, x2, y2) in enumerate(segments):
+        if used[i]:
+            continue
+        used[i] = 1
+        path = [(x1, y1), (x2, y2)]
+        start, at = heads[i], tails[i]
+        # ileri
+        while at != start:
+            point, at_next = take(at)
+            if point is None:
+                break
+            path.append(point)
+            at = at_next
+        # kapanmadıysa geriye doğru da uzat
+        if at != start:
+            head = []
+            at = start
+            while True:
+                point, at = take(at)
+                if point is None:
+                    break
+                head.append(point)
+            if head:
+                head.reverse()
+                path = head + path
+        paths.append(path)
+    return paths
+
+
+def _is_closed(path):
+    (x0, y0), (x1, y1) = path[0], path[-1]
+    return (round(x0, WELD_DIGITS), round(y0, WELD_DIGITS)) == \
+        (round(x1, WELD_DIGITS), round(y1, WELD_DIGITS))
+
+
+class Contour:
+    """
+    Sıralama için yol özeti. points yolun noktalarıdır (kapalı yolda ilk
+    nokta sonda tekrar); mm konumu TextGeometry ile aynı işlem sırasıyla
+    ((x * scale + ox) + dx, y * scale + dy). Böylece glyph başına bir kez
+    kaynaştırılmış konturlar, koordinatları üretilmeden yerleştirilebilir.
+    bounds mm cinsinden (minx, miny, maxx, maxy).
+    """
+
+    __slots__ = ("points", "scale", "ox", "dx", "dy", "closed", "bounds",
+                 "start", "end")
+
+    def __init__(self, points, closed, bounds, scale=1.0, ox=0.0, dx=0.0, dy=0.0):
+        self.points = points
+        self.scale = scale
+        self.ox = ox
+        self.dx = dx
+        self.dy = dy
+        self.closed = closed
+        self.bounds = bounds
+        self.start = self.point(0)
+        self.end = self.point(-1)
+
+    @classmethod
+    def from_path(cls, path):
+        xs = [p[0] for p in path]
+        ys = [p[1] for p in path]
+        return cls(path, _is_closed(path), (min(xs), min(ys), max(xs), max(ys)))
+
+    def point(self, k):
+        x, y = self.points[k]
+        return (x * self.scale + self.ox) + self.dx, y * self.scale + self.dy
+
+    def nearest(self, x, y):
+        """
+        (x, y)'ye en yakın köşenin indeksi (eşitlikte ilki; son tekrar hariç).
+        """
+        s, ox, dx, dy = self.scale, self.ox, self.dx, self.dy
+        ring = self.points[:-1] if self.closed else self.points
+        best, best_d = 0, None
+        for i, (px, py) in enumerate(ring):
+            d = (((px * s + ox) + dx) - x) ** 2 + ((py * s + dy) - y) ** 2
+            if best_d is None or d < best_d:
+                best, best_d = i, d
+        return best
+
+
+def order_contours(contours, start=(0.0, 0.0)):
+    """
+    Konturları içten dışa, kısıt içinde en yakın komşu sırasıyla dizer;
+    [(indeks, giriş), ...] döner. Bir kontur, sınır kutusu kendisininkini
+    kapsayan (ve daha büyük olan) kapalı konturlardan önce kesilir.
+    giriş: açık konturda -1 ters, 0 düz; kapalı konturda başlanacak
+    köşenin indeksi (o anki konuma en yakın köşe).
+    """
+    boxes = [c.bounds for c in contours]
+    areas = [(b[2] - b[0]) * (b[3] - b[1]) for b in boxes]
+
+    # containers[i]: i'yi içeren kapalı konturlar; pending[j]: j'nin
+    # içindeki henüz kesilmemiş kontur sayısı
+    containers = [[] for _ in contours]
+    pending = [0] * len(contours)
+    for j, outer in enumerate(boxes):
+        if not contours[j].closed:
+            continue
+        ox1, oy1, ox2, oy2 = outer
+        area = areas[j]
+        for i, (ix1, iy1, ix2, iy2) in enumerate(boxes):
+            if (areas[i] < area and ox1 <= ix1 and oy1 <= iy1
+                    and ix2 <= ox2 and iy2 <= oy2):
+                containers[i].append(j)
+                pending[j] += 1
+
+    remaining = set(range(len(contours)))
+    ready = {i for i in remaining if pending[i] == 0}
+    x, y = start
+    order = []
+    while remaining:
+        best = best_d = best_rev = None
+        for i in ready:
+            c = contours[i]
+            d = (c.start[0] - x) ** 2 + (c.start[1] - y) ** 2
+            rev = False
+            if not c.closed:
+                d_end = (c.end[0] - x) ** 2 + (c.end[1] - y) ** 2
+                if d_end < d:
+                    d, rev = d_end, True
+            if best_d is None or d < best_d or (d == best_d and i < best):
+                best, best_d, best_rev = i, d, rev
+        c = contours[best]
+        if best_rev:
+            entry = -1
+            x, y = c.start
+        elif c.closed:
+            entry = c.nearest(x, y)
+            x, y = c.point(entry)
+        else:
+            entry = 0
+            x, y = c.end
+        order.append((best, entry))
+        remaining.discard(best)
+        ready.discard(best)
+        for j in containers[best]:
+            pending[j] -= 1
+            if pending[j] == 0:
+                ready.add(j)
+    return order
+
+
+def order_paths(paths, start=(0.0, 0.0)):
+    """
+    Yolları order_contours sırasıyla döner: açık yollar gerekirse ters
+    çevrilir, kapalı yollar en yakın köşeden başlatılır.
+    """
+    contours = [Contour.from_path(p) for p in paths]
+    ordered = []
+    for i, entry in order_contours(contours, start):
+        path = paths[i]
+        if entry == -1:
+            path = path[::-1]
+        elif contours[i].closed and entry:
+            ring = path[:-1]
+            ring = ring[entry:] + ring[:entry]
+            ring.append(ring[0])
+            path = ring
+        ordered.append(path)
+    return ordered
+
+
+def plan_label(width_mm, height_mm, seg1, seg2, hole_mode):
+    """
+    Etiketin kesim sırasına dizilmiş yolları.
+    """
+    return order_paths(weld_paths(label_segments(width_mm, height_mm,
+                                                 seg1, seg2, hole_mode)))
+
+
+def estimate_job(paths, settings=DEFAULT_SETTINGS, start=(0.0, 0.0)):
+    """
+    Sıralı yollar için kesim / boşta gidiş uzunluğu ve tahmini süre.
+    Her tekrar başlangıç noktasından başlar ve oraya döner.
+    """
+    cut = travel = 0.0
+    x, y = start
+    for path in paths:
+        travel += math.hypot(path[0][0] - x, path[0][1] - y)
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            cut += math.hypot(x2 - x1, y2 - y1)
+        x, y = path[-1]
+    travel += math.hypot(start[0] - x, start[1] - y)
+
+    passes = settings.passes
+    seconds = 60.0 * passes * (cut / settings.feed + travel / settings.travel_feed)
+    return JobEstimate(cut * passes, travel * passes, seconds, len(paths))
+
+
+# =========================
+# G-CODE YAZICI
+# =========================
+
+def _format_duration(seconds):
+    minutes, sec = divmod(int(round(seconds)), 60)
+    return f"{minutes} dk {sec} sn" if minutes else f"{sec} sn"
+
+
+def iter_gcode(paths, settings=DEFAULT_SETTINGS, estimate=None,
+               precision=GCODE_PRECISION):
+    """
+    Sıralı yolların G-code'unu satır satır üretir (satırlar "\\n" ile
+    birleştirilir). Lazer G0'da kapalıdır; M4 modunda güç hıza göre
+    ölçeklenir. Bazı gönderici yazılımlar UTF-8 yorumlarda sorun
+    çıkardığından çıktı ASCII'dir.
+    """
+    p = f".{precision}f"
+    estimate = estimate or estimate_job(paths, settings)
+
+    yield "; EtiCAD G-code"
+    yield (f"; {estimate.paths} yol, kesim {estimate.cut_mm:.1f} mm, "
+           f"bosta {estimate.travel_mm:.1f} mm")
+    yield f"; tahmini sure: {_format_duration(estimate.seconds)}"
+    yield "G21"
+    yield "G90"
+    yield f"{settings.laser_mode} S0"
+
+    feed = f"{settings.feed:g}"
+    travel = f"{settings.travel_feed:g}"
+    power = settings.power
+    for n in range(settings.passes):
+        if settings.passes > 1:
+            yield f"; gecis {n + 1}/{settings.passes}"
+        for path in paths:
+            x, y = path[0]
+            yield f"G0 X{x:{p}} Y{y:{p}} F{travel} S0"
+            x, y = path[1]
+            yield f"G1 X{x:{p}} Y{y:{p}} F{feed} S{power}"
+            for x, y in path[2:]:
+                yield f"X{x:{p}} Y{y:{p}}"
+
+    yield "M5"
+    yield f"G0 X{0.0:{p}} Y{0.0:{p}} F{travel}"
+    yield "M2"
+
+
+def iter_label_gcode(width_mm, height_mm, seg1, seg2, hole_mode,
+                     settings=DEFAULT_SETTINGS):
+    """
+    Etiketin G-code'unu satır satır üretir (bkz. plan_label, iter_gcode).
+    """
+    paths = plan_label(width_mm, height_mm, seg1, seg2, hole_mode)
+    return iter_gcode(paths, settings)
+
+
+def build_label_gcode(width_mm, height_mm, seg1, seg2, hole_mode,
+                      settings=DEFAULT_SETTINGS):
+    """
+    G-code'u string olarak döner (sonda yeni satır ile).
+    """
+    return "\n".join(iter_label_gcode(width_mm, height_mm, seg1, seg2,
+                                      hole_mode, settings)) + "\n"
+
+
+def save_label_gcode(width_mm, height_mm, seg1, seg2, hole_mode, filename,
+                     settings=DEFAULT_SETTINGS):
+    with open(filename, "w", encoding="utf-8") as f:
+        for line in iter_label_gcode(width_mm, height_mm, seg1, seg2,
+                                     hole_mode, settings):
+            f.write(line)
+            f.write("\n")
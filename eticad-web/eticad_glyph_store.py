@@ -0,0 +1,276 @@
+"""
+Glyph geometrisini düz float dizisi olarak paylaşılan bellekte / mmap
+dosyasında tutan depo.
+
+GLYPHS sözlüğündeki iç içe listeler her worker'da ayrı Python nesneleridir;
+refcount değişiklikleri fork sonrası paylaşılan sayfaları da kirletir.
+Burada tüm segment koordinatları tek bir float64 bloğunda durur, her glyph
+için sadece (offset, segment sayısı, genişlik, yükseklik) indeksi tutulur.
+
+Blok yapısı:
+    8 bayt   sihirli değer (MAGIC)
+    4 bayt   indeks JSON uzunluğu (little endian)
+    4 bayt   boş (hizalama)
+    N bayt   indeks JSON'u (8 bayta tamamlanmış)
+    ...      float64 koordinatlar: x1, y1, x2, y2, x1, y1, ...
+
+Kullanım:
+    python eticad_glyph_store.py glyphs.bin          # mmap dosyası üret
+    python eticad_glyph_store.py --shm eticad-glyphs # paylaşılan bellek aç
+    python eticad_glyph_store.py --unlink eticad-glyphs
+
+Sonra worker'lar ETICAD_GLYPH_STORE ortam değişkeniyle bağlanır:
+    ETICAD_GLYPH_STORE=/yol/glyphs.bin      veya
+    ETICAD_GLYPH_STORE=shm:eticad-glyphs
+"""
+
+import atexit
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+MAGIC = b"ETGLYPH1"
+_HEADER = struct.Struct("<8sII")
+SHM_PREFIX = "shm:"
+
+
+# =========================
+# PAKETLEME
+# =========================
+
+def pack_glyphs(glyphs):
+    """
+    GLYPHS sözlüğünü tek bir bayt bloğuna çevirir.
+    """
+    index = {}
+    coords = array("d")
+
+    for ch in sorted(glyphs):
+        g = glyphs[ch]
+        offset = len(coords)
+        for (x1, y1), (x2, y2) in g["segments"]:
+            coords.extend((x1, y1, x2, y2))
+        index[ch] = [offset, (len(coords) - offset) // 4,
+                     g["width"], g["height"]]
+
+    index_bytes = json.dumps(index, ensure_ascii=False).encode("utf-8")
+    pad = (-(_HEADER.size + len(index_bytes))) % 8
+    index_bytes += b" " * pad
+
+    return (_HEADER.pack(MAGIC, len(index_bytes), 0)
+            + index_bytes
+            + coords.tobytes())
+
+
+# =========================
+# SALT OKUNUR GÖRÜNÜMLER
+# =========================
+
+class _SegmentView(Sequence):
+    """
+    Bir glyph'in segmentlerini ((x1, y1), (x2, y2)) olarak gezdirir;
+    koordinatlar kopyalanmadan paylaşılan bloktan okunur.
+    """
+
+    __slots__ = ("coords",)
+
+    def __init__(self, coords):
+        self.coords = coords
+
+    def __len__(self):
+        return len(self.coords) // 4
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        c = self.coords
+        j = i * 4
+        return (c[j], c[j + 1]), (c[j + 2], c[j + 3])
+
+    def __iter__(self):
+        c = self.coords
+        for j in range(0, len(c), 4):
+            yield (c[j], c[j + 1]), (c[j + 2], c[j + 3])
+
+
+class GlyphView(Mapping):
+    """
+    GLYPHS içindeki tek bir glyph sözlüğünün yerine geçer:
+    g["width"], g["height"], g["segments"] aynı şekilde çalışır.
+    Düz koordinatlara g.coords ile doğrudan erişilebilir.
+    """
+
+    __slots__ = ("width", "height", "coords", "_segments")
+
+    _KEYS = ("width", "height", "segments")
+
+    def __init__(self, width, height, coords):
+        self.width = width
+        self.height = height
+        self.coords = coords
+        self._segments = _SegmentView(coords)
+
+    def __getitem__(self, key):
+        if key == "width":
+            return self.width
+        if key == "height":
+            return self.height
+        if key == "segments":
+            return self._segments
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+
+class GlyphStore(Mapping):
+    """
+    Paylaşılan bir bayt bloğu üzerinde GLYPHS ile aynı arayüzü sunar.
+    build_text_segments bu nesneyi sözlük gibi kullanabilir.
+    """
+
+    def __init__(self, buf, owner=None):
+        view = memoryview(buf)
+        magic, index_len, _ = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise RuntimeError("Glyph deposu tanınmadı (MAGIC uyuşmuyor).")
+
+        start = _HEADER.size
+        index = json.loads(bytes(view[start:start + index_len]).decode("utf-8"))
+        data_start = start + index_len
+        n_floats = (len(view) - data_start) // 8
+        floats = view[data_start:data_start + n_floats * 8].cast("d")
+
+        self._view = view
+        self._floats = floats
+        # owner: SharedMemory / mmap nesnesi; kapanmasın diye tutuyoruz
+        self._owner = owner
+        self._glyphs = {
+            ch: GlyphView(width, height, floats[off:off + count * 4])
+            for ch, (off, count, width, height) in index.items()
+        }
+
+    def __getitem__(self, ch):
+        return self._glyphs[ch]
+
+    def __contains__(self, ch):
+        return ch in self._glyphs
+
+    def __iter__(self):
+        return iter(self._glyphs)
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    def close(self):
+        """
+        Görünümleri bırakır ve alttaki bloğu kapatır.
+        """
+        for g in self._glyphs.values():
+            g.coords.release()
+        self._glyphs = {}
+        self._floats.release()
+        self._view.release()
+        if self._owner is not None:
+            self._owner.close()
+            self._owner = None
+
+
+# =========================
+# MMAP DOSYASI
+# =========================
+
+def write_store_file(glyphs, filename):
+    with open(filename, "wb") as f:
+        f.write(pack_glyphs(glyphs))
+
+
+def open_store_file(filename):
+    """
+    Depo dosyasını salt okunur mmap ile açar; sayfalar tüm
+    süreçler arasında işletim sistemi tarafından paylaşılır.
+    """
+    with open(filename, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return GlyphStore(mm, owner=mm)
+
+
+# =========================
+# PAYLAŞILAN BELLEK
+# =========================
+
+def _untrack(shm):
+    # resource_tracker, süreç kapanırken bloğu silmesin
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def create_shared_store(glyphs, name):
+    """
+    Paylaşılan bellek bloğu oluşturup glyph'leri içine yazar.
+    Blok, unlink_shared_store çağrılana kadar yaşar.
+    """
+    from multiprocessing import shared_memory
+
+    data = pack_glyphs(glyphs)
+    shm = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+    shm.buf[:len(data)] = data
+    _untrack(shm)
+    return GlyphStore(shm.buf[:len(data)], owner=shm)
+
+
+def attach_shared_store(name):
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=name)
+    _untrack(shm)
+    store = GlyphStore(shm.buf, owner=shm)
+    # Görünümler açıkken SharedMemory.__del__ kapatamaz; çıkışta sırayla kapat
+    atexit.register(store.close)
+    return store
+
+
+def unlink_shared_store(name):
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=name)
+    shm.close()
+    shm.unlink()
+
+
+def open_store(location):
+    """
+    ETICAD_GLYPH_STORE değerini çözer: "shm:<ad>" veya dosya yolu.
+    """
+    if location.startswith(SHM_PREFIX):
+        return attach_shared_store(location[len(SHM_PREFIX):])
+    return open_store_file(location)
+
+
+if __name__ == "__main__":
+    from eticad_core import load_glyph_library
+
+    args = sys.argv[1:]
+    if len(args) == 2 and args[0] == "--shm":
+        create_shared_store(load_glyph_library(), args[1]).close()
+        print(f"Paylaşılan bellek hazır: {SHM_PREFIX}{args[1]}")
+    elif len(args) == 2 and args[0] == "--unlink":
+        unlink_shared_store(args[1])
+        print(f"Silindi: {args[1]}")
+    elif len(args) == 1 and not args[0].startswith("-"):
+        write_store_file(load_glyph_library(), args[0])
+        print(f"Glyph deposu yazıldı: {args[0]}")
+    else:
+        print(__doc__)
+        sys.exit(2)
@@ -0,0 +1,341 @@
+"""
+Aşama bazlı süre ölçümleri ve sayaçlar; /metrics için Prometheus
+metin biçiminde çıktı, istek başına Server-Timing başlığı ve yavaş
+istek günlüğü.
+
+Tek süreçte her şey bellekte tutulur. ETICAD_METRICS_DIR tanımlıysa her
+süreç (gunicorn worker'ı) kendi anlık görüntüsünü bu klasöre yazar ve
+/metrics tüm dosyaları toplayarak verir; böylece hangi worker'a düşerse
+düşsün sayaçlar doğru toplanır. Klasörü her dağıtımda temizlemek yeterli.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    from flask import g, has_request_context, request
+except ImportError:  # metrikler Flask olmadan da (bench, CLI) kullanılabilir
+    has_request_context = None
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COUNT_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# ad -> (tür, açıklama, kovalar)
+METRICS = {
+    "eticad_request_seconds": (
+        "histogram", "İstek süresi (rota bazında).", LATENCY_BUCKETS),
+    "eticad_requests_total": (
+        "counter", "İstek sayısı (rota ve durum kodu bazında).", None),
+    "eticad_stage_seconds": (
+        "histogram", "Aşama süresi: parse, layout, dxf, svg, json, "
+                     "gcode, analysis, validate, compress, render.", LATENCY_BUCKETS),
+    "eticad_label_segments": (
+        "histogram", "Etiket başına yazı segmenti sayısı.", COUNT_BUCKETS),
+    "eticad_dxf_entities": (
+        "histogram", "DXF başına entity sayısı.", COUNT_BUCKETS),
+    "eticad_output_bytes": (
+        "histogram", "Üretilen çıktı boyutu (tür bazında).", BYTES_BUCKETS),
+    "eticad_cache_total": (
+        "counter", "Çıktı önbelleği erişimleri (result=hit|miss).", None),
+    "eticad_batch_labels_total": (
+        "counter", "Toplu dışa aktarım satırları (result=unique|duplicate).",
+        None),
+    "eticad_warmup_seconds": (
+        "histogram", "Worker ısınma süresi (worker başına bir gözlem).",
+        LATENCY_BUCKETS),
+}
+
+# Çok süreçli modda anlık görüntüyü en fazla bu sıklıkla diske yaz
+FLUSH_INTERVAL = 1.0
+
+# Server-Timing'de aşamaların gruplanacağı adlar
+SERVER_TIMING_NAMES = {
+    "dxf": "serialize",
+    "svg": "serialize",
+    "json": "serialize",
+    "gcode": "serialize",
+}
+
+# Bu süreyi aşan istekler eticad.slow günlüğüne JSON satırı olarak yazılır
+SLOW_REQUEST_MS = float(os.environ.get("ETICAD_SLOW_MS", "250"))
+
+slow_log = logging.getLogger("eticad.slow")
+if os.environ.get("ETICAD_SLOW_LOG"):
+    _handler = logging.FileHandler(os.environ["ETICAD_SLOW_LOG"], encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    slow_log.addHandler(_handler)
+    slow_log.propagate = False
+
+
+def _labels_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Registry:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._reset()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            atexit.register(self.flush)
+
+    def _reset(self):
+        self._counters = {}
+        self._histograms = {}
+        self._paused = False
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        # pid tekrar kullanılırsa ölü worker'ın dosyasını ezmeyelim
+        self._filename = f"metrics-{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+
+    # ---- kayıt ----
+
+    @contextmanager
+    def paused(self):
+        """
+        Bu blok içindeki kayıtları yok sayar (ör. ısınma istekleri
+        gerçek trafik gibi sayılmasın).
+        """
+        self._paused = True
+        try:
+            yield
+        finally:
+            self._paused = False
+
+    def inc(self, name, value=1, **labels):
+        if self._paused:
+            return
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._maybe_flush()
+
+    def observe(self, name, value, **labels):
+        if self._paused:
+            return
+        buckets = METRICS[name][2]
+        key = (name, _labels_key(labels))
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                # [kova sayaçları..., toplam, adet]
+                h = self._histograms[key] = [0] * len(buckets) + [0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    h[i] += 1
+            h[-2] += value
+            h[-1] += 1
+        self._maybe_flush()
+
+    # ---- çok süreçli mod ----
+
+    def _snapshot(self):
+        with self._lock:
+            return {
+                "counters": [[n, list(lk), v]
+                             for (n, lk), v in self._counters.items()],
+                "histograms": [[n, list(lk), list(h)]
+                               for (n, lk), h in self._histograms.items()],
+            }
+
+    def _maybe_flush(self):
+        if self.directory and time.monotonic() - self._last_flush > FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        if not self.directory:
+            return
+        self._last_flush = time.monotonic()
+        path = os.path.join(self.directory, self._filename)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._snapshot(), f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _collect(self):
+        if not self.directory:
+            return [self._snapshot()]
+
+        self.flush()
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if not (name.startswith("metrics-") and name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    # ---- Prometheus metni ----
+
+    def render(self):
+        counters = {}
+        histograms = {}
+        for snap in self._collect():
+            for name, lk, value in snap["counters"]:
+                key = (name, tuple(map(tuple, lk)))
+                counters[key] = counters.get(key, 0) + value
+            for name, lk, h in snap["histograms"]:
+                key = (name, tuple(map(tuple, lk)))
+                acc = histograms.get(key)
+                if acc is None:
+                    histograms[key] = list(h)
+                else:
+                    for i, v in enumerate(h):
+                        acc[i] += v
+
+        out = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (n, lk), value in sorted(counters.items()):
+                    if n == name:
+                        out.append(f"{name}{_fmt_labels(lk)} {_fmt_value(value)}")
+                continue
+            for (n, lk), h in sorted(histograms.items()):
+                if n != name:
+                    continue
+                for bound, count in zip(buckets, h):
+                    le = (("le", _fmt_value(bound)),)
+                    out.append(f"{name}_bucket{_fmt_labels(lk + le)} {count}")
+                le = (("le", "+Inf"),)
+                out.append(f"{name}_bucket{_fmt_labels(lk + le)} {h[-1]}")
+                out.append(f"{name}_sum{_fmt_labels(lk)} {_fmt_value(h[-2])}")
+                out.append(f"{name}_count{_fmt_labels(lk)} {h[-1]}")
+        return "\n".join(out) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _fmt_labels(lk):
+    if not lk:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in lk) + "}"
+
+
+def _fmt_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+registry = Registry(os.environ.get("ETICAD_METRICS_DIR") or None)
+
+# fork sonrası (gunicorn worker'ı) ana sürecin sayaçlarını taşımayalım
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry._reset)
+
+
+# =========================
+# KISAYOLLAR
+# =========================
+
+def _in_request():
+    return has_request_context is not None and has_request_context()
+
+
+def _route():
+    if _in_request():
+        return request.endpoint or "-"
+    return "-"
+
+
+@contextmanager
+def timed(stage):
+    """
+    with timed("layout"): ...  -> eticad_stage_seconds{stage, route}
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        registry.observe("eticad_stage_seconds", dt,
+                         stage=stage, route=_route())
+        if _in_request():
+            # Server-Timing / yavaş istek günlüğü için istek başına topla
+            timings = g.setdefault("timings", {})
+            timings[stage] = timings.get(stage, 0.0) + dt
+
+
+def record_label(kind, layout, size, entities=None):
+    seg1, seg2 = layout
+    if _in_request():
+        g.label_segments = len(seg1) + len(seg2)
+    registry.observe("eticad_label_segments", len(seg1) + len(seg2))
+    registry.observe("eticad_output_bytes", size, kind=kind)
+    if entities is not None:
+        registry.observe("eticad_dxf_entities", entities)
+
+
+def record_cache(kind, hit):
+    registry.inc("eticad_cache_total", kind=kind,
+                 result="hit" if hit else "miss")
+
+
+def record_batch(labels, unique):
+    registry.inc("eticad_batch_labels_total", unique, result="unique")
+    registry.inc("eticad_batch_labels_total", labels - unique,
+                 result="duplicate")
+
+
+def render_prometheus():
+    return registry.render()
+
+
+# =========================
+# SERVER-TIMING / YAVAŞ İSTEK
+# =========================
+
+def server_timing(timings, total):
+    """
+    Aşama sürelerinden Server-Timing başlık değerini üretir:
+    parse;dur=0.12, layout;dur=1.30, serialize;dur=2.41, ..., total;dur=4.02
+    """
+    groups = {}
+    for stage, seconds in timings.items():
+        name = SERVER_TIMING_NAMES.get(stage, stage)
+        groups[name] = groups.get(name, 0.0) + seconds
+    parts = [f"{name};dur={seconds * 1000.0:.2f}"
+             for name, seconds in groups.items()]
+    parts.append(f"total;dur={total * 1000.0:.2f}")
+    return ", ".join(parts)
+
+
+def log_slow_request(route, method, status, total, timings,
+                     spec=None, segments=None, size=None):
+    """
+    SLOW_REQUEST_MS'i aşan istekleri tek satırlık JSON olarak yazar.
+    """
+    ms = total * 1000.0
+    if ms < SLOW_REQUEST_MS:
+        return
+    record = {
+        "ts": round(time.time(), 3),
+        "route": route,
+        "method": method,
+        "status": status,
+        "ms": round(ms, 2),
+        "timings_ms": {k: round(v * 1000.0, 2) for k, v in timings.items()},
+        "spec": list(spec.key) if spec is not None else None,
+        "digest": spec.digest if spec is not None else None,
+        "segments": segments,
+        "bytes": size,
+    }
+    slow_log.warning(json.dumps(record, ensure_ascii=False))
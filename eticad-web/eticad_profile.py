@@ -0,0 +1,259 @@
+"""
+Yöneticiye özel, istek bazlı profil alma.
+
+ETICAD_PROFILE_SECRET tanımlıysa, imzalı bir belirteçle gelen tek bir
+istek profil altında çalıştırılır:
+
+    X-Eticad-Profile: <belirteç>      veya   ?_profile=<belirteç>
+
+Belirteç üretmek için:
+    python eticad_profile.py sign /preview [geçerlilik_saniye]
+
+Seçenekler (başlık veya sorgu parametresi):
+    X-Eticad-Profile-Mode / _profile_mode     sample (varsayılan) | cprofile
+    X-Eticad-Profile-Repeat / _profile_repeat isteği N kez çalıştır (<= 50)
+    X-Eticad-Profile-Out / _profile_out       store (varsayılan) | inline
+
+sample: ~0.5 ms aralıkla yığın örnekleyip flamegraph.pl / speedscope için
+"collapsed" biçiminde (a;b;c 12) çıktı üretir.
+cprofile: pstats dosyası (.prof) ve okunabilir özet (.txt) üretir.
+
+Profil alınırken çıktı önbelleği atlanır; ölçülen iş gerçek layout ve
+yazıcı kodudur. Dosyalar ETICAD_PROFILE_DIR'e yazılır, adı yanıtta
+X-Eticad-Profile-Id başlığıyla döner; inline modda yanıt gövdesi profilin
+kendisidir.
+"""
+
+import cProfile
+import hashlib
+import hmac
+import io
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import parse_qs
+
+from eticad_cache import bypass_cache
+
+MAX_REPEAT = 50
+SAMPLE_INTERVAL = 0.0005
+
+
+# =========================
+# BELİRTEÇ
+# =========================
+
+def _signature(secret, path, expires):
+    msg = f"{expires}:{path}".encode("utf-8")
+    return hmac.new(secret.encode("utf-8"), msg, hashlib.sha256).hexdigest()
+
+
+def sign(secret, path, ttl=600):
+    expires = int(time.time()) + int(ttl)
+    return f"{expires}.{_signature(secret, path, expires)}"
+
+
+def verify(secret, path, token):
+    try:
+        expires, sig = token.split(".", 1)
+        expires = int(expires)
+    except ValueError:
+        return False
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sig, _signature(secret, path, expires))
+
+
+# =========================
+# ÖRNEKLEYİCİ
+# =========================
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class _Sampler(threading.Thread):
+    """
+    Hedef iş parçacığının yığınını düzenli aralıklarla örnekler.
+    """
+
+    def __init__(self, target_ident, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.target_ident = target_ident
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_ident)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n"
+                       for stack, count in self.stacks.most_common())
+
+
+# =========================
+# WSGI ARA KATMANI
+# =========================
+
+class ProfileMiddleware:
+    def __init__(self, wsgi_app, secret, directory=None):
+        self.wsgi_app = wsgi_app
+        self.secret = secret
+        self.directory = directory or os.path.join(
+            tempfile.gettempdir(), "eticad-profiles")
+
+    def _option(self, environ, query, name, default):
+        value = environ.get("HTTP_X_ETICAD_PROFILE_" + name.upper())
+        if value is None:
+            value = query.get("_profile_" + name, [default])[0]
+        return value
+
+    def __call__(self, environ, start_response):
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        token = (environ.get("HTTP_X_ETICAD_PROFILE")
+                 or query.get("_profile", [None])[0])
+        path = environ.get("PATH_INFO", "/")
+        if not token or not verify(self.secret, path, token):
+            return self.wsgi_app(environ, start_response)
+
+        mode = self._option(environ, query, "mode", "sample")
+        out = self._option(environ, query, "out", "store")
+        try:
+            repeat = max(1, min(MAX_REPEAT,
+                                int(self._option(environ, query, "repeat", "1"))))
+        except ValueError:
+            repeat = 1
+
+        # Tekrarlar için gövdeyi bir kez oku. CONTENT_LENGTH yoksa (chunked)
+        # sunucu akışın sonunu bildiriyorsa sonuna kadar okunur; bildirmiyorsa
+        # okumak takılabilir, istek profilsiz geçer.
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or -1)
+        except ValueError:
+            length = -1
+        if length >= 0:
+            body = environ["wsgi.input"].read(length) if length else b""
+        elif environ.get("wsgi.input_terminated"):
+            body = environ["wsgi.input"].read()
+        elif environ.get("HTTP_TRANSFER_ENCODING", "").lower() == "chunked":
+            return self.wsgi_app(environ, start_response)
+        else:
+            body = b""
+
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured["status"] = status
+            captured["headers"] = headers
+            return lambda data: None
+
+        def run_once():
+            env = dict(environ)
+            env["wsgi.input"] = io.BytesIO(body)
+            env["CONTENT_LENGTH"] = str(len(body))
+            env.pop("HTTP_TRANSFER_ENCODING", None)
+            env.pop("wsgi.input_terminated", None)
+            result = self.wsgi_app(env, capture)
+            try:
+                return b"".join(result)
+            finally:
+                if hasattr(result, "close"):
+                    result.close()
+
+        token_cache = bypass_cache.set(True)
+        try:
+            if mode == "cprofile":
+                profiler = cProfile.Profile()
+                for _ in range(repeat):
+                    data = profiler.runcall(run_once)
+                files = self._store_cprofile(profiler, path)
+            else:
+                sampler = _Sampler(threading.get_ident())
+                sampler.start()
+                try:
+                    for _ in range(repeat):
+                        data = run_once()
+                finally:
+                    sampler.stop()
+                files = self._store_text(path, "collapsed", sampler.collapsed())
+        finally:
+            bypass_cache.reset(token_cache)
+
+        if out == "inline":
+            with open(files[-1], "rb") as f:
+                profile = f.read()
+            start_response("200 OK", [
+                ("Content-Type", "text/plain; charset=utf-8"),
+                ("Content-Length", str(len(profile))),
+                ("X-Eticad-Profile-Id", os.path.basename(files[0])),
+            ])
+            return [profile]
+
+        headers = [(k, v) for k, v in captured["headers"]
+                   if k.lower() != "content-length"]
+        headers.append(("Content-Length", str(len(data))))
+        headers.append(("X-Eticad-Profile-Id", os.path.basename(files[0])))
+        start_response(captured["status"], headers)
+        return [data]
+
+    # ---- dosyalar ----
+
+    def _base_name(self, path):
+        slug = path.strip("/").replace("/", "_") or "index"
+        return os.path.join(
+            self.directory,
+            f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}_{slug}")
+
+    def _store_text(self, path, ext, text):
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f"{self._base_name(path)}.{ext}"
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(text)
+        return [filename]
+
+    def _store_cprofile(self, profiler, path):
+        os.makedirs(self.directory, exist_ok=True)
+        base = self._base_name(path)
+        profiler.dump_stats(base + ".prof")
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(40)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        return [base + ".prof", base + ".txt"]
+
+
+def install(app):
+    """
+    ETICAD_PROFILE_SECRET tanımlıysa Flask uygulamasına ara katmanı ekler.
+    """
+    secret = os.environ.get("ETICAD_PROFILE_SECRET")
+    if secret:
+        app.wsgi_app = ProfileMiddleware(
+            app.wsgi_app, secret, os.environ.get("ETICAD_PROFILE_DIR"))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    secret = os.environ.get("ETICAD_PROFILE_SECRET")
+    if not secret or len(args) not in (2, 3) or args[0] != "sign":
+        print(__doc__)
+        sys.exit(2)
+    print(sign(secret, args[1], int(args[2]) if len(args) == 3 else 600))
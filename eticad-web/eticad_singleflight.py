@@ -0,0 +1,186 @@
+"""
+Single-flight: aynı anahtarla eş zamanlı gelen istekler işi bir kez yapar.
+
+- Süreç içinde: ilk gelen (lider) hesaplar, diğer iş parçacıkları onun
+  sonucunu bekler.
+- Süreçler (gunicorn worker'ları) arasında: ETICAD_SINGLEFLIGHT_DIR
+  tanımlıysa lider, anahtara ait dosya kilidini (flock) alır; kilidi
+  bekleyen diğer worker'lar kilit açılınca sonucu aynı klasördeki
+  sonuç dosyasından okur, yeniden hesaplamaz.
+
+Süreçler arası paylaşım için sonuç bytes veya str olmalıdır.
+"""
+
+import hashlib
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: sadece süreç içi birleştirme
+    fcntl = None
+
+# Sonuç dosyaları bu kadar saniye geçerli (sürü önleme, kalıcı önbellek değil)
+RESULT_TTL = 30.0
+# Her bu kadar yazımda bir eski dosyaları temizle
+SWEEP_EVERY = 256
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, directory=None, ttl=RESULT_TTL):
+        self.directory = directory if fcntl is not None else None
+        self.ttl = ttl
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get("ETICAD_SINGLEFLIGHT_DIR") or None)
+
+    def do(self, key, fn):
+        """
+        fn()'i key için bir kez çalıştırır; eş zamanlı çağıranlar aynı
+        sonucu (veya aynı hatayı) alır.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            if self.directory:
+                call.value = self._do_shared(key, fn)
+            else:
+                call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.value
+
+    # ---- süreçler arası ----
+
+    def _paths(self, key):
+        # Anahtar "/" vb. içerebilir; dosya adı olarak özetini kullan
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, name)
+        return base + ".lock", base + ".out"
+
+    def _open_locked(self, lock_path):
+        """
+        Kilit dosyasını açıp flock alır. Beklerken dosya temizlenip
+        (_sweep) yerine yenisi açılmış olabilir; o zaman kilit artık kimsenin
+        görmediği eski dosyadadır, yeniden denenir.
+        """
+        while True:
+            lock_file = open(lock_path, "a+b")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                held = os.fstat(lock_file.fileno())
+                current = os.stat(lock_path)
+                if (held.st_dev, held.st_ino) == (current.st_dev, current.st_ino):
+                    return lock_file
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+    def _do_shared(self, key, fn):
+        lock_path, out_path = self._paths(key)
+        with self._open_locked(lock_path) as lock_file:
+            try:
+                value = self._read(out_path)
+                if value is None:
+                    value = fn()
+                    self._write(out_path, value)
+                return value
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self, path):
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        kind, payload = data[:1], data[1:]
+        if kind == b"s":
+            return payload.decode("utf-8")
+        if kind == b"b":
+            return payload
+        return None
+
+    def _write(self, path, value):
+        if isinstance(value, str):
+            data = b"s" + value.encode("utf-8")
+        elif isinstance(value, (bytes, bytearray)):
+            data = b"b" + bytes(value)
+        else:
+            return
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+
+        self._writes += 1
+        if self._writes % SWEEP_EVERY == 0:
+            self._sweep()
+
+    def _sweep(self):
+        limit = time.time() - self.ttl
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) >= limit:
+                    continue
+                if name.endswith(".lock"):
+                    self._remove_lock(path)
+                else:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _remove_lock(self, path):
+        # Başka bir worker kilidi tutuyorsa (flock) dosyaya dokunma;
+        # yaşı kilidin boşta olduğunu göstermez
+        with open(path, "a+b") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return
+            os.remove(path)
+
+
+flight = SingleFlight.from_env()
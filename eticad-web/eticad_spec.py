@@ -0,0 +1,380 @@
+"""
+Etiket tanımı (LabelSpec): form / JSON girdisini tek yerden okur,
+doğrular ve tüm rotaların (önizleme, DXF, API, toplu üretim) kullandığı
+değişmez bir değer nesnesine çevirir.
+"""
+
+import hashlib
+import math
+from dataclasses import dataclass, replace
+
+from eticad_core import (
+    layout_label_lazy, build_single_dxf, build_svg_preview, build_sheet_dxf,
+    LabelTemplate, SHEET_MODES,
+)
+from eticad_analysis import DEFAULT_PARAMS, analyze_label
+from eticad_gcode import DEFAULT_SETTINGS, build_label_gcode
+from eticad_validate import validate_label
+
+# Varsayılanlar (burayı değiştirmen yeterli)
+DEFAULT_WIDTH = 300.0
+DEFAULT_HEIGHT = 80.0
+DEFAULT_LINE1 = "ETICAD"
+DEFAULT_LINE2 = "NECATI PEHLIVAN"
+DEFAULT_H1 = 40.0
+DEFAULT_H2 = 20.0
+DEFAULT_HOLES = 4
+
+HOLE_MODES = (0, 2, 4)
+
+# Anahtarda float'ları bu hassasiyete yuvarlıyoruz (mm)
+KEY_DIGITS = 6
+
+# Çoklu kopya (SheetSpec)
+DEFAULT_GAP = 2.0
+MAX_COPIES = 10000
+# explode her kopyayı ayrı entity'lerle yazar; dosya kopya sayısıyla büyür
+MAX_EXPLODED = 500
+
+# Şablonlu seri (TemplateSpec)
+MAX_SEQUENCE = 10000
+
+
+class LabelSpecError(ValueError):
+    """
+    Geçersiz girdi. values: formu yeniden doldurmak için okunabilen alanlar.
+    """
+
+    def __init__(self, message, values=None):
+        super().__init__(message)
+        self.message = message
+        self.values = values or {}
+
+
+def _parse_float(value):
+    v = float(str(value).replace(",", "."))
+    if not math.isfinite(v):
+        raise ValueError(value)
+    # -0.0 -> 0.0, 300 / "300,0" / 300.0000000001 aynı değere insin
+    return round(v, KEY_DIGITS) + 0.0
+
+
+def _parse_holes(value):
+    try:
+        holes = int(str(value).strip() or DEFAULT_HOLES)
+    except ValueError:
+        return DEFAULT_HOLES
+    return holes if holes in HOLE_MODES else 0
+
+
+@dataclass(frozen=True, slots=True)
+class LabelSpec:
+    width: float
+    height: float
+    line1: str
+    h1: float
+    line2: str
+    h2: float
+    holes: int
+
+    @classmethod
+    def parse(cls, data):
+        """
+        Form (request.form) veya JSON sözlüğünden LabelSpec üretir.
+        Eksik sayısal alanlar DEFAULT_* ile doldurulur; hatalı girdide
+        LabelSpecError fırlatır.
+        """
+        try:
+            width = _parse_float(data.get("width", DEFAULT_WIDTH))
+            height = _parse_float(data.get("height", DEFAULT_HEIGHT))
+        except (TypeError, ValueError):
+            raise LabelSpecError("En / boy değerleri sayı olmalı.")
+
+        line1 = str(data.get("line1") or "").strip()
+        line2 = str(data.get("line2") or "").strip()
+        holes = _parse_holes(data.get("holes", DEFAULT_HOLES))
+
+        try:
+            h1 = _parse_float(data.get("h1", DEFAULT_H1)) if line1 else 0.0
+            h2 = _parse_float(data.get("h2", DEFAULT_H2)) if line2 else 0.0
+        except (TypeError, ValueError):
+            raise LabelSpecError(
+                "Yazı yükseklikleri sayı olmalı.",
+                values=dict(
+                    width=width, height=height,
+                    line1=line1, line2=line2,
+                    h1=DEFAULT_H1, h2=DEFAULT_H2,
+                    holes=holes,
+                ),
+            )
+
+        return cls(width, height, line1, h1, line2, h2, holes)
+
+    @property
+    def key(self):
+        """
+        Önbellek / ETag / toplu tekilleştirme için kanonik anahtar.
+        Çizilmeyecek satırlar (boş yazı veya yükseklik <= 0) anahtara girmez.
+        """
+        draw1 = bool(self.line1) and self.h1 > 0
+        draw2 = bool(self.line2) and self.h2 > 0
+        return (
+            self.width,
+            self.height,
+            self.line1 if draw1 else "",
+            self.h1 if draw1 else 0.0,
+            self.line2 if draw2 else "",
+            self.h2 if draw2 else 0.0,
+            self.holes,
+        )
+
+    @property
+    def digest(self):
+        """
+        Anahtarın kısa hex özeti (ETag, dosya adı, kilit adı için).
+        """
+        return hashlib.sha1(repr(self.key).encode("utf-8")).hexdigest()[:20]
+
+    def form_values(self):
+        return dict(
+            width=self.width, height=self.height,
+            line1=self.line1, line2=self.line2,
+            h1=self.h1, h2=self.h2,
+            holes=self.holes,
+        )
+
+    # ---- üretim ----
+
+    def layout(self):
+        return layout_label_lazy(self.width, self.height,
+                                 self.line1, self.h1, self.line2, self.h2)
+
+    def to_dxf(self, layout=None, compact=False):
+        seg1, seg2 = layout if layout is not None else self.layout()
+        return build_single_dxf(self.width, self.height, seg1, seg2, self.holes,
+                                compact)
+
+    def to_svg(self, layout=None, compact=False):
+        seg1, seg2 = layout if layout is not None else self.layout()
+        return build_svg_preview(self.width, self.height, seg1, seg2, self.holes,
+                                 compact)
+
+    def to_gcode(self, layout=None, settings=DEFAULT_SETTINGS):
+        seg1, seg2 = layout if layout is not None else self.layout()
+        return build_label_gcode(self.width, self.height, seg1, seg2, self.holes,
+                                 settings)
+
+    def analyze(self, layout=None, params=DEFAULT_PARAMS):
+        seg1, seg2 = layout if layout is not None else self.layout()
+        return analyze_label(self.width, self.height, seg1, seg2, self.holes,
+                             params)
+
+    def validate(self, layout=None):
+        seg1, seg2 = layout if layout is not None else self.layout()
+        return validate_label(self.width, self.height, seg1, seg2, self.holes)
+
+
+DEFAULT_SPEC = LabelSpec(
+    DEFAULT_WIDTH, DEFAULT_HEIGHT,
+    DEFAULT_LINE1, DEFAULT_H1,
+    DEFAULT_LINE2, DEFAULT_H2,
+    DEFAULT_HOLES,
+)
+
+
+# =========================
+# ÇOKLU KOPYA
+# =========================
+
+def _parse_count(data, name):
+    value = data.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        n = int(str(value).strip())
+    except ValueError:
+        raise LabelSpecError(f"{name} tamsayı olmalı.")
+    if n < 1:
+        raise LabelSpecError(f"{name} en az 1 olmalı.")
+    return n
+
+
+def _fit(length, pitch_len, gap):
+    # length içine kaç adet pitch_len (aralarında gap) sığar
+    return int((length + gap) // (pitch_len + gap)) if length > 0 else 0
+
+
+@dataclass(frozen=True, slots=True)
+class SheetSpec:
+    """
+    Aynı etiketin ızgara halinde çoğaltılması: rows x cols ızgaraya
+    quantity kopya, aralarında gap mm.
+    """
+    quantity: int
+    rows: int
+    cols: int
+    gap: float
+    mode: str
+
+    @classmethod
+    def parse(cls, data, label):
+        """
+        quantity, rows, cols, gap, sheet_width, sheet_height, mode alanlarını
+        okur. Verilmeyen ızgara boyutları şöyle tamamlanır:
+            rows + cols        -> quantity en fazla rows * cols
+            sheet_width/height -> sayfaya sığan ızgara
+            sadece cols / rows -> diğeri quantity'den
+            hiçbiri            -> kareye yakın ızgara
+        """
+        quantity = _parse_count(data, "quantity")
+        rows = _parse_count(data, "rows")
+        cols = _parse_count(data, "cols")
+        try:
+            gap = _parse_float(data.get("gap", DEFAULT_GAP))
+            sheet_w = data.get("sheet_width")
+            sheet_h = data.get("sheet_height")
+            sheet_w = _parse_float(sheet_w) if sheet_w not in (None, "") else None
+            sheet_h = _parse_float(sheet_h) if sheet_h not in (None, "") else None
+        except (TypeError, ValueError):
+            raise LabelSpecError("Aralık ve sayfa ölçüleri sayı olmalı.")
+        if gap < 0:
+            raise LabelSpecError("Aralık negatif olamaz.")
+        mode = str(data.get("mode") or "insert").strip().lower()
+        if mode not in SHEET_MODES:
+            raise LabelSpecError("Yerleşim türü: " + ", ".join(SHEET_MODES))
+        # Izgara adımı (etiket + aralık) pozitif olmalı; aksi halde sığdırma
+        # sıfıra bölünür veya anlamsız (negatif) ızgara çıkar
+        if label.width <= 0 or label.height <= 0:
+            raise LabelSpecError("Çoğaltmak için etiket eni ve boyu pozitif olmalı.")
+        if label.width + gap <= 0 or label.height + gap <= 0:
+            raise LabelSpecError("Etiket + aralık pozitif olmalı.")
+
+        if sheet_w is not None or sheet_h is not None:
+            fit_cols = _fit(sheet_w, label.width, gap) if sheet_w is not None else None
+            fit_rows = _fit(sheet_h, label.height, gap) if sheet_h is not None else None
+            if fit_cols == 0 or fit_rows == 0:
+                raise LabelSpecError("Etiket sayfaya sığmıyor.")
+            if cols is not None and fit_cols is not None and cols > fit_cols:
+                raise LabelSpecError(f"Sayfa genişliğine en fazla {fit_cols} sütun sığar.")
+            if rows is not None and fit_rows is not None and rows > fit_rows:
+                raise LabelSpecError(f"Sayfa yüksekliğine en fazla {fit_rows} satır sığar.")
+            cols = cols or fit_cols
+            rows = rows or fit_rows
+
+        if quantity is None:
+            if rows is None or cols is None:
+                raise LabelSpecError("Adet (quantity) veya satır + sütun verilmeli.")
+            quantity = rows * cols
+        if quantity > MAX_COPIES:
+            raise LabelSpecError(f"En fazla {MAX_COPIES} kopya üretilebilir.")
+        if mode == "explode" and quantity > MAX_EXPLODED:
+            raise LabelSpecError(
+                f"explode ile en fazla {MAX_EXPLODED} kopya üretilebilir.")
+
+        if cols is None and rows is None:
+            cols = math.ceil(math.sqrt(quantity))
+        if cols is None:
+            cols = math.ceil(quantity / rows)
+        if rows is None:
+            rows = math.ceil(quantity / cols)
+        if quantity > rows * cols:
+            raise LabelSpecError(
+                f"{quantity} kopya {rows} x {cols} ızgaraya sığmıyor.")
+
+        return cls(quantity, rows, cols, gap, mode)
+
+    @property
+    def key(self):
+        return (self.quantity, self.rows, self.cols, self.gap, self.mode)
+
+    @property
+    def digest(self):
+        return hashlib.sha1(repr(self.key).encode("utf-8")).hexdigest()[:20]
+
+    def to_dxf(self, label, layout=None, compact=False):
+        seg1, seg2 = layout if layout is not None else label.layout()
+        return build_sheet_dxf(label.width, label.height, seg1, seg2,
+                               label.holes, self.rows, self.cols, self.gap,
+                               self.quantity, self.mode, compact)
+
+
+# =========================
+# ŞABLONLU SERİ
+# =========================
+
+def _parse_int(data, name, default=None):
+    value = data.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise LabelSpecError(f"{name} tamsayı olmalı.")
+
+
+@dataclass(frozen=True, slots=True)
+class TemplateSpec:
+    """
+    Yer tutuculu etiket serisi: label.line1 / line2 "{seq:04d}" gibi
+    alanlar içerir, seq start'tan end'e (dahil) step adımla ilerler.
+    """
+    label: LabelSpec
+    start: int
+    end: int
+    step: int
+
+    @classmethod
+    def parse(cls, data):
+        """
+        {"template": {etiket alanları}, "start": 1, "end": 500, "step": 1}
+        gövdesini okur; end yerine count verilebilir.
+        """
+        if not isinstance(data.get("template"), dict):
+            raise LabelSpecError('Gövde {"template": {...}} biçiminde olmalı.')
+        label = LabelSpec.parse(data["template"])
+        start = _parse_int(data, "start", 1)
+        step = _parse_int(data, "step", 1)
+        if step == 0:
+            raise LabelSpecError("step 0 olamaz.")
+        end = _parse_int(data, "end")
+        count = _parse_int(data, "count")
+        if end is None:
+            if count is None or count < 1:
+                raise LabelSpecError("end veya count (en az 1) verilmeli.")
+            end = start + (count - 1) * step
+        spec = cls(label, start, end, step)
+        if len(spec) == 0:
+            raise LabelSpecError("Aralık boş: start, end ve step'i kontrol edin.")
+        if len(spec) > MAX_SEQUENCE:
+            raise LabelSpecError(f"En fazla {MAX_SEQUENCE} etiket üretilebilir.")
+        try:
+            spec.compile()
+        except ValueError as e:
+            raise LabelSpecError(str(e))
+        return spec
+
+    def __len__(self):
+        return len(self.sequence)
+
+    @property
+    def sequence(self):
+        return range(self.start, self.end + (1 if self.step > 0 else -1), self.step)
+
+    def compile(self):
+        """
+        Sabit kısımları bir kez işlenmiş LabelTemplate döner.
+        """
+        label = self.label
+        return LabelTemplate(label.width, label.height, label.line1, label.h1,
+                             label.line2, label.h2, label.holes)
+
+    def iter_labels(self, template=None):
+        """
+        Serideki her etiket için (seq, LabelSpec) üretir; satırlar
+        yer tutucuları doldurulmuş ve kırpılmış haldedir.
+        """
+        template = template or self.compile()
+        for seq in self.sequence:
+            line1, line2 = template.render(seq=seq)
+            yield seq, replace(self.label, line1=line1, line2=line2)
+
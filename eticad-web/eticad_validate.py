@@ -0,0 +1,346 @@
+"""
+Geometri denetimi: yazının deliklere ve etiket kenarlarına çarpıp
+çarpmadığını kontrol eder, yapılandırılmış uyarılar döner.
+
+Yerleşimdeki parçalar (glyph run'ları; düz segment listelerinde tek tek
+segmentler) sınır kutularıyla düzgün bir ızgaraya (GridIndex) konur.
+Delik diskleri ve kenar şeritleri ızgarada sorgulanır; sadece aday
+parçaların segmentleri mm'ye çevrilip tam olarak ölçülür. Delik merkezi
+bir glyph'in dolu konturunun içindeyse (hiçbir segmente yakın olmasa
+bile) ışın testiyle yakalanır. Glyph kutuları glyph metriklerinden
+geldiği için çoğu parça hiç gezilmez; iş parça sayısıyla doğrusaldır ve
+her önizlemede, toplu işin her satırında çalıştırılabilir.
+
+Kullanım:
+    for w in spec.validate():
+        print(w.code, w.message)
+"""
+
+import math
+from dataclasses import dataclass
+
+from eticad_core import SegmentBuffer, TextGeometry, hole_positions, iter_flat
+
+# Yazının delik kenarına ve etiket kenarına en az uzaklığı (mm)
+HOLE_CLEARANCE = 1.0
+EDGE_MARGIN = 1.0
+
+# Izgara hücresi (mm); delik çapı + pay mertebesinde. Büyük yazıda
+# parça başına hücre sayısı sınırlı kalsın diye parça boyutuyla büyür.
+GRID_CELL_MM = 10.0
+CELLS_PER_PIECE = 4
+
+SIDES = {"left": "sol", "right": "sağ", "bottom": "alt", "top": "üst"}
+
+
+@dataclass(frozen=True, slots=True)
+class GeometryWarning:
+    """
+    code: hole_overlap (yazı deliğe giriyor), hole_clearance (deliğe çok
+    yakın), edge_outside (yazı etiketten taşıyor), edge_margin (kenara
+    çok yakın), hole_edge (delik etiketten taşıyor).
+    line: 1 / 2 (delik uyarısında None), hole: delik sırası (1'den),
+    side: left / right / bottom / top, distance: en yakın uzaklık (mm;
+    taşmada negatif).
+    """
+    code: str
+    message: str
+    line: int = None
+    hole: int = None
+    side: str = None
+    distance: float = None
+
+    def to_dict(self):
+        out = {"code": self.code, "message": self.message}
+        for name in ("line", "hole", "side", "distance"):
+            value = getattr(self, name)
+            if value is not None:
+                out[name] = round(value, 2) if name == "distance" else value
+        return out
+
+
+class GridIndex:
+    """
+    Sınır kutularına göre düzgün ızgara. insert(öğe, kutu) öğeyi kutunun
+    değdiği hücrelere ekler; query(kutu) kutuyla aynı hücreleri paylaşan
+    öğeleri (aday; kesişme garantisi yok) sıralı döner. Sorgu kutusu
+    eklenen kutuların kapsamıyla (extent) kırpılır; sonsuz kutu verilebilir.
+    """
+
+    __slots__ = ("cell", "cells", "extent")
+
+    def __init__(self, cell=GRID_CELL_MM):
+        self.cell = cell
+        self.cells = {}
+        self.extent = None
+
+    def _range(self, box):
+        c = self.cell
+        return (math.floor(box[0] / c), math.floor(box[1] / c),
+                math.floor(box[2] / c), math.floor(box[3] / c))
+
+    def insert(self, item, box):
+        if self.extent is None:
+            self.extent = box
+        else:
+            ex1, ey1, ex2, ey2 = self.extent
+            self.extent = (min(ex1, box[0]), min(ey1, box[1]),
+                           max(ex2, box[2]), max(ey2, box[3]))
+        x1, y1, x2, y2 = self._range(box)
+        cells = self.cells
+        for ix in range(x1, x2 + 1):
+            for iy in range(y1, y2 + 1):
+                bucket = cells.get((ix, iy))
+                if bucket is None:
+                    cells[(ix, iy)] = [item]
+                else:
+                    bucket.append(item)
+
+    def query(self, box):
+        if self.extent is None:
+            return []
+        ex1, ey1, ex2, ey2 = self.extent
+        box = (max(box[0], ex1), max(box[1], ey1),
+               min(box[2], ex2), min(box[3], ey2))
+        if box[0] > box[2] or box[1] > box[3]:
+            return []
+        x1, y1, x2, y2 = self._range(box)
+        cells = self.cells
+        found = set()
+        for ix in range(x1, x2 + 1):
+            for iy in range(y1, y2 + 1):
+                bucket = cells.get((ix, iy))
+                if bucket:
+                    found.update(bucket)
+        return sorted(found)
+
+
+# =========================
+# PARÇALAR
+# =========================
+
+# id(coords) -> (coords, sınır kutusu); glyph birimlerinde
+_UNIT_BOUNDS = {}
+
+
+def _coords_bounds(coords):
+    xs = coords[0::2]
+    ys = coords[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _unit_bounds(coords):
+    entry = _UNIT_BOUNDS.get(id(coords))
+    if entry is not None and entry[0] is coords:
+        return entry[1]
+    bounds = _coords_bounds(coords)
+    _UNIT_BOUNDS[id(coords)] = (coords, bounds)
+    return bounds
+
+
+def _run_segments(coords, scale, ox, dx, dy):
+    it = iter(coords)
+    if scale is None:
+        for x1, y1, x2, y2 in zip(it, it, it, it):
+            yield x1 + dx, y1 + dy, x2 + dx, y2 + dy
+    else:
+        for x1, y1, x2, y2 in zip(it, it, it, it):
+            yield ((x1 * scale + ox) + dx, y1 * scale + dy,
+                   (x2 * scale + ox) + dx, y2 * scale + dy)
+
+
+def _line_pieces(segs, line, out):
+    """
+    Satırın parçalarını (satır, mm kutusu, segment kaynağı) olarak out'a
+    ekler. Kutu, parçanın segment uç noktalarının tam min/max'ıdır.
+    """
+    if not segs:
+        return
+    if not isinstance(segs, TextGeometry):
+        flat = segs.iter_flat() if isinstance(segs, SegmentBuffer) else iter_flat(segs)
+        for seg in flat:
+            x1, y1, x2, y2 = seg
+            out.append((line, (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)),
+                        (seg,)))
+        return
+
+    dx, dy = segs.dx, segs.dy
+    for coords, scale, ox in segs.runs:
+        if scale is None:
+            minx, miny, maxx, maxy = _coords_bounds(coords)
+            box = (minx + dx, miny + dy, maxx + dx, maxy + dy)
+        else:
+            minx, miny, maxx, maxy = _unit_bounds(coords)
+            # TextGeometry ile aynı işlem sırası; ölçek > 0, monoton
+            box = ((minx * scale + ox) + dx, miny * scale + dy,
+                   (maxx * scale + ox) + dx, maxy * scale + dy)
+        out.append((line, box, (coords, scale, ox, dx, dy)))
+
+
+def _segments(source):
+    if len(source) == 1:
+        return source
+    return _run_segments(*source)
+
+
+def _segment_distance(px, py, x1, y1, x2, y2):
+    """
+    (px, py) noktasının segmente uzaklığı.
+    """
+    vx, vy = x2 - x1, y2 - y1
+    wx, wy = px - x1, py - y1
+    length2 = vx * vx + vy * vy
+    if length2 > 0.0:
+        t = (wx * vx + wy * vy) / length2
+        if t >= 1.0:
+            wx, wy = px - x2, py - y2
+        elif t > 0.0:
+            wx -= t * vx
+            wy -= t * vy
+    return math.hypot(wx, wy)
+
+
+# =========================
+# DENETİM
+# =========================
+
+def _check_holes(width_mm, height_mm, holes, pieces, index, clearance, warnings):
+    for n, (cx, cy, r) in enumerate(holes, start=1):
+        # Delik etiketin dışına taşıyor mu (yazıdan bağımsız)
+        edge = min(cx - r, cy - r, width_mm - cx - r, height_mm - cy - r)
+        if edge < 0.0:
+            warnings.append(GeometryWarning(
+                "hole_edge", f"{n}. delik etiketin dışına taşıyor.",
+                hole=n, distance=edge))
+
+        reach = r + clearance
+        nearest = {}
+        for i in index.query((cx - reach, cy - reach, cx + reach, cy + reach)):
+            line, (x1, y1, x2, y2), source = pieces[i]
+            # Kutu diskten uzaksa segmentlere bakmaya gerek yok
+            bx = max(x1 - cx, 0.0, cx - x2)
+            by = max(y1 - cy, 0.0, cy - y2)
+            if bx * bx + by * by >= reach * reach:
+                continue
+            best = nearest.get(line, math.inf)
+            for sx1, sy1, sx2, sy2 in _segments(source):
+                d = _segment_distance(cx, cy, sx1, sy1, sx2, sy2)
+                if d < best:
+                    best = d
+            nearest[line] = best
+
+        inside = _inside_lines(cx, cy, pieces, index)
+        for line in sorted(set(nearest) | inside):
+            d = nearest.get(line, math.inf)
+            if line in inside:
+                if d == math.inf:
+                    d = _line_distance(cx, cy, pieces, line)
+                # Merkez dolu konturun içinde: delik tamamen yazının üstünde
+                gap = -d - r
+            else:
+                gap = d - r
+                if gap >= clearance:
+                    continue
+            if gap < 0.0:
+                warnings.append(GeometryWarning(
+                    "hole_overlap", f"{line}. satır {n}. deliğin üstüne taşıyor.",
+                    line=line, hole=n, distance=gap))
+            else:
+                warnings.append(GeometryWarning(
+                    "hole_clearance",
+                    f"{line}. satır {n}. deliğe çok yakın ({gap:.1f} mm).",
+                    line=line, hole=n, distance=gap))
+
+
+def _inside_lines(cx, cy, pieces, index):
+    """
+    Delik merkezi dolu bir konturun içinde kalan satırlar; +x yönüne
+    ışın atıp kesişmeleri sayar (çift-tek kuralı). Glyph run'ları kendi
+    içinde kapalı olduğundan, kutusu merkezi içeren her run ayrı sayılır;
+    düz segment listelerinde satırın tüm segmentleri birlikte sayılır.
+    """
+    counts = {}
+    for i in index.query((cx, cy, math.inf, cy)):
+        line, (x1, y1, x2, y2), source = pieces[i]
+        if not (y1 <= cy <= y2 and cx <= x2):
+            continue
+        if len(source) == 1:
+            group = (line, None)
+        elif x1 <= cx:
+            group = (line, i)
+        else:
+            # Tamamen sağdaki kapalı run'ı ışın çift sayıda keser
+            continue
+        n = counts.get(group, 0)
+        for sx1, sy1, sx2, sy2 in _segments(source):
+            if ((sy1 > cy) != (sy2 > cy)
+                    and cx < sx1 + (cy - sy1) * (sx2 - sx1) / (sy2 - sy1)):
+                n += 1
+        counts[group] = n
+    return {line for (line, _), n in counts.items() if n % 2}
+
+
+def _line_distance(cx, cy, pieces, line):
+    # Satırın tüm segmentlerine en kısa uzaklık (ızgara adayları yetmezse)
+    return min((_segment_distance(cx, cy, *seg)
+                for ln, _, source in pieces if ln == line
+                for seg in _segments(source)), default=0.0)
+
+
+def _ordered(keys):
+    # (satır, kenar) anahtarları satır, sonra SIDES sırasıyla
+    return [(line, side) for line in (1, 2) for side in SIDES
+            if (line, side) in keys]
+
+
+def _check_edges(width_mm, height_mm, pieces, index, margin, warnings):
+    # Kenar şeritleri; parça kutuları uç noktaların tam min/max'ı olduğu
+    # için kenara uzaklık doğrudan kutudan okunur
+    strips = {
+        "left": (-math.inf, -math.inf, margin, math.inf),
+        "right": (width_mm - margin, -math.inf, math.inf, math.inf),
+        "bottom": (-math.inf, -math.inf, math.inf, margin),
+        "top": (-math.inf, height_mm - margin, math.inf, math.inf),
+    }
+    nearest = {}
+    for side, box in strips.items():
+        for i in index.query(box):
+            line, (bx1, by1, bx2, by2), _ = pieces[i]
+            d = {"left": bx1, "right": width_mm - bx2,
+                 "bottom": by1, "top": height_mm - by2}[side]
+            if d < margin and d < nearest.get((line, side), margin):
+                nearest[(line, side)] = d
+
+    for line, side in _ordered(nearest):
+        d = nearest[(line, side)]
+        name = SIDES[side]
+        if d < 0.0:
+            warnings.append(GeometryWarning(
+                "edge_outside", f"{line}. satır etiketin {name} kenarından taşıyor.",
+                line=line, side=side, distance=d))
+        else:
+            warnings.append(GeometryWarning(
+                "edge_margin", f"{line}. satır {name} kenara çok yakın ({d:.1f} mm).",
+                line=line, side=side, distance=d))
+
+
+def validate_label(width_mm, height_mm, seg1, seg2, hole_mode,
+                   clearance=HOLE_CLEARANCE, margin=EDGE_MARGIN):
+    """
+    Yerleşim çıktısını (layout_label) denetler; GeometryWarning listesi
+    döner (sorun yoksa boş). Önce delik, sonra kenar uyarıları.
+    """
+    pieces = []
+    _line_pieces(seg1, 1, pieces)
+    _line_pieces(seg2, 2, pieces)
+
+    size = max((max(b[2] - b[0], b[3] - b[1]) for _, b, _ in pieces), default=0.0)
+    index = GridIndex(max(GRID_CELL_MM, size / CELLS_PER_PIECE))
+    for i, (_, box, _) in enumerate(pieces):
+        index.insert(i, box)
+
+    warnings = []
+    holes = hole_positions(width_mm, height_mm, hole_mode)
+    _check_holes(width_mm, height_mm, holes, pieces, index, clearance, warnings)
+    _check_edges(width_mm, height_mm, pieces, index, margin, warnings)
+    return warnings
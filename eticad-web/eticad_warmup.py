@@ -0,0 +1,112 @@
+"""
+Worker ısınması: ilk gerçek isteğin ödediği tek seferlik maliyetleri
+(Jinja şablon derleme, glyph metrik önbelleği, ilk çıktı üretimi)
+worker trafiğe açılmadan önce öder.
+
+gunicorn ile gunicorn.conf.py içindeki post_worker_init kancası
+warm_up(app)'i çağırır; worker ancak bu bittikten sonra istek kabul eder.
+Başka bir sunucuda uygulama oluşturulduktan sonra warm_up(app) çağırmak
+yeterli. ETICAD_WARMUP=0 ile kapatılır.
+
+Isınma sırasında metrik kaydı durdurulur; sadece toplam süre
+eticad_warmup_seconds'a yazılır ve eticad.warmup günlüğüne raporlanır.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from eticad_api import FORMATS, label_body
+from eticad_compress import ENCODINGS
+from eticad_core import GLYPHS, TextGeometry, glyph_metrics
+from eticad_metrics import registry
+from eticad_spec import DEFAULT_SPEC
+
+log = logging.getLogger("eticad.warmup")
+
+# Aynı süreçte ikinci kez ısınmaya gerek yok (ör. --preload + fork)
+_warmed_pid = None
+
+
+@contextmanager
+def _step(steps, name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        steps[name] = time.perf_counter() - t0
+
+
+def prime_glyphs():
+    """
+    Tüm glyph'lerin düz koordinat / sınır kutusu önbelleğini doldurur ve
+    şekillendirme yolunu (özel karakterler dahil) bir kez çalıştırır.
+    """
+    chars = [ch for ch in GLYPHS if isinstance(ch, str)]
+    for ch in chars:
+        glyph_metrics(ch)
+    TextGeometry.shape("".join(chars) + " .:-", 10.0)
+    return len(chars)
+
+
+def compile_templates(app):
+    """
+    templates/ altındaki tüm HTML şablonlarını derleyip Jinja önbelleğine alır.
+    """
+    names = [n for n in app.jinja_env.list_templates() if n.endswith(".html")]
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def render_default(app):
+    """
+    Varsayılan etiketi tüm çıktı türlerinde (sıkıştırılmış halleri dahil) üretir ve açılış
+    sayfasını (GET /) bir kez oluşturur; sonuçlar önbelleklere düşer.
+    """
+    with app.test_request_context("/"):
+        for fmt in FORMATS:
+            label_body(DEFAULT_SPEC, fmt)
+            for encoding in ENCODINGS:
+                label_body(DEFAULT_SPEC, fmt, encoding)
+    for encoding in (None,) + ENCODINGS:
+        headers = {"Accept-Encoding": encoding} if encoding else {}
+        with app.test_request_context("/", headers=headers):
+            app.view_functions["index"]()
+
+
+def warm_up(app):
+    """
+    Isınma adımlarını çalıştırır; {adım: saniye} sözlüğü döner
+    (kapalıysa veya bu süreç zaten ısındıysa None).
+    """
+    global _warmed_pid
+    if os.environ.get("ETICAD_WARMUP", "1") == "0" or _warmed_pid == os.getpid():
+        return None
+
+    steps = {}
+    t0 = time.perf_counter()
+    with registry.paused():
+        with _step(steps, "glyphs"):
+            glyphs = prime_glyphs()
+        with _step(steps, "templates"):
+            templates = compile_templates(app)
+        with _step(steps, "render"):
+            render_default(app)
+    total = time.perf_counter() - t0
+
+    _warmed_pid = os.getpid()
+    registry.observe("eticad_warmup_seconds", total)
+    log.info("pid %d ısındı: %.1f ms (%d glyph, %d şablon; %s)",
+             os.getpid(), total * 1e3, glyphs, templates,
+             ", ".join(f"{k} {v * 1e3:.1f} ms" for k, v in steps.items()))
+    steps["total"] = total
+    return steps
+
+
+if __name__ == "__main__":
+    from eticad_web import app
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    warm_up(app)
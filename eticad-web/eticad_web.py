@@ -1,25 +1,38 @@
-from flask import Flask, render_template, request, send_file
+import hashlib
+import time
+from collections import namedtuple
+from dataclasses import astuple
+
+from flask import Flask, Response, g, jsonify, render_template, request, send_file
 from io import BytesIO
 from datetime import datetime
 
-from eticad_core import layout_label, build_single_dxf, build_svg_preview
+from eticad_api import api, label_body
+from eticad_cache import cached_render
+from eticad_compress import (
+    ETAG_SUFFIX, compress, negotiate, install as install_compression,
+)
+from eticad_metrics import (
+    registry, render_prometheus, timed, server_timing, log_slow_request,
+)
+from eticad_profile import install as install_profiler
+from eticad_spec import (
+    LabelSpec, LabelSpecError, DEFAULT_SPEC,
+    DEFAULT_WIDTH, DEFAULT_HEIGHT, DEFAULT_LINE1, DEFAULT_LINE2,
+    DEFAULT_H1, DEFAULT_H2, DEFAULT_HOLES,
+)
 
 app = Flask(__name__)
+app.register_blueprint(api)
+install_profiler(app)
 
-# Varsayılanlar (burayı değiştirmen yeterli)
-DEFAULT_WIDTH = 300.0
-DEFAULT_HEIGHT = 80.0
-DEFAULT_LINE1 = "ETICAD"
-DEFAULT_LINE2 = "NECATI PEHLIVAN"
-DEFAULT_H1 = 40.0
-DEFAULT_H2 = 20.0
-DEFAULT_HOLES = 4
+# Varsayılanlar eticad_spec.py içinde (DEFAULT_*)
 
 DESKTOP_DOWNLOAD_URL = "https://ornek-link.com/Eticad_v1.0.0.exe"
 # ↑ Burayı kendi .exe indirme adresinle değiştirebilirsin
 
 
-def _render_form(error=None, svg=None,
+def _render_form(error=None, svg=None, info=None, warnings=None,
                  width=None, height=None,
                  line1=None, line2=None,
                  h1=None, h2=None, holes=None):
@@ -41,18 +54,62 @@ def _render_form(error=None, svg=None,
     if holes is None:
         holes = DEFAULT_HOLES
 
-    return render_template(
-        "index.html",
-        error=error,
-        svg=svg,
-        width=width,
-        height=height,
-        line1=line1,
-        line2=line2,
-        h1=h1,
-        h2=h2,
-        holes=holes,
+    with timed("render"):
+        return render_template(
+            "index.html",
+            error=error,
+            svg=svg,
+            info=info,
+            warnings=warnings,
+            width=width,
+            height=height,
+            line1=line1,
+            line2=line2,
+            h1=h1,
+            h2=h2,
+            holes=holes,
+        )
+
+
+@app.before_request
+def _start_timer():
+    g.t0 = time.perf_counter()
+
+
+@app.after_request
+def _record_request(resp):
+    t0 = g.get("t0")
+    if t0 is None:
+        return resp
+
+    total = time.perf_counter() - t0
+    route = request.endpoint or "-"
+    timings = g.get("timings", {})
+    registry.observe("eticad_request_seconds", total,
+                     route=route, method=request.method)
+    registry.inc("eticad_requests_total",
+                 route=route, status=resp.status_code)
+
+    resp.headers["Server-Timing"] = server_timing(timings, total)
+    log_slow_request(
+        route, request.method, resp.status_code, total, timings,
+        spec=g.get("spec"),
+        segments=g.get("label_segments"),
+        size=resp.content_length,
     )
+    return resp
+
+
+# Sıkıştırma, yukarıdaki ölçüm kancasından önce çalışsın diye ondan sonra
+# kaydedilir (Flask after_request kancalarını ters sırada çalıştırır)
+install_compression(app)
+
+
+@app.route("/metrics")
+def metrics():
+    return Response(render_prometheus(),
+                    mimetype="text/plain; version=0.0.4")
+
 
 @app.route("/sw.js")
 def service_worker():
@@ -60,122 +117,181 @@ def service_worker():
     return app.send_static_file("sw.js")
 
 
-@app.route("/", methods=["GET", "POST"])
-def index():
-    if request.method in ("GET", "HEAD"):
-        # Sayfa ilk açılış: varsayılan değerlerle otomatik önizleme
-        width = DEFAULT_WIDTH
-        height = DEFAULT_HEIGHT
-        line1 = DEFAULT_LINE1
-        line2 = DEFAULT_LINE2
-        h1 = DEFAULT_H1
-        h2 = DEFAULT_H2
-        holes = DEFAULT_HOLES
+def _render_spec(spec, svg=None, info=None, warnings=None):
+    return _render_form(error=None, svg=svg, info=info, warnings=warnings,
+                        **spec.form_values())
 
-        seg1, seg2 = layout_label(width, height, line1, h1, line2, h2)
-        svg = build_svg_preview(width, height, seg1, seg2, holes)
 
-        return _render_form(
-            error=None,
-            svg=svg,
-            width=width,
-            height=height,
-            line1=line1,
-            line2=line2,
-            h1=h1,
-            h2=h2,
-            holes=holes,
-        )
+def _parse_form():
+    with timed("parse"):
+        g.spec = LabelSpec.parse(request.form)
+    return g.spec
 
-    # POST: DXF oluştur ve indir
-    try:
-        width = float(request.form.get("width", str(DEFAULT_WIDTH)).replace(",", "."))
-        height = float(request.form.get("height", str(DEFAULT_HEIGHT)).replace(",", "."))
-    except ValueError:
-        return _render_form(error="En / boy değerleri sayı olmalı.")
 
-    line1 = request.form.get("line1", "").strip()
-    line2 = request.form.get("line2", "").strip()
+def _preview_svg(spec):
+    return label_body(spec, "svg").decode("utf-8")
 
-    try:
-        h1 = float(request.form.get("h1", str(DEFAULT_H1)).replace(",", ".")) if line1 else 0.0
-        h2 = float(request.form.get("h2", str(DEFAULT_H2)).replace(",", ".")) if line2 else 0.0
-    except ValueError:
-        return _render_form(
-            error="Yazı yükseklikleri sayı olmalı.",
-            width=width, height=height,
-            line1=line1, line2=line2,
-            h1=DEFAULT_H1,
-            h2=DEFAULT_H2,
-            holes=int(request.form.get("holes", str(DEFAULT_HOLES)) or DEFAULT_HOLES),
-        )
 
-    try:
-        holes = int(request.form.get("holes", str(DEFAULT_HOLES)))
-    except ValueError:
-        holes = DEFAULT_HOLES
+def _preview_info(spec):
+    # Önizlemenin üstündeki kesim özeti (uzunluk, kontur, süre)
+    with timed("analysis"):
+        return spec.analyze().summary()
+
+
+def _preview_warnings(spec):
+    # Yazı / delik / kenar çakışma uyarıları (mesajlar)
+    with timed("validate"):
+        return [w.message for w in spec.validate()]
+
+
+def _preview_page(spec):
+    return _render_spec(spec, svg=_preview_svg(spec), info=_preview_info(spec),
+                        warnings=_preview_warnings(spec)).encode("utf-8")
+
+
+def _encoded_response(body, encoding, mimetype="text/html"):
+    resp = Response(body, mimetype=mimetype)
+    if encoding is not None:
+        resp.headers["Content-Encoding"] = encoding
+    resp.vary.add("Accept-Encoding")
+    return resp
+
+
+# cached_render anahtarı (key, digest); spec.key yerine tüm form değerleri
+_FormKey = namedtuple("_FormKey", "key digest")
+
+
+def _form_key(spec, root=""):
+    """
+    Sayfa formu spec'in tüm alanlarını (çizilmeyen satırın yazısı ve
+    yüksekliği dahil) geri yazdığından, sayfa önbelleği spec.key ile
+    değil alanların tamamıyla anahtarlanır; aksi halde farklı girdiler
+    birbirinin formunu görür. root: url_for çıktısı kök yola bağlı.
+    """
+    values = (astuple(spec), root)
+    digest = hashlib.sha1(repr(values).encode("utf-8")).hexdigest()[:20]
+    return _FormKey(values, digest)
+
+
+def _cached_response(kind, spec, build, mimetype="text/html"):
+    """
+    build() gövdesini form değerleri başına önbellekten verir; sıkıştırılmış
+    halleri de önbellekte tutulur (tekrar eden isteklerde CPU harcanmaz).
+    """
+    key = _form_key(spec, request.script_root)
+    raw = cached_render(kind, key, build)
+    encoding = negotiate(request.accept_encodings, len(raw))
+    if encoding is None:
+        return _encoded_response(raw, None, mimetype)
+    body = cached_render(f"{kind}.{encoding}", key,
+                         lambda: compress(raw, encoding))
+    return _encoded_response(body, encoding, mimetype)
+
+
+# Varsayılan açılış sayfası: script_root -> (şablon, etag, html, {kodlama: gövde})
+_landing = {}
 
-    seg1, seg2 = layout_label(width, height, line1, h1, line2, h2)
 
-    dxf_text = build_single_dxf(width, height, seg1, seg2, holes)
+def _landing_page():
+    """
+    Varsayılan değerlerle açılış sayfasını süreç başına bir kez üretir.
+    ETag içerikten türediği için varsayılanlar, şablon veya glyph paketi
+    değişince kendiliğinden değişir ve tüm worker'larda aynıdır. Şablon
+    otomatik yenileme açıksa (debug) şablon değişince yeniden üretilir.
+    Sıkıştırılmış halleri ilk istendiğinde en yüksek seviyede (gzip 9)
+    bir kez üretilir.
+    """
+    root = request.script_root
+    page = _landing.get(root)
+    if page is not None and (not app.jinja_env.auto_reload
+                             or page[0].is_up_to_date):
+        return page
+
+    template = app.jinja_env.get_template("index.html")
+    html = _preview_page(DEFAULT_SPEC)
+    etag = hashlib.sha1(html).hexdigest()[:20]
+    page = _landing[root] = (template, etag, html, {})
+    return page
+
+
+def _landing_response():
+    _, etag, html, encoded = _landing_page()
+    encoding = negotiate(request.accept_encodings, len(html))
+    if encoding is None:
+        resp = _encoded_response(html, None)
+    else:
+        body = encoded.get(encoding)
+        if body is None:
+            body = encoded[encoding] = compress(html, encoding, best=True)
+        resp = _encoded_response(body, encoding)
+    resp.set_etag(etag + ETAG_SUFFIX.get(encoding, ""))
+    # Önbellekte tutulabilir ama her seferinde ETag ile doğrulanmalı
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
 
-    mem = BytesIO()
-    mem.write(dxf_text.encode("utf-8"))
-    mem.seek(0)
+
+@app.route("/", methods=["GET", "POST"])
+def index():
+    if request.method in ("GET", "HEAD"):
+        # Sayfa ilk açılış: varsayılan değerlerle otomatik önizleme
+        # (önceden render edilmiş, ETag'li ve sıkıştırılmış)
+        g.spec = DEFAULT_SPEC
+        return _landing_response()
+
+    # POST: DXF oluştur ve indir
+    try:
+        spec = _parse_form()
+    except LabelSpecError as e:
+        return _render_form(error=e.message, **e.values)
+
+    body = label_body(spec, "dxf")
+    encoding = negotiate(request.accept_encodings, len(body))
+    if encoding is not None:
+        body = label_body(spec, "dxf", encoding)
+    mem = BytesIO(body)
 
     filename = f"eticad_{datetime.now().strftime('%Y%m%d_%H%M%S')}.dxf"
 
-    return send_file(
+    resp = send_file(
         mem,
         as_attachment=True,
         download_name=filename,
         mimetype="application/dxf"
     )
+    if encoding is not None:
+        resp.headers["Content-Encoding"] = encoding
+    resp.vary.add("Accept-Encoding")
+    return resp
 
 
 @app.route("/preview", methods=["POST"])
 def preview():
     # Önizleme için formdan değerleri oku
     try:
-        width = float(request.form.get("width", str(DEFAULT_WIDTH)).replace(",", "."))
-        height = float(request.form.get("height", str(DEFAULT_HEIGHT)).replace(",", "."))
-    except ValueError:
-        return _render_form(error="En / boy değerleri sayı olmalı.")
+        spec = _parse_form()
+    except LabelSpecError as e:
+        return _render_form(error=e.message, **e.values)
 
-    line1 = request.form.get("line1", "").strip()
-    line2 = request.form.get("line2", "").strip()
+    return _cached_response("html", spec, lambda: _preview_page(spec))
 
-    try:
-        h1 = float(request.form.get("h1", str(DEFAULT_H1)).replace(",", ".")) if line1 else 0.0
-        h2 = float(request.form.get("h2", str(DEFAULT_H2)).replace(",", ".")) if line2 else 0.0
-    except ValueError:
-        return _render_form(
-            error="Yazı yükseklikleri sayı olmalı.",
-            width=width, height=height,
-            line1=line1, line2=line2,
-            h1=DEFAULT_H1, h2=DEFAULT_H2,
-            holes=int(request.form.get("holes", str(DEFAULT_HOLES)) or DEFAULT_HOLES),
-        )
 
+@app.route("/preview/fragment", methods=["POST"])
+def preview_fragment():
+    """
+    Sayfadaki canlı önizleme için sadece SVG'yi, kesim özetini ve
+    çakışma uyarılarını (veya hatayı) JSON döner; index.html'i yeniden
+    render etmez.
+    """
     try:
-        holes = int(request.form.get("holes", str(DEFAULT_HOLES)))
-    except ValueError:
-        holes = DEFAULT_HOLES
-
-    seg1, seg2 = layout_label(width, height, line1, h1, line2, h2)
-    svg = build_svg_preview(width, height, seg1, seg2, holes)
-
-    return _render_form(
-        error=None,
-        svg=svg,
-        width=width,
-        height=height,
-        line1=line1,
-        line2=line2,
-        h1=h1,
-        h2=h2,
-        holes=holes,
-    )
+        spec = _parse_form()
+    except LabelSpecError as e:
+        return jsonify(svg=None, info=None, warnings=[], error=e.message), 400
+
+    return _cached_response(
+        "fragment", spec,
+        lambda: jsonify(svg=_preview_svg(spec), info=_preview_info(spec),
+                        warnings=_preview_warnings(spec), error=None).get_data(),
+        mimetype="application/json")
 
 
 @app.route("/download")
@@ -0,0 +1,248 @@
+"""
+Paralel sıkıştıran, akışlı ZIP yazıcı (çok dosyalı dışa aktarımlar için).
+
+Üyeler bir iş parçacığı havuzunda üretilip raw deflate ile sıkıştırılır
+(zlib sıkıştırırken GIL'i bırakır); çıktıya girdi sırasıyla yazılır.
+Aynı anda en fazla `window` üye bekler: üretici tüketiciden hızlıysa
+yeni üye alınmaz (geri basınç), böylece tepe bellek üye sayısından
+bağımsızdır. Bellekte büyüyen tek şey üye başına ~50 baytlık merkezi
+dizin kaydıdır.
+
+Ofsetler veya üye sayısı ZIP sınırlarını aşınca (4 GiB / 65535 üye)
+ZIP64 kayıtları kendiliğinden yazılır.
+
+Aynı içerikli üyeler (aynı anahtar) bir kez üretilip sıkıştırılır;
+sonraki kopyalar hazır sıkıştırılmış veriyi kendi adlarıyla yazar.
+
+Kullanım:
+    members = [("a.dxf", b"..."), ("b.dxf", lambda: build(...)), ...]
+    for chunk in iter_zip(members):
+        out.write(chunk)
+"""
+
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_LEVEL = 6
+
+# Bu boyuttan küçük çıktıları biriktirip tek parça olarak ver
+CHUNK_BYTES = 64 * 1024
+
+_LOCAL_SIG = 0x04034B50
+_CENTRAL_SIG = 0x02014B50
+_EOCD_SIG = 0x06054B50
+_ZIP64_EOCD_SIG = 0x06064B50
+_ZIP64_LOCATOR_SIG = 0x07064B50
+
+_STORED = 0
+_DEFLATED = 8
+_UTF8_FLAG = 0x0800
+_VERSION = 20
+_VERSION_ZIP64 = 45
+
+_MAX32 = 0xFFFFFFFF
+_MAX16 = 0xFFFF
+
+
+def default_workers():
+    return min(8, os.cpu_count() or 1)
+
+
+def _dos_datetime(timestamp):
+    t = time.localtime(timestamp)
+    year = max(1980, t.tm_year)
+    date = ((year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    clock = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    return clock, date
+
+
+def _encode_name(name):
+    return name.encode("utf-8")
+
+
+def compress_member(payload, level=DEFAULT_LEVEL):
+    """
+    Üyeyi üretir ve sıkıştırır; (yöntem, crc, ham boyut, veri) döner.
+    payload: bytes, str veya bunları döndüren çağrılabilir. Sıkıştırma
+    işe yaramazsa (veri küçülmüyorsa) üye sıkıştırmasız saklanır.
+    """
+    if callable(payload):
+        payload = payload()
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    crc = zlib.crc32(payload)
+    c = zlib.compressobj(level, zlib.DEFLATED, -15)
+    data = c.compress(payload) + c.flush()
+    if len(data) >= len(payload):
+        return _STORED, crc, len(payload), payload
+    return _DEFLATED, crc, len(payload), data
+
+
+class ZipWriter:
+    """
+    Yerel başlıkları ve merkezi dizini üreten, çıktı konumunu izleyen
+    düşük seviyeli yazıcı. Sıkıştırılmış üyeyi alır, bayt parçaları döner.
+    """
+
+    def __init__(self, mtime=None, force_zip64=False):
+        self.offset = 0
+        self.entries = []
+        self.force_zip64 = force_zip64
+        self._dostime, self._dosdate = _dos_datetime(
+            time.time() if mtime is None else mtime)
+
+    def member(self, name, method, crc, size, data):
+        """
+        Yerel başlık + veri baytlarını döner ve merkezi dizin kaydını tutar.
+        """
+        raw_name = _encode_name(name)
+        comp_size = len(data)
+        zip64 = self.force_zip64 or size >= _MAX32 or comp_size >= _MAX32
+        if zip64:
+            extra = struct.pack("<HHQQ", 0x0001, 16, size, comp_size)
+            size32 = comp32 = _MAX32
+        else:
+            extra = b""
+            size32, comp32 = size, comp_size
+
+        header = struct.pack(
+            "<IHHHHHIIIHH", _LOCAL_SIG,
+            _VERSION_ZIP64 if zip64 else _VERSION, _UTF8_FLAG, method,
+            self._dostime, self._dosdate, crc, comp32, size32,
+            len(raw_name), len(extra))
+        self.entries.append((raw_name, method, crc, size, comp_size, self.offset))
+        self.offset += len(header) + len(raw_name) + len(extra) + comp_size
+        return header + raw_name + extra, data
+
+    def finish(self):
+        """
+        Merkezi dizini ve (gerekirse ZIP64) dizin sonu kayıtlarını döner.
+        """
+        parts = []
+        cd_offset = self.offset
+        for raw_name, method, crc, size, comp_size, offset in self.entries:
+            fields = []
+            size32, comp32, offset32 = size, comp_size, offset
+            if self.force_zip64 or size >= _MAX32:
+                fields.append(size)
+                size32 = _MAX32
+            if self.force_zip64 or comp_size >= _MAX32:
+                fields.append(comp_size)
+                comp32 = _MAX32
+            if self.force_zip64 or offset >= _MAX32:
+                fields.append(offset)
+                offset32 = _MAX32
+            extra = b""
+            if fields:
+                extra = struct.pack(f"<HH{len(fields)}Q", 0x0001,
+                                    8 * len(fields), *fields)
+            version = _VERSION_ZIP64 if fields else _VERSION
+            parts.append(struct.pack(
+                "<IHHHHHHIIIHHHHHII", _CENTRAL_SIG, version, version,
+                _UTF8_FLAG, method, self._dostime, self._dosdate, crc,
+                comp32, size32, len(raw_name), len(extra), 0, 0, 0, 0,
+                offset32))
+            parts.append(raw_name)
+            parts.append(extra)
+
+        cd_size = sum(len(p) for p in parts)
+        count = len(self.entries)
+        if (self.force_zip64 or count >= _MAX16
+                or cd_size >= _MAX32 or cd_offset >= _MAX32):
+            zip64_offset = cd_offset + cd_size
+            parts.append(struct.pack(
+                "<IQHHIIQQQQ", _ZIP64_EOCD_SIG, 44, _VERSION_ZIP64,
+                _VERSION_ZIP64, 0, 0, count, count, cd_size, cd_offset))
+            parts.append(struct.pack("<IIQI", _ZIP64_LOCATOR_SIG, 0,
+                                     zip64_offset, 1))
+            count16 = _MAX16
+            cd_size32 = _MAX32
+            cd_offset32 = _MAX32
+        else:
+            count16, cd_size32, cd_offset32 = count, cd_size, cd_offset
+        parts.append(struct.pack("<IHHHHIIH", _EOCD_SIG, 0, 0, count16,
+                                 count16, cd_size32, cd_offset32, 0))
+        return b"".join(parts)
+
+
+def iter_zip(members, workers=None, level=DEFAULT_LEVEL, window=None,
+             mtime=None, force_zip64=False, uses=None):
+    """
+    members: (ad, payload) çiftleri (liste ya da tembel üreteç). ZIP
+    dosyasını bayt parçaları halinde üretir; üyeler havuzda paralel
+    üretilip sıkıştırılır, çıktıya girdi sırasıyla yazılır.
+
+    Üye (ad, payload, anahtar) üçlüsü de olabilir: aynı anahtarlı üyelerin
+    sadece ilkinin payload'u üretilir, diğerleri onun verisini paylaşır.
+    uses: anahtar -> toplam kullanım sayısı; verilirse paylaşılan veri son
+    kullanımdan sonra bırakılır, verilmezse ZIP bitene kadar tutulur.
+
+    window: aynı anda bekleyen en fazla üye (varsayılan workers * 4).
+    """
+    workers = workers or default_workers()
+    window = window or workers * 4
+    writer = ZipWriter(mtime, force_zip64)
+    pending = deque()
+    shared = {}
+    buf = []
+    buffered = 0
+
+    with ThreadPoolExecutor(max_workers=workers,
+                            thread_name_prefix="eticad-zip") as pool:
+        try:
+            for member in members:
+                name, payload = member[0], member[1]
+                key = member[2] if len(member) > 2 else None
+                if key is None:
+                    future = pool.submit(compress_member, payload, level)
+                else:
+                    entry = shared.get(key)
+                    if entry is None:
+                        future = pool.submit(compress_member, payload, level)
+                        entry = shared[key] = [future, 0]
+                    future = entry[0]
+                    entry[1] += 1
+                    if uses is not None and entry[1] >= uses[key]:
+                        del shared[key]
+                pending.append((name, future))
+                if len(pending) < window:
+                    continue
+                # Pencere dolu: en eski üye bitene kadar yeni iş alma
+                done_name, future = pending.popleft()
+                for part in writer.member(done_name, *future.result()):
+                    buf.append(part)
+                    buffered += len(part)
+                if buffered >= CHUNK_BYTES:
+                    yield b"".join(buf)
+                    buf, buffered = [], 0
+
+            while pending:
+                done_name, future = pending.popleft()
+                for part in writer.member(done_name, *future.result()):
+                    buf.append(part)
+                    buffered += len(part)
+                if buffered >= CHUNK_BYTES:
+                    yield b"".join(buf)
+                    buf, buffered = [], 0
+        finally:
+            # İstemci koparsa (GeneratorExit) bekleyen işleri bırak
+            for _, future in pending:
+                future.cancel()
+
+    buf.append(writer.finish())
+    yield b"".join(buf)
+
+
+def write_zip(fileobj, members, **kwargs):
+    """
+    iter_zip çıktısını dosya nesnesine yazar; yazılan bayt sayısını döner.
+    """
+    total = 0
+    for chunk in iter_zip(members, **kwargs):
+        fileobj.write(chunk)
+        total += len(chunk)
+    return total
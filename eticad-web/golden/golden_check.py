@@ -0,0 +1,306 @@
+"""
+DXF / SVG çıktıları için altın (golden) regresyon kontrolü.
+
+corpus.json'daki her etiket için build_single_dxf ve build_svg_preview
+çıktısı üretilir ve expected/ altındaki kayıtlı çıktılarla karşılaştırılır.
+
+Kullanım (eticad-web klasöründen):
+    python golden/golden_check.py check                 # toleranslı (varsayılan)
+    python golden/golden_check.py check --mode exact    # sadece SHA-256
+    python golden/golden_check.py check --eps 1e-3
+    python golden/golden_check.py check --compact       # kompakt çıktı aynı geometri mi
+    python golden/golden_check.py update                # beklenenleri yeniden yaz
+
+exact modu sadece manifest.json'daki özetlere bakar; binlerce etiketlik
+bir korpusta bile hızlıdır. tolerant modu DXF'i grup kodlarına ayırıp
+entity'leri sırayla, sayısal değerleri eps toleransıyla karşılaştırır;
+SVG'de de sayısal nitelikler aynı şekilde karşılaştırılır.
+
+--compact, kompakt DXF / SVG çıktısını (compact=True) normal çıktının
+kayıtlı halleriyle toleranslı karşılaştırır: DXF'te eksik Z kodları 0
+sayılır, SVG'de tamsayı koordinatlar 10**SVG_PRECISION'a bölünür. İki
+taraf da ayrı ayrı yuvarlandığı için SVG'de bir basamak birimi fark olabilir.
+
+update'i sadece çıktıdaki değişiklik bilerek yapılmışsa çalıştırın.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from eticad_core import SVG_PRECISION  # noqa: E402
+from eticad_spec import LabelSpec  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(HERE, "corpus.json")
+DEFAULT_EXPECTED = os.path.join(HERE, "expected")
+MANIFEST = "manifest.json"
+
+# DXF çıktısı .4f, SVG .2f yazıldığı için varsayılan toleranslar
+DXF_EPS = 1e-4
+SVG_EPS = 1e-2
+
+# Eksikse 0.0 sayılan isteğe bağlı grup kodları (Z koordinatları)
+OPTIONAL_ZERO_CODES = {30, 31, 32, 33}
+
+# Piksel boyutu; SVG ölçeğiyle (scale) değişmeyen nitelikler
+SVG_UNSCALED_ATTRS = {"width", "height"}
+
+
+# =========================
+# DXF KARŞILAŞTIRMA
+# =========================
+
+def _is_float_code(code):
+    return (10 <= code <= 59 or 110 <= code <= 149
+            or 210 <= code <= 239 or 1010 <= code <= 1059)
+
+
+def parse_dxf(text):
+    """
+    DXF metnini [(entity_tipi, [(kod, değer), ...]), ...] listesine ayırır.
+    Değerler sayısal kodlarda float, diğerlerinde str'dir.
+    """
+    lines = text.splitlines()
+    if len(lines) % 2:
+        raise ValueError("DXF satır sayısı tek; grup kodu / değer çifti bozuk.")
+
+    entities = []
+    current = None
+    for i in range(0, len(lines), 2):
+        code = int(lines[i].strip())
+        raw = lines[i + 1].strip()
+        value = float(raw) if _is_float_code(code) else raw
+        if code == 0:
+            current = (raw, [])
+            entities.append(current)
+        elif current is not None:
+            current[1].append((code, value))
+    return entities
+
+
+def _normalize_groups(groups):
+    return {code: value for code, value in groups}
+
+
+def compare_dxf(expected, actual, eps=DXF_EPS, limit=20):
+    """
+    İki DXF metnini karşılaştırır; farkların açıklama listesini döner
+    (boş liste = eşdeğer). Eksik Z kodları 0.0 kabul edilir.
+    """
+    a = parse_dxf(expected)
+    b = parse_dxf(actual)
+    diffs = []
+    if len(a) != len(b):
+        diffs.append(f"entity sayısı farklı: {len(a)} != {len(b)}")
+
+    for i, ((ta, ga), (tb, gb)) in enumerate(zip(a, b)):
+        if ta != tb:
+            diffs.append(f"#{i}: tip {ta} != {tb}")
+        else:
+            da = _normalize_groups(ga)
+            db = _normalize_groups(gb)
+            for code in sorted(set(da) | set(db)):
+                va = da.get(code, 0.0 if code in OPTIONAL_ZERO_CODES else None)
+                vb = db.get(code, 0.0 if code in OPTIONAL_ZERO_CODES else None)
+                if isinstance(va, float) and isinstance(vb, float):
+                    if abs(va - vb) > eps:
+                        diffs.append(f"#{i} {ta} kod {code}: {va} != {vb}")
+                elif va != vb:
+                    diffs.append(f"#{i} {ta} kod {code}: {va!r} != {vb!r}")
+        if len(diffs) >= limit:
+            break
+    return diffs
+
+
+# =========================
+# SVG KARŞILAŞTIRMA
+# =========================
+
+_SVG_TAG = re.compile(r"<(\w+)([^>]*)>")
+_SVG_ATTR = re.compile(r'([\w:-]+)="([^"]*)"')
+
+
+def _parse_svg(text):
+    out = []
+    for tag, attrs in _SVG_TAG.findall(text):
+        out.append((tag, _SVG_ATTR.findall(attrs)))
+    return out
+
+
+def _as_number(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def compare_svg(expected, actual, eps=SVG_EPS, limit=20, scale=1.0):
+    """
+    SVG'leri eleman eleman karşılaştırır; sayısal nitelikler eps
+    toleransıyla, diğerleri (viewBox dahil sayı listeleri) parça parça.
+    scale: actual'daki koordinatlar bu katsayıyla büyütülmüşse (kompakt
+    SVG) karşılaştırmadan önce bölünür.
+    """
+    a = _parse_svg(expected)
+    b = _parse_svg(actual)
+    diffs = []
+    if len(a) != len(b):
+        diffs.append(f"eleman sayısı farklı: {len(a)} != {len(b)}")
+
+    for i, ((ta, aa), (tb, ab)) in enumerate(zip(a, b)):
+        if ta != tb:
+            diffs.append(f"#{i}: <{ta}> != <{tb}>")
+        elif [k for k, _ in aa] != [k for k, _ in ab]:
+            diffs.append(f"#{i} <{ta}>: nitelikler farklı")
+        else:
+            for (k, va), (_, vb) in zip(aa, ab):
+                pa, pb = va.split(), vb.split()
+                na = [_as_number(p) for p in pa]
+                nb = [_as_number(p) for p in pb]
+                if scale != 1.0 and k not in SVG_UNSCALED_ATTRS:
+                    nb = [None if n is None else n / scale for n in nb]
+                if (len(na) == len(nb) and None not in na and None not in nb):
+                    if any(abs(x - y) > eps for x, y in zip(na, nb)):
+                        diffs.append(f"#{i} <{ta}> {k}: {va} != {vb}")
+                elif va != vb:
+                    diffs.append(f"#{i} <{ta}> {k}: {va!r} != {vb!r}")
+        if len(diffs) >= limit:
+            break
+    return diffs
+
+
+# =========================
+# KORPUS
+# =========================
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [LabelSpec.parse(item) for item in json.load(f)]
+
+
+def render(spec, compact=False):
+    layout = spec.layout()
+    return spec.to_dxf(layout, compact), spec.to_svg(layout, compact)
+
+
+def _read_gz(path):
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def _write_gz(path, text):
+    # mtime=0: aynı içerik her seferinde aynı dosya olsun
+    with open(path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            f.write(text.encode("utf-8"))
+
+
+def update(args):
+    os.makedirs(args.expected, exist_ok=True)
+    manifest = {}
+    for spec in load_corpus(args.corpus):
+        dxf, svg = render(spec)
+        manifest[spec.digest] = {
+            "spec": spec.form_values(),
+            "dxf_sha256": _sha256(dxf),
+            "svg_sha256": _sha256(svg),
+        }
+        if not args.hash_only:
+            _write_gz(os.path.join(args.expected, spec.digest + ".dxf.gz"), dxf)
+            _write_gz(os.path.join(args.expected, spec.digest + ".svg.gz"), svg)
+
+    with open(os.path.join(args.expected, MANIFEST), "w", encoding="utf-8",
+              newline="\r\n") as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False, sort_keys=True)
+    print(f"{len(manifest)} etiket kaydedildi: {args.expected}")
+    return 0
+
+
+def check(args):
+    with open(os.path.join(args.expected, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    failures = 0
+    corpus = load_corpus(args.corpus)
+    for spec in corpus:
+        entry = manifest.get(spec.digest)
+        if entry is None:
+            print(f"EKSİK  {spec.digest}  {spec.key}  (update çalıştırın)")
+            failures += 1
+            continue
+
+        dxf, svg = render(spec, args.compact)
+        if (_sha256(dxf) == entry["dxf_sha256"]
+                and _sha256(svg) == entry["svg_sha256"]):
+            continue
+
+        if args.mode == "exact" and not args.compact:
+            print(f"FARKLI {spec.digest}  {spec.key}")
+            failures += 1
+            continue
+
+        base = os.path.join(args.expected, spec.digest)
+        if not os.path.exists(base + ".dxf.gz"):
+            print(f"FARKLI {spec.digest}  {spec.key}  (kayıtlı çıktı yok, "
+                  "sadece özet)")
+            failures += 1
+            continue
+
+        svg_eps = max(args.eps, SVG_EPS)
+        svg_scale = 1.0
+        if args.compact:
+            # iki bağımsız yuvarlama: en fazla bir basamak birimi
+            svg_eps *= 1.0001
+            svg_scale = 10.0 ** SVG_PRECISION
+        diffs = (compare_dxf(_read_gz(base + ".dxf.gz"), dxf, eps=args.eps)
+                 + compare_svg(_read_gz(base + ".svg.gz"), svg,
+                               eps=svg_eps, scale=svg_scale))
+        if diffs:
+            failures += 1
+            print(f"FARKLI {spec.digest}  {spec.key}")
+            for d in diffs[:args.show]:
+                print(f"    {d}")
+
+    mode = "compact" if args.compact else args.mode
+    print(f"{len(corpus)} etiket, {failures} başarısız ({mode})")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EtiCAD golden çıktı kontrolü")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    for name in ("check", "update"):
+        p = sub.add_parser(name)
+        p.add_argument("--corpus", default=DEFAULT_CORPUS)
+        p.add_argument("--expected", default=DEFAULT_EXPECTED)
+        if name == "check":
+            p.add_argument("--mode", choices=("tolerant", "exact"),
+                           default="tolerant")
+            p.add_argument("--eps", type=float, default=DXF_EPS)
+            p.add_argument("--show", type=int, default=5,
+                           help="etiket başına gösterilecek fark sayısı")
+            p.add_argument("--compact", action="store_true",
+                           help="kompakt çıktıyı normal beklenenlerle "
+                                "toleranslı karşılaştır")
+        else:
+            p.add_argument("--hash-only", action="store_true",
+                           help="sadece özetleri yaz (büyük korpuslar için)")
+
+    args = parser.parse_args(argv)
+    return check(args) if args.cmd == "check" else update(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
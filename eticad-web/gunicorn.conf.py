@@ -0,0 +1,15 @@
+"""
+gunicorn yapılandırması (eticad-web klasöründen çalıştırılınca kendiliğinden
+yüklenir). Bağlantı / worker ayarları komut satırından verilir; burada
+sadece kancalar var.
+"""
+
+
+def post_worker_init(worker):
+    # Uygulama yüklendi, worker henüz istek kabul etmiyor: ısınmanın yeri
+    from eticad_warmup import warm_up
+
+    steps = warm_up(worker.wsgi)
+    if steps is not None:
+        worker.log.info("Worker %s ısındı: %.1f ms",
+                        worker.pid, steps["total"] * 1e3)